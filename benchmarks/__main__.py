@@ -0,0 +1,110 @@
+import json
+from typing import List, Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from .suite import SCALES, compare, run_benchmarks
+
+app = typer.Typer(
+    name="benchmarks",
+    help="Performance benchmarks of busfactorpy on synthetic histories.",
+)
+console = Console()
+
+
+@app.command()
+def run(
+    scale: List[str] = typer.Option(
+        ["small"],
+        "--scale",
+        "-s",
+        help=f"Scale to run: {', '.join(SCALES)}. Repeat for several.",
+    ),
+    stage: Optional[List[str]] = typer.Option(
+        None, "--stage", help="Only run these stages (e.g. mine, calculate:hhi)."
+    ),
+    repeat: int = typer.Option(3, "--repeat", "-r", help="Runs per stage."),
+    output: str = typer.Option(
+        "benchmark-results.json", "--output", "-o", help="JSON report to write."
+    ),
+):
+    """
+    Times every stage at the given scales and writes a JSON report.
+    """
+    unknown = [s for s in scale if s not in SCALES]
+    if unknown or repeat < 1:
+        console.print(
+            f"[bold red]Invalid options:[/bold red] scales must be one of "
+            f"{', '.join(SCALES)} and --repeat >= 1."
+        )
+        raise typer.Exit(code=1)
+
+    report = run_benchmarks(
+        scale,
+        repeat=repeat,
+        stages=stage,
+        on_result=lambda s, name, timing: console.print(
+            f"{s:<7} {name:<26} {timing['seconds']:.4f}s  ({timing['rows']} rows)"
+        ),
+    )
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    console.print(f"[bold green]Report saved to:[/bold green] {output}")
+
+
+@app.command("compare")
+def compare_command(
+    baseline: str = typer.Argument(..., help="Baseline JSON report."),
+    current: str = typer.Argument(..., help="JSON report to check."),
+    max_regression: float = typer.Option(
+        10.0,
+        "--max-regression",
+        help="Fail when a stage is slower than the baseline by more than this percentage.",
+    ),
+    min_seconds: float = typer.Option(
+        0.01,
+        "--min-seconds",
+        help="Stages faster than this in the baseline never fail (timer noise).",
+    ),
+):
+    """
+    Compares a report with the baseline; exits with 1 on regressions.
+    """
+    with open(baseline, encoding="utf-8") as f:
+        baseline_report = json.load(f)
+    with open(current, encoding="utf-8") as f:
+        current_report = json.load(f)
+
+    comparison = compare(baseline_report, current_report, max_regression, min_seconds)
+
+    table = Table(title=f"Benchmarks vs {baseline}")
+    table.add_column("Scale")
+    table.add_column("Stage")
+    table.add_column("Baseline (s)", justify="right")
+    table.add_column("Current (s)", justify="right")
+    table.add_column("Change", justify="right")
+    for row in comparison.itertuples(index=False):
+        style = "bold red" if row.regression else "green"
+        table.add_row(
+            row.scale,
+            row.stage,
+            f"{row.baseline_seconds:.4f}",
+            f"{row.current_seconds:.4f}",
+            f"[{style}]{row.change_pct:+.1f}%[/{style}]",
+        )
+    console.print(table)
+
+    regressions = int(comparison["regression"].sum())
+    if regressions:
+        console.print(
+            f"[bold red]{regressions} stage(s) regressed by more than "
+            f"{max_regression:g}%.[/bold red]"
+        )
+        raise typer.Exit(code=1)
+    console.print("[bold green]No regressions.[/bold green]")
+
+
+if __name__ == "__main__":
+    app()
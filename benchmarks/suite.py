@@ -0,0 +1,180 @@
+"""
+Benchmark stages and scales.
+
+Every stage is timed `repeat` times; the minimum wall time is the figure
+compared against the baseline (it is the least noisy), the median is kept
+for reference. Mining runs on a generated git repository; the calculator
+and trend stages run on the DataFrame fixture, which can be much larger.
+"""
+
+import gc
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+import pandas as pd
+
+from busfactorpy import __version__
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.miner import GitMiner
+from busfactorpy.core.trend import TrendAnalyzer
+
+from .synthetic import SyntheticHistory
+
+METRICS = ["churn", "commit-number", "entropy", "hhi", "ownership"]
+
+
+@dataclass(frozen=True)
+class Scale:
+    repository: SyntheticHistory
+    frame: SyntheticHistory
+
+
+SCALES = {
+    "small": Scale(
+        repository=SyntheticHistory(200, 60, 8, seed=1),
+        frame=SyntheticHistory(20_000, 800, 40, seed=2),
+    ),
+    "medium": Scale(
+        repository=SyntheticHistory(1_000, 300, 25, seed=3),
+        frame=SyntheticHistory(200_000, 5_000, 150, seed=4),
+    ),
+    "large": Scale(
+        repository=SyntheticHistory(5_000, 1_500, 80, seed=5),
+        frame=SyntheticHistory(1_000_000, 20_000, 500, seed=6),
+    ),
+}
+
+
+def _time(fn: Callable[[], int], repeat: int) -> dict:
+    """Runs fn (which returns the rows it processed) repeat times."""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        rows = fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+        "rows": rows,
+    }
+
+
+def _stages(repo_path: str, frame: pd.DataFrame) -> dict[str, Callable[[], int]]:
+    def mine() -> int:
+        return len(GitMiner(repo_path, None).mine_commit_history())
+
+    def calculate(metric: str, group_by: str = "file") -> Callable[[], int]:
+        def run() -> int:
+            BusFactorCalculator(
+                frame, metric=metric, group_by=group_by, depth=2
+            ).calculate()
+            return len(frame)
+
+        return run
+
+    def trend() -> int:
+        TrendAnalyzer(frame.copy(), {"metric": "churn"}).analyze(
+            start_date=frame["date"].min() + pd.Timedelta(days=90),
+            end_date=frame["date"].max(),
+            window_days=90,
+            step_days=30,
+        )
+        return len(frame)
+
+    stages = {"mine": mine}
+    stages.update({f"calculate:{m}": calculate(m) for m in METRICS})
+    stages["calculate:hhi:directory"] = calculate("hhi", group_by="directory")
+    stages["trend"] = trend
+    return stages
+
+
+def run_benchmarks(
+    scales: list[str],
+    repeat: int = 3,
+    stages: list[str] | None = None,
+    on_result: Callable[[str, str, dict], None] | None = None,
+) -> dict:
+    """
+    Runs the selected stages at each scale and returns a JSON-serialisable
+    report: {"meta": {...}, "results": {scale: {stage: timing}}}.
+    """
+    results: dict[str, dict[str, dict]] = {}
+    for scale_name in scales:
+        scale = SCALES[scale_name]
+        temp_dir = tempfile.mkdtemp(prefix="busfactorpy_bench_")
+        try:
+            repo_path = scale.repository.write_repository(f"{temp_dir}/repo")
+            frame = scale.frame.commit_frame()
+            results[scale_name] = {}
+            for name, fn in _stages(repo_path, frame).items():
+                if stages and name not in stages:
+                    continue
+                timing = _time(fn, repeat)
+                results[scale_name][name] = timing
+                if on_result:
+                    on_result(scale_name, name, timing)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "busfactorpy": __version__,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    max_regression: float = 10.0,
+    min_seconds: float = 0.01,
+) -> pd.DataFrame:
+    """
+    Compares two reports stage by stage. A stage regresses when it is more
+    than max_regression percent slower than the baseline; stages faster than
+    min_seconds in the baseline are reported but never fail, as their
+    timings are mostly noise.
+    """
+    rows = []
+    for scale, stages in current["results"].items():
+        for stage, timing in stages.items():
+            before = baseline["results"].get(scale, {}).get(stage)
+            if before is None:
+                continue
+            change = (timing["seconds"] / before["seconds"] - 1) * 100
+            rows.append(
+                {
+                    "scale": scale,
+                    "stage": stage,
+                    "baseline_seconds": before["seconds"],
+                    "current_seconds": timing["seconds"],
+                    "change_pct": change,
+                    "regression": change > max_regression
+                    and before["seconds"] >= min_seconds,
+                }
+            )
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "scale",
+            "stage",
+            "baseline_seconds",
+            "current_seconds",
+            "change_pct",
+            "regression",
+        ],
+    )
@@ -0,0 +1,169 @@
+"""
+Deterministic synthetic commit histories for the benchmarks.
+
+A SyntheticHistory draws, from a seed, which files every commit touches and
+who authors it: file popularity and per-file ownership both follow a Zipf
+law, so a few files are hot and most files have one or two dominant authors.
+The same history can be written as a real git repository (through
+`git fast-import`) or built directly as a GitMiner-shaped DataFrame.
+"""
+
+import os
+import subprocess
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+START_TIMESTAMP = 1_577_836_800  # 2020-01-01T00:00:00Z
+COMMIT_INTERVAL = 3_600
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+@dataclass(frozen=True)
+class SyntheticHistory:
+    n_commits: int
+    n_files: int
+    n_authors: int
+    zipf_exponent: float = 1.2
+    seed: int = 0
+
+    def _path(self, file: int) -> str:
+        # Three levels of directories so directory grouping has work to do.
+        return f"pkg{file % 7}/mod{file % 5}/file{file}.py"
+
+    @cached_property
+    def modifications(self) -> dict[str, np.ndarray]:
+        """
+        One entry per file modification, in commit order: commit, file,
+        author, lines_added and lines_deleted. Every modification replaces
+        the last `deleted` lines of the file and appends new ones, so the
+        line counts are exactly what git reports for the written repository.
+        """
+        rng = np.random.default_rng(self.seed)
+        file_weights = _zipf_weights(self.n_files, self.zipf_exponent)
+        author_weights = _zipf_weights(self.n_authors, self.zipf_exponent)
+        # Each file ranks the authors differently: its own main owner.
+        owners = np.argsort(rng.random((self.n_files, self.n_authors)), axis=1)
+
+        per_commit = np.minimum(1 + rng.poisson(1.0, self.n_commits), self.n_files)
+        commit = np.repeat(np.arange(self.n_commits), per_commit)
+        file = np.empty(len(commit), dtype=np.int64)
+        offset = 0
+        for n in per_commit:
+            file[offset : offset + n] = rng.choice(
+                self.n_files, n, replace=False, p=file_weights
+            )
+            offset += n
+
+        # The author of a commit is drawn from the owners of its first file.
+        first = np.r_[0, np.cumsum(per_commit)[:-1]]
+        rank = rng.choice(self.n_authors, self.n_commits, p=author_weights)
+        author = np.repeat(owners[file[first], rank], per_commit)
+
+        replaced = rng.integers(0, 8, len(commit))
+        appended = rng.integers(1, 25, len(commit))
+        deleted = np.empty(len(commit), dtype=np.int64)
+        length = np.zeros(self.n_files, dtype=np.int64)
+        for i, f in enumerate(file):
+            deleted[i] = min(replaced[i], length[f])
+            length[f] += appended[i]
+
+        return {
+            "commit": commit,
+            "file": file,
+            "author": author,
+            "lines_added": deleted + appended,
+            "lines_deleted": deleted,
+        }
+
+    def commit_frame(self) -> pd.DataFrame:
+        """The rows GitMiner would mine from the written repository."""
+        mods = self.modifications
+        paths = np.array([self._path(f) for f in range(self.n_files)], dtype=object)
+        emails = np.array(
+            [f"dev{a}@example.com" for a in range(self.n_authors)], dtype=object
+        )
+        return pd.DataFrame(
+            {
+                "file": paths[mods["file"]],
+                "author": emails[mods["author"]],
+                "date": pd.to_datetime(
+                    START_TIMESTAMP + mods["commit"] * COMMIT_INTERVAL, unit="s"
+                ),
+                "lines_added": mods["lines_added"],
+                "lines_deleted": mods["lines_deleted"],
+                "commit_hash": mods["commit"].astype(str),
+            }
+        )
+
+    def _fast_import_stream(self) -> Iterator[bytes]:
+        mods = self.modifications
+        contents: list[list[bytes]] = [[] for _ in range(self.n_files)]
+        bounds = np.searchsorted(mods["commit"], np.arange(self.n_commits + 1))
+        line_id = 0
+
+        for c in range(self.n_commits):
+            rows = range(bounds[c], bounds[c + 1])
+            author = int(mods["author"][rows[0]])
+            timestamp = START_TIMESTAMP + c * COMMIT_INTERVAL
+            ident = f"Dev {author} <dev{author}@example.com> {timestamp} +0000"
+            message = f"commit {c}\n".encode()
+
+            chunk = [
+                b"commit refs/heads/main\n",
+                f"mark :{c + 1}\nauthor {ident}\ncommitter {ident}\n".encode(),
+                b"data %d\n%s" % (len(message), message),
+            ]
+            if c:
+                chunk.append(f"from :{c}\n".encode())
+
+            for i in rows:
+                f = int(mods["file"][i])
+                lines = contents[f]
+                del lines[len(lines) - int(mods["lines_deleted"][i]) :]
+                new = int(mods["lines_added"][i])
+                lines.extend(b"value_%d = %d\n" % (line_id + k, f) for k in range(new))
+                line_id += new
+                data = b"".join(lines)
+                chunk.append(
+                    b"M 100644 inline %s\ndata %d\n%s\n"
+                    % (self._path(f).encode(), len(data), data)
+                )
+            yield b"".join(chunk)
+
+    def write_repository(self, path: str) -> str:
+        """Creates a git repository at path holding the history on 'main'."""
+        os.makedirs(path, exist_ok=True)
+        subprocess.run(
+            ["git", "init", "--quiet", "-b", "main", path],
+            check=True,
+            capture_output=True,
+        )
+        process = subprocess.Popen(
+            ["git", "fast-import", "--quiet"],
+            cwd=path,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        assert process.stdin is not None and process.stderr is not None
+        for chunk in self._fast_import_stream():
+            process.stdin.write(chunk)
+        process.stdin.close()
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise RuntimeError(f"git fast-import failed: {stderr.decode().strip()}")
+
+        subprocess.run(
+            ["git", "checkout", "--quiet", "main"],
+            cwd=path,
+            check=True,
+            capture_output=True,
+        )
+        return path
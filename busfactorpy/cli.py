@@ -1,15 +1,22 @@
+import os
 import typer
-from typing import Optional
+from contextlib import contextmanager
+from typing import Any, List, Optional
 from datetime import datetime
 from rich.console import Console
 from busfactorpy.core.miner import GitMiner
-from busfactorpy.core.calculator import BusFactorCalculator
-from busfactorpy.core.trend import TrendAnalyzer
 from busfactorpy.core.ignore import BusFactorIgnore
-from busfactorpy.output.reporter import ConsoleReporter
-from busfactorpy.output.visualizer import BusFactorVisualizer
+from busfactorpy.output.reporter import (
+    COMPRESSIONS,
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    ConsoleReporter,
+)
+from busfactorpy.output.visualizer import ChartWorker
 from busfactorpy import __version__
-import pandas as pd
+
+# pandas-backed modules (calculator, trend) are imported inside the commands
+# that need them so that light commands such as `version` start quickly.
 
 app = typer.Typer(
     name="busfactorpy",
@@ -18,122 +25,214 @@ app = typer.Typer(
 console = Console()
 
 
-@app.command()
-def version():
+def _status_console(output: Optional[str]) -> Console:
+    """Console for status messages; stderr when the report is streamed to stdout."""
+    return Console(stderr=True) if output == "-" else console
+
+
+def _chart_filename(stem: str, scope: Optional[str], per_scope: bool) -> str:
+    """Chart file name, suffixed with the scope when one chart is drawn per scope."""
+    if not per_scope or not scope:
+        return f"{stem}.png"
+    return f"{stem}.{scope.replace('/', '_')}.png"
+
+
+def _changed_files_history(
+    repository: str,
+    base_ref: str,
+    ignorer: BusFactorIgnore,
+    scopes: List[str],
+    console: Console,
+    aliases: Optional[str] = None,
+):
+    """History of the files changed since base_ref, read from the file index."""
+    from busfactorpy.core.file_index import FileIndex, changed_paths
+    from busfactorpy.core.scope import ScopeResolver
+
+    paths = [
+        path
+        for path in changed_paths(repository, base_ref)
+        if not ignorer.is_ignored(path)
+    ]
+    console.print(f"[bold cyan]{len(paths)} files changed since[/bold cyan] {base_ref}")
+
+    commit_data = FileIndex.load_or_build(repository, aliases).history(paths)
+    if scopes:
+        commit_data = ScopeResolver(scopes).filter(commit_data)
+    return commit_data
+
+
+@contextmanager
+def _mining_progress(console: Console, progress_log: Optional[str]):
     """
-    Exibe a versão instalada do BusFactorPy.
+    Live progress display for GitMiner's on_progress, also appending JSON
+    snapshots to progress_log when given.
     """
-    console.print(f"BusFactorPy Versão: [bold green]{__version__}[/bold green]")
-    raise typer.Exit()
+    from busfactorpy.output.progress import MiningProgressDisplay
 
+    if progress_log is None:
+        with MiningProgressDisplay(console) as display:
+            yield display
+        return
+    with open(progress_log, "a", encoding="utf-8") as log:
+        with MiningProgressDisplay(console, log) as display:
+            yield display
 
-@app.command()
-def analyze(
-    repository: str = typer.Argument(
-        ..., help="Local path or GitHub URL of the repository to analyze."
-    ),
-    output_format: str = typer.Option(
-        "summary", "--format", "-f", help="Output format: summary, csv, or json."
-    ),
-    n_top: int = typer.Option(
-        10, "--top-n", "-n", help="Number of top risky files to report."
-    ),
-    ignore_file: str = typer.Option(
-        ".busfactorignore",
-        "--ignore-file",
-        help="Path to the exclusion file (default: .busfactorignore).",
-    ),
-    metric: str = typer.Option(
+
+def _check_checkpoint_options(
+    checkpoint_every: Optional[int], resume: bool, console: Console
+):
+    if checkpoint_every is not None and checkpoint_every < 1:
+        console.print(
+            f"[bold red]Invalid checkpoint interval:[/bold red] {checkpoint_every}. "
+            "Must be >= 1."
+        )
+        raise typer.Exit(code=1)
+    if resume and checkpoint_every is None:
+        console.print("[bold red]--resume needs --checkpoint-every.[/bold red]")
+        raise typer.Exit(code=1)
+
+
+def _report_resume(miner: GitMiner, console: Console):
+    if miner.resumed_commits:
+        console.print(
+            f"[bold yellow]Resumed from checkpoint:[/bold yellow] "
+            f"{miner.resumed_commits} commits were already mined."
+        )
+
+
+def _print_stability(summary: dict, scope: Optional[str], console: Console):
+    """Table of how stable the estimated Critical set is under resampling."""
+    from rich.table import Table
+
+    title = "Estabilidade do Conjunto Crítico"
+    table = Table(title=f"{title} ({scope})" if scope else title)
+    table.add_column("Medida")
+    table.add_column("Valor", justify="right")
+    table.add_row(
+        "Commits amostrados",
+        f"{summary['sampled_commits']} / {summary['population_commits']}",
+    )
+    table.add_row("Réplicas bootstrap", str(summary["bootstrap"]))
+    table.add_row("Críticos (estimativa)", str(summary["critical"]))
+    table.add_row("Jaccard médio", f"{summary['critical_jaccard_mean']:.3f}")
+    table.add_row(
+        f"Jaccard ({(1 - summary['confidence']) / 2:.1%} quantil)",
+        f"{summary['critical_jaccard_low']:.3f}",
+    )
+    table.add_row(
+        f"Críticos em >= {summary['confidence']:.0%} das réplicas",
+        str(summary["stable_critical"]),
+    )
+    table.add_row("Críticos instáveis", str(summary["unstable_critical"]))
+    console.print(table)
+
+
+def _print_threshold_sweep(
+    sweep, scope: Optional[str], threshold: float, console: Console
+):
+    """Risk class counts per threshold; the row of --threshold is highlighted."""
+    from rich.table import Table
+
+    title = "Sensibilidade do Limiar"
+    table = Table(title=f"{title} ({scope})" if scope else title)
+    table.add_column("Limiar", justify="right")
+    for risk in ("Critical", "High", "Medium", "Low"):
+        table.add_column(risk, justify="right")
+    for row in sweep.itertuples(index=False):
+        table.add_row(
+            f"{row.threshold:g}",
+            str(row.Critical),
+            str(row.High),
+            str(row.Medium),
+            str(row.Low),
+            style="bold" if abs(row.threshold - threshold) < 1e-9 else None,
+        )
+    console.print(table)
+
+
+def _check_metric(metric: str, console: Console, allow_blame: bool = False):
+    """
+    Looks the metric up in the registry (built-in metrics and plugins).
+    Blame metrics read the lines at HEAD, which only `analyze` does.
+    """
+    from busfactorpy.core.metrics import get_metric
+
+    try:
+        spec = get_metric(metric)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+
+    if spec.source == "blame" and not allow_blame:
+        console.print(
+            f"[bold red]The '{spec.name}' metric reads git blame and is only "
+            "available in 'analyze'.[/bold red]"
+        )
+        raise typer.Exit(code=1)
+    return spec
+
+
+def _metric_option():
+    return typer.Option(
         "churn",
         "--metric",
         "-m",
-        help="Metric: commit-number, churn, entropy, hhi, ownership.",
+        help="Metric (default: churn). List the available ones with 'busfactorpy metrics'.",
         case_sensitive=False,
-    ),
-    threshold: float = typer.Option(
+    )
+
+
+def _threshold_option():
+    return typer.Option(
         0.8,
         "--threshold",
         "-t",
         help="Threshold for High Risk classification (0.0 to 1.0). Default is 0.8.",
-    ),
-    group_by: str = typer.Option(
+    )
+
+
+def _group_by_option():
+    return typer.Option(
         "file",
         "--group-by",
         "-g",
         help="Group results by 'file' or 'directory'.",
         case_sensitive=False,
-    ),
-    depth: int = typer.Option(
+    )
+
+
+def _depth_option():
+    return typer.Option(
         1,
         "--depth",
         "-d",
         help="Directory depth when grouping by directory (only valid with --group-by directory).",
-    ),
-    scope: Optional[str] = typer.Option(
-        None,
-        "--scope",
-        help="Limit analysis to a subdirectory (path relative to repo root). Example: src/ or src/utils",
-    ),
-    trend: bool = typer.Option(
-        False, "--trend", help="Enable trend analysis mode (evolution over time)."
-    ),
-    since: Optional[str] = typer.Option(
-        None,
-        help="Start date for analysis (YYYY-MM-DD). Defaults to beginning of repo or window calc.",
-    ),
-    until: Optional[str] = typer.Option(
-        None, help="End date for analysis (YYYY-MM-DD). Defaults to today."
-    ),
-    window: int = typer.Option(
-        180, "--window", help="Sliding window size in days for trend analysis."
-    ),
-    step: int = typer.Option(
-        30, "--step", help="Step size in days for trend analysis iteration."
-    ),
+    )
+
+
+def _check_analysis_options(
+    metric: str,
+    threshold: float,
+    group_by: str,
+    depth: int,
+    console: Console,
+    allow_blame: bool = False,
 ):
     """
-    Executes the Bus Factor analysis on a given Git repository.
+    Validates the options shared by the analysing commands before any repository
+    is mined. Returns the metric spec and the lower-cased group-by.
     """
-    console.print(f"[bold cyan]Analysing repository:[/bold cyan] {repository}")
-
-    start_dt = None
-    end_dt = datetime.now()
-
-    if since:
-        try:
-            start_dt = datetime.strptime(since, "%Y-%m-%d")
-        except ValueError:
-            console.print(
-                "[bold red]Invalid date format for --since. Use YYYY-MM-DD.[/bold red]"
-            )
-            raise typer.Exit(code=1)
-
-    if until:
-        try:
-            end_dt = datetime.strptime(until, "%Y-%m-%d")
-        except ValueError:
-            console.print(
-                "[bold red]Invalid date format for --until. Use YYYY-MM-DD.[/bold red]"
-            )
-            raise typer.Exit(code=1)
-
     if not (0.0 < threshold <= 1.0):
         console.print(
             f"[bold red]Invalid threshold:[/bold red] {threshold}. Must be between 0.0 and 1.0"
         )
         raise typer.Exit(code=1)
 
-    valid_metrics = {"churn", "entropy", "hhi", "ownership", "commit-number"}
-    if metric.lower() not in valid_metrics:
-        console.print(
-            f"[bold red]Invalid metric:[/bold red] {metric}. "
-            f"Valid options: {', '.join(valid_metrics)}"
-        )
-        raise typer.Exit(code=1)
+    spec = _check_metric(metric, console, allow_blame=allow_blame)
 
-    valid_group_by = {"file", "directory"}
     group_by_lower = group_by.lower()
-    if group_by_lower not in valid_group_by:
+    if group_by_lower not in {"file", "directory"}:
         console.print(
             f"[bold red]Invalid group-by:[/bold red] {group_by}. "
             "Valid options: file, directory"
@@ -145,102 +244,1640 @@ def analyze(
             f"[bold red]Invalid depth:[/bold red] {depth}. Must be an integer >= 1 when grouping by directory."
         )
         raise typer.Exit(code=1)
+    return spec, group_by_lower
+
 
+def _start_profiler(
+    ctx: typer.Context,
+    path: str,
+    trace_memory: bool,
+    cprofile_stage: Optional[str],
+    console: Console,
+):
+    """
+    Activates stage timing for the rest of the command. The report is written
+    when the command finishes, including early exits.
+    """
+    from rich.table import Table
+    from busfactorpy.core.profiling import StageProfiler
+
+    profiler = StageProfiler(trace_memory, cprofile_stage).start()
+
+    def finish():
+        profiler.stop()
+        dump = profiler.save(path)
+
+        table = Table(title="Perfil por Etapa")
+        table.add_column("Etapa", no_wrap=True)
+        table.add_column("Dentro de", style="dim", no_wrap=True)
+        table.add_column("Chamadas", justify="right")
+        table.add_column("Wall (s)", justify="right")
+        table.add_column("CPU (s)", justify="right")
+        table.add_column("Linhas", justify="right")
+        table.add_column(
+            "Pico traced (MB)" if trace_memory else "Pico RSS (MB)", justify="right"
+        )
+        for record in profiler.records.values():
+            peak = record.peak_traced_bytes if trace_memory else record.peak_rss_bytes
+            table.add_row(
+                record.name,
+                record.parent or "",
+                str(record.calls),
+                f"{record.wall_seconds:.3f}",
+                f"{record.cpu_seconds:.3f}",
+                str(record.rows),
+                f"{peak / 2**20:.1f}" if peak else "-",
+            )
+        console.print(table)
+        console.print(
+            f"[bold green]Profile saved to:[/bold green] {path} "
+            f"({profiler.total_wall_seconds:.2f}s total)"
+        )
+        if dump:
+            console.print(f"[bold green]cProfile dump saved to:[/bold green] {dump}")
+        elif cprofile_stage:
+            console.print(
+                f"[yellow]Stage '{cprofile_stage}' did not run; no cProfile dump.[/yellow]"
+            )
+
+    ctx.call_on_close(finish)
+
+
+def _parse_date(value: Optional[str], option: str, console: Console):
+    """The YYYY-MM-DD date of option, or None when it was not given."""
+    if not value:
+        return None
     try:
-        ignorer = BusFactorIgnore(ignore_file)
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
         console.print(
-            f"[bold yellow]Excluding files based on:[/bold yellow] {ignore_file}"
+            f"[bold red]Invalid date format for {option}. Use YYYY-MM-DD.[/bold red]"
         )
-    except Exception as e:
-        console.print(f"[bold red]ERROR loading ignore file:[/bold red] {e}")
         raise typer.Exit(code=1)
 
-    try:
-        miner = GitMiner(repository, ignorer, scope)
-        commit_data = miner.mine_commit_history()
 
-        if "date" not in commit_data.columns:
-            if trend:
-                console.print("\n[bold red]ERROR: Commit dates are missing![/bold red]")
-                console.print(
-                    "[yellow]The current GitMiner implementation does not extract commit dates.[/yellow]"
-                )
-                raise typer.Exit(code=1)
-        else:
-            commit_data["date"] = pd.to_datetime(commit_data["date"], utc=True)
-            commit_data["date"] = commit_data["date"].dt.tz_localize(None)
+def _load_stored(repository: str, dated: bool, console: Console):
+    """
+    The aggregate of a directory written by `busfactorpy cube`, `mine-table`
+    or `merge`, analysed without mining; None for a repository.
+    """
+    from busfactorpy.core.commit_table import CommitTable
+    from busfactorpy.core.cube import AggregateCube
+    from busfactorpy.core.shard import AggregateShard
+
+    if AggregateCube.is_cube(repository):
+        console.print("[bold yellow]Reading pre-aggregated cube[/bold yellow]")
+        return AggregateCube.load(repository)
+    if CommitTable.is_table(repository):
+        console.print("[bold yellow]Reading memory-mapped commit table[/bold yellow]")
+        return CommitTable.load(repository)
+    if AggregateShard.is_shard(repository):
+        if dated:
+            console.print(
+                "[bold red]Shards keep no per-day history: --trend, --since and "
+                "--until need a cube.[/bold red]"
+            )
+            raise typer.Exit(code=1)
+        console.print("[bold yellow]Reading merged shard aggregate[/bold yellow]")
+        return AggregateShard.load(repository)
+    return None
+
 
+def _load_ignorer(ignore_file: str, console: Console) -> BusFactorIgnore:
+    try:
+        ignorer = BusFactorIgnore(ignore_file)
     except Exception as e:
-        console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+        console.print(f"[bold red]ERROR loading ignore file:[/bold red] {e}")
         raise typer.Exit(code=1)
+    console.print(f"[bold yellow]Excluding files based on:[/bold yellow] {ignore_file}")
+    return ignorer
 
-    if commit_data.empty:
-        console.print("[yellow]No commit data found. Analysis aborted.[/yellow]")
-        raise typer.Exit(code=0)
 
-    if trend:
-        console.print("[bold magenta]Running Trend Analysis...[/bold magenta]")
-        console.print(f"Window: {window} days | Step: {step} days")
-
-        if not start_dt:
-            start_dt = commit_data["date"].min()
-            console.print(f"Auto-detected start date: {start_dt.date()}")
-
-        calc_params = {
-            "metric": metric.lower(),
-            "threshold": threshold,
-            "group_by": group_by_lower,
-            "depth": depth,
-        }
+def _load_blame(
+    repository: str,
+    ignorer: BusFactorIgnore,
+    scopes: List[str],
+    aliases: Optional[str],
+    console: Console,
+):
+    """Line ownership at HEAD, blamed now so the cache hits can be reported."""
+    from busfactorpy.core.blame import BlameOwnership
+
+    ownership = BlameOwnership(repository, ignorer, scopes, aliases=aliases)
+    ownership.author_stats()
+    console.print(
+        f"[bold yellow]Blamed {ownership.blamed} files "
+        f"({ownership.cached} unchanged files read from the cache)[/bold yellow]"
+    )
+    return ownership
+
+
+def _draw_sample(
+    repository: str,
+    size: int,
+    strategy: str,
+    seed: int,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    console: Console,
+):
+    """The commits mined by --estimate, drawn from the analysed window."""
+    from busfactorpy.core.estimate import sample_commits
+
+    sample = sample_commits(repository, size, strategy, seed, since=since, until=until)
+    console.print(
+        f"[bold magenta]Estimating from {len(sample)} of "
+        f"{sample.population} commits[/bold magenta]"
+    )
+    return sample
+
+
+def _mine_commits(
+    repository: str,
+    ignorer: BusFactorIgnore,
+    scopes: List[str],
+    console: Console,
+    *,
+    aliases: Optional[str],
+    sample,
+    pipeline: bool,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    progress_log: Optional[str],
+    checkpoint_every: Optional[int],
+    checkpoint_dir: Optional[str],
+    resume: bool,
+):
+    """
+    Mines the repository, only the commits of sample when given. Returns the
+    commit rows, or with pipeline the shard folded while mining, which already
+    leaves out the rows outside since/until.
+    """
+    from busfactorpy.core.pipeline import PipelinedAggregator
 
-        trend_analyzer = TrendAnalyzer(commit_data, calc_params)
-        trend_df = trend_analyzer.analyze(
-            start_date=start_dt, end_date=end_dt, window_days=window, step_days=step
+    with _mining_progress(console, progress_log) as display:
+        miner = GitMiner(
+            repository,
+            ignorer,
+            scopes,
+            commits=sample.hashes if sample is not None else None,
+            aliases=aliases,
+            on_progress=display,
+            checkpoint_every=checkpoint_every,
+            checkpoint_dir=checkpoint_dir,
+            resume=resume,
         )
+        if pipeline:
+            mined = PipelinedAggregator(miner, since=since, until=until).run()
+        else:
+            mined = miner.mine_commit_history()
+    _report_resume(miner, console)
+    return mined
+
+
+def _with_naive_dates(commit_data, trend: bool, console: Console):
+    """Commit rows with tz-naive dates; trend mode cannot run without them."""
+    import pandas as pd
 
-        if trend_df.empty:
+    if "date" not in commit_data.columns:
+        if trend:
+            console.print("\n[bold red]ERROR: Commit dates are missing![/bold red]")
             console.print(
-                "[red]Trend analysis produced no data points. Check date ranges.[/red]"
+                "[yellow]The current GitMiner implementation does not extract commit dates.[/yellow]"
             )
+            raise typer.Exit(code=1)
+        return commit_data
+    commit_data["date"] = pd.to_datetime(commit_data["date"], utc=True)
+    commit_data["date"] = commit_data["date"].dt.tz_localize(None)
+    return commit_data
+
+
+def _filter_dates(commit_data, since: Optional[datetime], until: Optional[datetime]):
+    if "date" in commit_data.columns:
+        if since:
+            commit_data = commit_data[commit_data["date"] >= since]
+        if until:
+            commit_data = commit_data[commit_data["date"] <= until]
+    return commit_data
+
+
+def _author_stats(source, since: Optional[datetime], until: Optional[datetime]):
+    """
+    file | author | total_churn | commits of any analysed source: commit rows
+    or an aggregate (cube, commit table, shard or blame ownership).
+    """
+    import pandas as pd
+    from busfactorpy.core.calculator import BusFactorCalculator
+    from busfactorpy.core.shard import AggregateShard
+
+    if isinstance(source, pd.DataFrame):
+        return BusFactorCalculator(
+            _filter_dates(source, since, until)
+        ).aggregate_author_stats()
+    if isinstance(source, AggregateShard):
+        # Stored shards refuse --since/--until and a pipelined one already
+        # dropped the rows outside them.
+        return source.author_stats()
+    # The cube keeps whole days: --since and --until include both days.
+    # A commit table compares full timestamps, like mined rows.
+    return source.author_stats(since=since, until=until)
+
+
+def _abort_if_empty(frame, console: Console):
+    if frame.empty:
+        console.print("[red]No commits found (possibly due to date filtering).[/red]")
+        raise typer.Exit(code=0)
+
+
+def _scope_results(
+    author_stats, scopes: List[str], calc_kwargs: dict, console: Console
+) -> dict:
+    """Classified results per scope (keyed None without scopes)."""
+    from busfactorpy.core.calculator import BusFactorCalculator
+    from busfactorpy.core.scope import calculate_scopes_from_stats
+
+    if not scopes:
+        calculator = BusFactorCalculator.from_author_stats(author_stats, **calc_kwargs)
+        return {None: calculator.calculate()}
+    if len(scopes) > 1:
+        console.print(
+            f"[bold cyan]Analysing {len(scopes)} scopes in one pass[/bold cyan]"
+        )
+    return dict(calculate_scopes_from_stats(author_stats, scopes, **calc_kwargs))
+
+
+def _estimate_results(
+    commit_data,
+    sample,
+    scopes: List[str],
+    calc_kwargs: dict,
+    n_bootstrap: int,
+    seed: int,
+    console: Console,
+) -> dict:
+    """Results per scope estimated from the sampled commits, with their stability."""
+    from busfactorpy.core.estimate import SampleEstimator
+    from busfactorpy.core.scope import ScopeResolver
+
+    results: dict = {}
+    scope_names: List[Optional[str]] = list(scopes) or [None]
+    for scope_name in scope_names:
+        scope_data = commit_data
+        if scope_name is not None and len(scopes) > 1:
+            scope_data = ScopeResolver([scope_name]).filter(commit_data)
+        estimated, stability = SampleEstimator(
+            scope_data, sample, n_bootstrap=n_bootstrap, seed=seed, **calc_kwargs
+        ).estimate()
+        results[scope_name] = estimated
+        _print_stability(stability, scope_name, console)
+    return results
+
+
+def _run_trend(
+    source,
+    scope: Optional[str],
+    calc_kwargs: dict,
+    start_dt: Optional[datetime],
+    end_dt: datetime,
+    window: int,
+    step: int,
+    chart_worker: ChartWorker,
+    console: Console,
+):
+    """Bus factor over sliding windows of commit rows, a cube or a commit table."""
+    import pandas as pd
+    from busfactorpy.core.trend import TrendAnalyzer
+
+    console.print("[bold magenta]Running Trend Analysis...[/bold magenta]")
+    console.print(f"Window: {window} days | Step: {step} days")
+
+    if not start_dt:
+        if isinstance(source, pd.DataFrame):
+            start_dt = source["date"].min()
         else:
-            console.print("\n[bold]Trend Summary:[/bold]")
-            console.print(trend_df.to_string(index=False))
+            start_dt = source.date_range()[0]
+        console.print(f"Auto-detected start date: {start_dt.date()}")
+
+    trend_df = TrendAnalyzer(source, calc_kwargs, scope=scope).analyze(
+        start_date=start_dt, end_date=end_dt, window_days=window, step_days=step
+    )
+    if trend_df.empty:
+        console.print(
+            "[red]Trend analysis produced no data points. Check date ranges.[/red]"
+        )
+        return
+
+    chart_worker.submit("plot_trend", trend_df)
+    console.print("\n[bold]Trend Summary:[/bold]")
+    console.print(trend_df.to_string(index=False))
 
-            visualizer = BusFactorVisualizer()
-            visualizer.plot_trend(trend_df)
 
+def _report_results(
+    results_by_scope: dict,
+    calc_kwargs: dict,
+    chart_worker: ChartWorker,
+    console: Console,
+    *,
+    repository: str,
+    thresholds: Optional[List[float]],
+    store: Optional[str],
+    n_top: int,
+    output_format: str,
+    output: Optional[str],
+    compression: Optional[str],
+    chunk_size: int,
+):
+    """
+    Stores, charts and prints the results of every scope, or their threshold
+    sweeps, then exports them as one report.
+    """
+    import pandas as pd
+    from busfactorpy.core.analyzer import RiskAnalyzer
+    from busfactorpy.core.ranking import select_top_risks
+
+    multi_scope = len(results_by_scope) > 1
+    result_store = None
+    if store:
+        from busfactorpy.output.store import SQLiteResultStore
+
+        result_store = SQLiteResultStore(store)
+
+    if thresholds is not None:
+        # Every threshold is classified from the same shares; the class
+        # counts per threshold replace the per-file report.
+        results_by_scope = {
+            name: RiskAnalyzer.sweep(df, thresholds)
+            for name, df in results_by_scope.items()
+        }
+        for scope_name, sweep in results_by_scope.items():
+            _print_threshold_sweep(sweep, scope_name, calc_kwargs["threshold"], console)
+            chart_worker.submit(
+                "plot_threshold_sweep",
+                sweep,
+                filename=_chart_filename("threshold_sweep", scope_name, multi_scope),
+            )
     else:
-        filtered_data = commit_data
-        if "date" in filtered_data.columns:
-            if start_dt:
-                filtered_data = filtered_data[filtered_data["date"] >= start_dt]
-            if until:
-                filtered_data = filtered_data[filtered_data["date"] <= end_dt]
-
-        if filtered_data.empty:
-            console.print(
-                "[red]No commits found (possibly due to date filtering).[/red]"
+        for scope_name, bus_factor_results in results_by_scope.items():
+            if result_store is not None:
+                run_id = result_store.append_run(
+                    bus_factor_results,
+                    repository=repository,
+                    scope=scope_name,
+                    **calc_kwargs,
+                )
+                console.print(
+                    f"[bold green]Run {run_id} stored in:[/bold green] {store}"
+                )
+
+            # The chart ranks every file by share, the summary only risky ones;
+            # only the chart columns are shipped to the worker.
+            top_files = select_top_risks(bus_factor_results, n_top, classes=None)
+            chart_worker.submit(
+                "generate_top_n_bar_chart",
+                n_top=n_top,
+                filename=_chart_filename("top_risky_files", scope_name, multi_scope),
+                top_files=top_files[["file", "main_author_share"]],
             )
-            raise typer.Exit(code=0)
 
-        calculator = BusFactorCalculator(
-            filtered_data,
-            metric=metric.lower(),
-            threshold=threshold,
-            group_by=group_by_lower,
-            depth=depth,
+            if output_format == "summary":
+                if multi_scope:
+                    console.print(f"\n[bold]Scope:[/bold] {scope_name}")
+                reporter = ConsoleReporter(bus_factor_results, console=console)
+                reporter.generate_cli_summary(
+                    n_top=n_top,
+                    top_risks=select_top_risks(bus_factor_results, n_top),
+                )
+
+    if result_store is not None:
+        result_store.close()
+
+    if output_format == "summary":
+        return
+    if multi_scope:
+        # One consolidated report; the scope column tells the reports apart.
+        report_df = pd.concat(
+            [df.assign(scope=name) for name, df in results_by_scope.items()],
+            ignore_index=True,
+        )
+        report_df.insert(0, "scope", report_df.pop("scope"))
+    else:
+        report_df = next(iter(results_by_scope.values()))
+
+    try:
+        ConsoleReporter(report_df, console=console).export_report(
+            format=output_format,
+            path=output,
+            compression=compression,
+            chunksize=chunk_size,
         )
-        bus_factor_results = calculator.calculate()
+    except (ImportError, ValueError) as e:
+        console.print(f"[bold red]ERROR exporting report:[/bold red] {e}")
+        chart_worker.join()
+        raise typer.Exit(code=1)
 
-        reporter = ConsoleReporter(bus_factor_results)
 
-        if output_format == "summary":
-            reporter.generate_cli_summary(n_top=n_top)
-        elif output_format in ["csv", "json"]:
-            reporter.export_report(format=output_format)
+@app.command()
+def version():
+    """
+    Exibe a versão instalada do BusFactorPy.
+    """
+    console.print(f"BusFactorPy Versão: [bold green]{__version__}[/bold green]")
+    raise typer.Exit()
+
 
-        visualizer = BusFactorVisualizer()
-        visualizer.generate_top_n_bar_chart(results_df=bus_factor_results, n_top=n_top)
+@app.command()
+def metrics():
+    """
+    Lists the available metrics, including those registered by plugins.
+    """
+    from rich.table import Table
+
+    from busfactorpy.core.metrics import available_metrics
+
+    table = Table(title="Métricas Disponíveis")
+    table.add_column("Métrica", no_wrap=True)
+    table.add_column("Agregados")
+    table.add_column("Fonte")
+    table.add_column("Descrição", overflow="fold")
+    for name, spec in available_metrics().items():
+        table.add_row(name, ", ".join(spec.columns), spec.source, spec.help)
+    console.print(table)
+
+
+@app.command()
+def analyze(
+    ctx: typer.Context,
+    repository: str = typer.Argument(
+        ..., help="Local path or GitHub URL of the repository to analyze."
+    ),
+    output_format: str = typer.Option(
+        "summary",
+        "--format",
+        "-f",
+        help="Output format: summary, csv, json, ndjson, parquet or html.",
+    ),
+    output: Optional[str] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Destination of the exported report (a directory for html). "
+        "Use '-' to stream it to stdout.",
+    ),
+    compression: Optional[str] = typer.Option(
+        None,
+        "--compression",
+        help="Compress the exported report: gzip or zstd (requires zstandard).",
+        case_sensitive=False,
+    ),
+    chunk_size: int = typer.Option(
+        DEFAULT_CHUNK_SIZE,
+        "--chunk-size",
+        help="Rows written per chunk for csv and ndjson exports.",
+    ),
+    n_top: int = typer.Option(
+        10, "--top-n", "-n", help="Number of top risky files to report."
+    ),
+    ignore_file: str = typer.Option(
+        ".busfactorignore",
+        "--ignore-file",
+        help="Path to the exclusion file (default: .busfactorignore).",
+    ),
+    metric: str = _metric_option(),
+    threshold: float = _threshold_option(),
+    group_by: str = _group_by_option(),
+    depth: int = _depth_option(),
+    scope: Optional[List[str]] = typer.Option(
+        None,
+        "--scope",
+        help="Limit analysis to a subdirectory (path relative to repo root). Example: src/ or src/utils. Repeat for one report per scope from a single mining pass.",
+    ),
+    scope_file: Optional[str] = typer.Option(
+        None,
+        "--scope-file",
+        help="File listing scopes, one per line (combined with --scope).",
+    ),
+    aliases: Optional[str] = typer.Option(
+        None,
+        "--aliases",
+        help="File of author aliases: e-mails of one person per line, first one displayed (applied on top of .mailmap).",
+    ),
+    changed_since: Optional[str] = typer.Option(
+        None,
+        "--changed-since",
+        help="Only analyse files changed between this ref and HEAD (git diff base...HEAD), using a cached per-file index.",
+    ),
+    trend: bool = typer.Option(
+        False, "--trend", help="Enable trend analysis mode (evolution over time)."
+    ),
+    since: Optional[str] = typer.Option(
+        None,
+        help="Start date for analysis (YYYY-MM-DD). Defaults to beginning of repo or window calc.",
+    ),
+    until: Optional[str] = typer.Option(
+        None, help="End date for analysis (YYYY-MM-DD). Defaults to today."
+    ),
+    window: int = typer.Option(
+        180, "--window", help="Sliding window size in days for trend analysis."
+    ),
+    step: int = typer.Option(
+        30, "--step", help="Step size in days for trend analysis iteration."
+    ),
+    store: Optional[str] = typer.Option(
+        None,
+        "--store",
+        help="Append the results of this run to a SQLite database (see 'query').",
+    ),
+    charts: bool = typer.Option(
+        True,
+        "--charts/--no-charts",
+        help="Render charts in a background process (disable for headless batch runs).",
+    ),
+    profile: Optional[str] = typer.Option(
+        None,
+        "--profile",
+        help="Write per-stage timings (wall, CPU, rows, peak memory) to this JSON file.",
+    ),
+    profile_memory: bool = typer.Option(
+        False,
+        "--profile-memory",
+        help="Trace allocations with tracemalloc for exact per-stage memory peaks (slower).",
+    ),
+    profile_stage: Optional[str] = typer.Option(
+        None,
+        "--profile-stage",
+        help="Run this stage (e.g. mine.traverse) under cProfile; the dump is written next to the --profile report.",
+    ),
+    progress_log: Optional[str] = typer.Option(
+        None,
+        "--progress-log",
+        help="Append mining progress snapshots (commits, rates, rows, ETA) to this file as JSON lines.",
+    ),
+    checkpoint_every: Optional[int] = typer.Option(
+        None,
+        "--checkpoint-every",
+        help="Save the rows mined so far every N commits, so an interrupted run can --resume.",
+    ),
+    checkpoint_dir: Optional[str] = typer.Option(
+        None,
+        "--checkpoint-dir",
+        help="Directory for the checkpoints (default: derived from the run, in the git dir or the user cache).",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Continue from the last checkpoint of the same run (needs --checkpoint-every).",
+    ),
+    pipeline: bool = typer.Option(
+        False,
+        "--pipeline",
+        help="Aggregate batches in parallel with mining, through a bounded queue (not with --trend).",
+    ),
+    estimate: bool = typer.Option(
+        False,
+        "--estimate",
+        help="Quick estimate from a sample of commits, with bootstrap confidence intervals.",
+    ),
+    sample_size: int = typer.Option(
+        2_000, "--sample-size", help="Commits mined by --estimate."
+    ),
+    sample_strategy: str = typer.Option(
+        "time",
+        "--sample-strategy",
+        help="How --estimate samples commits: uniform, or time (stratified by commit time).",
+        case_sensitive=False,
+    ),
+    bootstrap: int = typer.Option(
+        200, "--bootstrap", help="Bootstrap replicates of --estimate."
+    ),
+    seed: int = typer.Option(0, "--seed", help="Random seed of --estimate."),
+    threshold_sweep: Optional[str] = typer.Option(
+        None,
+        "--threshold-sweep",
+        help="Report the risk class counts at every threshold of start:stop:step (e.g. 0.5:0.95:0.05) instead of the files.",
+    ),
+):
+    """
+    Executes the Bus Factor analysis on a given Git repository.
+    """
+    import pandas as pd
+    from busfactorpy.core.analyzer import parse_threshold_sweep
+    from busfactorpy.core.commit_table import CommitTable
+    from busfactorpy.core.cube import AggregateCube
+    from busfactorpy.core.estimate import SAMPLE_STRATEGIES
+    from busfactorpy.core.scope import load_scopes
+    from busfactorpy.core.shard import AggregateShard
+
+    console = _status_console(output)
+
+    if profile:
+        _start_profiler(ctx, profile, profile_memory, profile_stage, console)
+    elif profile_memory or profile_stage:
+        console.print(
+            "[bold red]--profile-memory and --profile-stage need --profile.[/bold red]"
+        )
+        raise typer.Exit(code=1)
+
+    console.print(f"[bold cyan]Analysing repository:[/bold cyan] {repository}")
+
+    start_dt = _parse_date(since, "--since", console)
+    until_dt = _parse_date(until, "--until", console)
+    end_dt = until_dt or datetime.now()
+
+    metric_spec, group_by_lower = _check_analysis_options(
+        metric, threshold, group_by, depth, console, allow_blame=True
+    )
+
+    thresholds: list[float] | None = None
+    if threshold_sweep:
+        try:
+            thresholds = parse_threshold_sweep(threshold_sweep)
+        except ValueError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            raise typer.Exit(code=1)
+        if trend or store:
+            console.print(
+                "[bold red]--threshold-sweep cannot be combined with --trend "
+                "or --store.[/bold red]"
+            )
+            raise typer.Exit(code=1)
+        if output_format.lower() == "html":
+            # The exported sweep is a per-threshold table, not per-file results.
+            console.print(
+                "[bold red]--threshold-sweep cannot be exported as html; use "
+                "csv, json, ndjson or parquet.[/bold red]"
+            )
+            raise typer.Exit(code=1)
+
+    output_format = output_format.lower()
+    if output_format not in {"summary", *EXPORT_FORMATS}:
+        console.print(
+            f"[bold red]Invalid format:[/bold red] {output_format}. "
+            f"Valid options: summary, {', '.join(EXPORT_FORMATS)}"
+        )
+        raise typer.Exit(code=1)
+
+    if compression is not None:
+        compression = compression.lower()
+        if compression not in COMPRESSIONS:
+            console.print(
+                f"[bold red]Invalid compression:[/bold red] {compression}. "
+                f"Valid options: {', '.join(COMPRESSIONS)}"
+            )
+            raise typer.Exit(code=1)
+
+    _check_checkpoint_options(checkpoint_every, resume, console)
+
+    if chunk_size < 1:
+        console.print(
+            f"[bold red]Invalid chunk size:[/bold red] {chunk_size}. Must be >= 1."
+        )
+        raise typer.Exit(code=1)
+
+    try:
+        scopes = load_scopes(scope, scope_file)
+    except OSError as e:
+        console.print(f"[bold red]ERROR loading scope file:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    if trend and len(scopes) > 1:
+        console.print("[bold red]--trend supports a single scope.[/bold red]")
+        raise typer.Exit(code=1)
+
+    if estimate:
+        if trend or changed_since or pipeline or not os.path.isdir(repository):
+            console.print(
+                "[bold red]--estimate needs a local repository and cannot be "
+                "combined with --trend, --changed-since or --pipeline.[/bold red]"
+            )
+            raise typer.Exit(code=1)
+        if sample_size < 1 or bootstrap < 1:
+            console.print(
+                "[bold red]--sample-size and --bootstrap must be >= 1.[/bold red]"
+            )
+            raise typer.Exit(code=1)
+        if sample_strategy.lower() not in SAMPLE_STRATEGIES:
+            console.print(
+                f"[bold red]Invalid sample strategy:[/bold red] {sample_strategy}. "
+                f"Valid options: {', '.join(SAMPLE_STRATEGIES)}"
+            )
+            raise typer.Exit(code=1)
+
+    if pipeline and (trend or changed_since):
+        console.print(
+            "[bold red]--pipeline aggregates while mining and cannot be combined "
+            "with --trend or --changed-since.[/bold red]"
+        )
+        raise typer.Exit(code=1)
+
+    blame = metric_spec.source == "blame"
+    if blame and (
+        trend
+        or since
+        or until
+        or changed_since
+        or estimate
+        or pipeline
+        or not os.path.isdir(repository)
+        or AggregateCube.is_cube(repository)
+        or CommitTable.is_table(repository)
+        or AggregateShard.is_shard(repository)
+    ):
+        console.print(
+            "[bold red]--metric blame reads the ownership at HEAD of a local "
+            "repository and cannot be combined with --trend, --since, --until, "
+            "--changed-since, --estimate or --pipeline.[/bold red]"
+        )
+        raise typer.Exit(code=1)
+
+    if changed_since and (trend or not os.path.isdir(repository)):
+        console.print(
+            "[bold red]--changed-since needs a local repository and cannot be "
+            "combined with --trend.[/bold red]"
+        )
+        raise typer.Exit(code=1)
+
+    # Each source is loaded as commit rows or an aggregate, then goes through
+    # the same author stats, scope and report steps.
+    sample = None
+    source = _load_stored(repository, bool(trend or since or until), console)
+    if source is None:
+        ignorer = _load_ignorer(ignore_file, console)
+        try:
+            if blame:
+                source = _load_blame(repository, ignorer, scopes, aliases, console)
+            elif changed_since:
+                source = _changed_files_history(
+                    repository, changed_since, ignorer, scopes, console, aliases
+                )
+            else:
+                if estimate:
+                    sample = _draw_sample(
+                        repository,
+                        sample_size,
+                        sample_strategy.lower(),
+                        seed,
+                        start_dt,
+                        until_dt,
+                        console,
+                    )
+                source = _mine_commits(
+                    repository,
+                    ignorer,
+                    scopes,
+                    console,
+                    aliases=aliases,
+                    sample=sample,
+                    pipeline=pipeline,
+                    since=start_dt,
+                    until=until_dt,
+                    progress_log=progress_log,
+                    checkpoint_every=checkpoint_every,
+                    checkpoint_dir=checkpoint_dir,
+                    resume=resume,
+                )
+            if isinstance(source, pd.DataFrame):
+                source = _with_naive_dates(source, trend, console)
+        except Exception as e:
+            console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+            raise typer.Exit(code=1)
+
+    if len(source) == 0:
+        console.print("[yellow]No commit data found. Analysis aborted.[/yellow]")
+        raise typer.Exit(code=0)
+
+    chart_worker = ChartWorker(enabled=charts, console=console)
+    calc_kwargs: dict[str, Any] = {
+        "metric": metric.lower(),
+        "threshold": threshold,
+        "group_by": group_by_lower,
+        "depth": depth,
+    }
+
+    if trend:
+        _run_trend(
+            source,
+            scopes[0] if scopes else None,
+            calc_kwargs,
+            start_dt,
+            end_dt,
+            window,
+            step,
+            chart_worker,
+            console,
+        )
+    else:
+        if sample is not None:
+            commit_data = _filter_dates(source, start_dt, until_dt)
+            _abort_if_empty(commit_data, console)
+            results_by_scope = _estimate_results(
+                commit_data, sample, scopes, calc_kwargs, bootstrap, seed, console
+            )
+        else:
+            author_stats = _author_stats(source, start_dt, until_dt)
+            _abort_if_empty(author_stats, console)
+            results_by_scope = _scope_results(
+                author_stats, scopes, calc_kwargs, console
+            )
+
+        _report_results(
+            results_by_scope,
+            calc_kwargs,
+            chart_worker,
+            console,
+            repository=repository,
+            thresholds=thresholds,
+            store=store,
+            n_top=n_top,
+            output_format=output_format,
+            output=output,
+            compression=compression,
+            chunk_size=chunk_size,
+        )
+
+    chart_worker.join()
+
+
+@app.command()
+def cube(
+    repository: str = typer.Argument(
+        ..., help="Local path or GitHub URL of the repository to mine."
+    ),
+    output: str = typer.Argument(..., help="Directory where the cube is written."),
+    ignore_file: str = typer.Option(
+        ".busfactorignore",
+        "--ignore-file",
+        help="Path to the exclusion file (default: .busfactorignore).",
+    ),
+):
+    """
+    Mines the repository once into an on-disk file x author x day cube.
+    'analyze' accepts the cube directory in place of the repository.
+    """
+    from busfactorpy.core.cube import AggregateCube
+
+    console.print(f"[bold cyan]Analysing repository:[/bold cyan] {repository}")
+    try:
+        commit_data = GitMiner(
+            repository, BusFactorIgnore(ignore_file)
+        ).mine_commit_history()
+        aggregate_cube = AggregateCube.from_commits(commit_data)
+    except Exception as e:
+        console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    aggregate_cube.save(output)
+    console.print(
+        f"[bold green]Cube saved to:[/bold green] {output} "
+        f"({len(aggregate_cube)} rows from {len(commit_data)} modifications)"
+    )
+
+
+@app.command("mine-table")
+def mine_table(
+    repository: str = typer.Argument(
+        ..., help="Local path or GitHub URL of the repository to mine."
+    ),
+    output: str = typer.Argument(
+        ..., help="Directory where the commit table is written."
+    ),
+    ignore_file: str = typer.Option(
+        ".busfactorignore",
+        "--ignore-file",
+        help="Path to the exclusion file (default: .busfactorignore).",
+    ),
+    aliases: Optional[str] = typer.Option(
+        None, "--aliases", help="File of author aliases (see 'analyze --aliases')."
+    ),
+    batch_rows: int = typer.Option(
+        500_000,
+        "--batch-rows",
+        help="Mined rows held in memory before they are written to disk.",
+    ),
+    progress_log: Optional[str] = typer.Option(
+        None,
+        "--progress-log",
+        help="Append mining progress snapshots to this file as JSON lines.",
+    ),
+    checkpoint_every: Optional[int] = typer.Option(
+        None,
+        "--checkpoint-every",
+        help="Save the rows mined so far every N commits, so an interrupted run can --resume.",
+    ),
+    checkpoint_dir: Optional[str] = typer.Option(
+        None,
+        "--checkpoint-dir",
+        help="Directory for the checkpoints (default: derived from the run, in the git dir or the user cache).",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Continue from the last checkpoint of the same run (needs --checkpoint-every).",
+    ),
+):
+    """
+    Mines the repository into an on-disk, memory-mapped commit table, for
+    histories too large for memory. 'analyze' accepts the table directory in
+    place of the repository.
+    """
+    from busfactorpy.core.commit_table import CommitTable
+
+    _check_checkpoint_options(checkpoint_every, resume, console)
+
+    if batch_rows < 1:
+        console.print(
+            f"[bold red]Invalid batch size:[/bold red] {batch_rows}. Must be >= 1."
+        )
+        raise typer.Exit(code=1)
+
+    console.print(f"[bold cyan]Analysing repository:[/bold cyan] {repository}")
+    try:
+        with _mining_progress(console, progress_log) as display:
+            miner = GitMiner(
+                repository,
+                BusFactorIgnore(ignore_file),
+                aliases=aliases,
+                on_progress=display,
+                checkpoint_every=checkpoint_every,
+                checkpoint_dir=checkpoint_dir,
+                resume=resume,
+            )
+            table = CommitTable.mine(miner, output, batch_rows=batch_rows)
+        _report_resume(miner, console)
+    except Exception as e:
+        console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    console.print(
+        f"[bold green]Commit table saved to:[/bold green] {output} "
+        f"({len(table)} modifications, {len(table.commit_hashes)} commits)"
+    )
+
+
+@app.command("mine-shard")
+def mine_shard(
+    repository: str = typer.Argument(
+        ..., help="Local path or GitHub URL of the repository to mine."
+    ),
+    output: str = typer.Argument(..., help="Directory where the shard is written."),
+    commit_range: str = typer.Option(
+        ...,
+        "--range",
+        help="git revision range of this shard, e.g. 'v1.0..v2.0' (a single ref mines its whole history).",
+    ),
+    ignore_file: str = typer.Option(
+        ".busfactorignore",
+        "--ignore-file",
+        help="Path to the exclusion file (default: .busfactorignore).",
+    ),
+):
+    """
+    Mines one commit range into a partial (file, author) aggregate that
+    'merge' combines with the shards of the other ranges.
+    """
+    from busfactorpy.core.shard import AggregateShard
+
+    console.print(
+        f"[bold cyan]Mining shard[/bold cyan] {commit_range} [bold cyan]of[/bold cyan] {repository}"
+    )
+    try:
+        miner = GitMiner(
+            repository, BusFactorIgnore(ignore_file), commit_range=commit_range
+        )
+        commit_data = miner.mine_commit_history()
+        shard = AggregateShard.from_commits(
+            commit_data, miner.mined_commits or [], commit_range
+        )
+    except Exception as e:
+        console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    shard.save(output)
+    console.print(
+        f"[bold green]Shard saved to:[/bold green] {output} "
+        f"({len(shard.commit_hashes)} commits, {len(shard)} file/author pairs)"
+    )
+
+
+@app.command()
+def merge(
+    shards: List[str] = typer.Argument(..., help="Shard directories to combine."),
+    output: str = typer.Option(
+        ..., "--output", "-o", help="Directory where the merged shard is written."
+    ),
+):
+    """
+    Combines shards written by 'mine-shard' (or earlier merges) into one.
+    'analyze' accepts the merged directory in place of the repository.
+    """
+    from busfactorpy.core.shard import AggregateShard
+
+    try:
+        merged = AggregateShard.merge(AggregateShard.load(path) for path in shards)
+    except ValueError as e:
+        console.print(f"[bold red]ERROR merging shards:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    merged.save(output)
+    console.print(
+        f"[bold green]Merged {len(shards)} shards into:[/bold green] {output} "
+        f"({len(merged.commit_hashes)} commits, {len(merged)} file/author pairs)"
+    )
+
+
+def _load_author_stats(repository: str, ignore_file: str, scope: Optional[str]):
+    """
+    file | author | total_churn | commits of a repository, or of a cube,
+    commit table or merged shard directory without mining.
+    """
+    from busfactorpy.core.calculator import BusFactorCalculator
+    from busfactorpy.core.commit_table import CommitTable
+    from busfactorpy.core.cube import AggregateCube
+    from busfactorpy.core.shard import AggregateShard
+
+    if AggregateCube.is_cube(repository):
+        return AggregateCube.load(repository).author_stats(scope=scope)
+    if CommitTable.is_table(repository):
+        return CommitTable.load(repository).author_stats(scope=scope)
+    if AggregateShard.is_shard(repository):
+        return AggregateShard.load(repository).author_stats(scope=scope)
+
+    commit_data = GitMiner(
+        repository, BusFactorIgnore(ignore_file), scope
+    ).mine_commit_history()
+    return BusFactorCalculator(commit_data).aggregate_author_stats()
+
+
+def _read_scenarios(remove_author: Optional[List[str]], scenario_file: Optional[str]):
+    """
+    Scenarios as lists of authors: one from --remove-author, plus one per
+    line of the scenario file (comma-separated, '#' starts a comment).
+    """
+    scenarios = [list(remove_author)] if remove_author else []
+    if scenario_file:
+        with open(scenario_file, encoding="utf-8") as f:
+            for line in f:
+                authors = [a.strip() for a in line.split("#", 1)[0].split(",")]
+                authors = [a for a in authors if a]
+                if authors:
+                    scenarios.append(authors)
+    return scenarios
+
+
+@app.command()
+def simulate(
+    repository: str = typer.Argument(
+        ..., help="Local path or GitHub URL of the repository (or a cube/merged shard)."
+    ),
+    remove_author: Optional[List[str]] = typer.Option(
+        None, "--remove-author", help="Author e-mail to remove. Repeat for several."
+    ),
+    scenario_file: Optional[str] = typer.Option(
+        None,
+        "--scenario-file",
+        help="File with one scenario per line: comma-separated author e-mails.",
+    ),
+    output_format: str = typer.Option(
+        "summary",
+        "--format",
+        "-f",
+        help="Output format: summary, csv, json, ndjson or parquet.",
+    ),
+    output: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Destination of the exported report."
+    ),
+    n_top: int = typer.Option(
+        10, "--top-n", "-n", help="Number of affected files to list per scenario."
+    ),
+    ignore_file: str = typer.Option(
+        ".busfactorignore",
+        "--ignore-file",
+        help="Path to the exclusion file (default: .busfactorignore).",
+    ),
+    metric: str = _metric_option(),
+    threshold: float = _threshold_option(),
+    group_by: str = _group_by_option(),
+    depth: int = _depth_option(),
+    scope: Optional[str] = typer.Option(
+        None, "--scope", help="Limit the simulation to a subdirectory."
+    ),
+):
+    """
+    Shows which files become orphaned or Critical if the given authors leave.
+    """
+    from busfactorpy.core.simulation import AuthorRemovalSimulator
+
+    console = _status_console(output)
+
+    try:
+        scenarios = _read_scenarios(remove_author, scenario_file)
+    except OSError as e:
+        console.print(f"[bold red]ERROR loading scenario file:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    if not scenarios:
+        console.print(
+            "[bold red]Give at least one --remove-author or a --scenario-file.[/bold red]"
+        )
+        raise typer.Exit(code=1)
+
+    output_format = output_format.lower()
+    if output_format not in {"summary", *EXPORT_FORMATS}:
+        console.print(
+            f"[bold red]Invalid format:[/bold red] {output_format}. "
+            f"Valid options: summary, {', '.join(EXPORT_FORMATS)}"
+        )
+        raise typer.Exit(code=1)
+
+    _, group_by = _check_analysis_options(metric, threshold, group_by, depth, console)
+
+    console.print(f"[bold cyan]Analysing repository:[/bold cyan] {repository}")
+    try:
+        author_stats = _load_author_stats(repository, ignore_file, scope)
+    except Exception as e:
+        console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    try:
+        simulator = AuthorRemovalSimulator(
+            author_stats,
+            metric=metric,
+            threshold=threshold,
+            group_by=group_by,
+            depth=depth,
+        )
+    except ValueError as e:
+        console.print(f"[bold red]ERROR:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    results = []
+    for authors in scenarios:
+        name = ", ".join(authors)
+        try:
+            comparison = simulator.simulate(authors)
+        except ValueError as e:
+            console.print(f"[bold red]ERROR in scenario {name}:[/bold red] {e}")
+            raise typer.Exit(code=1)
+
+        if output_format == "summary":
+            ConsoleReporter(comparison, console=console).generate_simulation_summary(
+                name, n_top=n_top
+            )
+        results.append(comparison.assign(scenario=name))
+
+    if output_format != "summary":
+        import pandas as pd
+
+        report_df = pd.concat(results, ignore_index=True)
+        report_df.insert(0, "scenario", report_df.pop("scenario"))
+        try:
+            ConsoleReporter(report_df, console=console).export_report(
+                format=output_format, path=output
+            )
+        except (ImportError, ValueError) as e:
+            console.print(f"[bold red]ERROR exporting report:[/bold red] {e}")
+            raise typer.Exit(code=1)
+
+
+@app.command("analyze-many")
+def analyze_many(
+    repository_list: str = typer.Argument(
+        ..., help="File listing repositories (paths or URLs), one per line."
+    ),
+    concurrency: int = typer.Option(
+        4, "--concurrency", "-j", help="Repositories cloned/analysed at the same time."
+    ),
+    output_format: str = typer.Option(
+        "csv",
+        "--format",
+        "-f",
+        help="Format of the consolidated table: csv, json, ndjson, parquet or html.",
+    ),
+    output: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Destination of the consolidated table."
+    ),
+    ignore_file: str = typer.Option(
+        ".busfactorignore",
+        "--ignore-file",
+        help="Path to the exclusion file (default: .busfactorignore).",
+    ),
+    metric: str = _metric_option(),
+    threshold: float = _threshold_option(),
+    group_by: str = _group_by_option(),
+    depth: int = _depth_option(),
+):
+    """
+    Analyses many repositories concurrently into one consolidated table.
+    """
+    from busfactorpy.core.multi_repo import MultiRepoAnalyzer, read_repository_list
+
+    console = _status_console(output)
+
+    output_format = output_format.lower()
+    if output_format not in EXPORT_FORMATS:
+        console.print(
+            f"[bold red]Invalid format:[/bold red] {output_format}. "
+            f"Valid options: {', '.join(EXPORT_FORMATS)}"
+        )
+        raise typer.Exit(code=1)
+
+    # Fail fast on invalid parameters instead of once per repository.
+    _, group_by = _check_analysis_options(metric, threshold, group_by, depth, console)
+
+    try:
+        repositories = read_repository_list(repository_list)
+        analyzer = MultiRepoAnalyzer(
+            repositories,
+            concurrency=concurrency,
+            ignore_file=ignore_file,
+            metric=metric,
+            threshold=threshold,
+            group_by=group_by,
+            depth=depth,
+            on_done=lambda repo, error: console.print(
+                f"[bold red]FAILED[/bold red] {repo}: {error}"
+                if error
+                else f"[bold green]done[/bold green] {repo}"
+            ),
+        )
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]ERROR:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    console.print(
+        f"[bold cyan]Analysing {len(repositories)} repositories[/bold cyan] "
+        f"(concurrency {concurrency})"
+    )
+    results, failures = analyzer.run()
+
+    if not results.empty:
+        try:
+            ConsoleReporter(results, console=console).export_report(
+                format=output_format, path=output
+            )
+        except (ImportError, ValueError) as e:
+            console.print(f"[bold red]ERROR exporting report:[/bold red] {e}")
+            raise typer.Exit(code=1)
+
+    console.print(
+        f"{len(repositories) - len(failures)} of {len(repositories)} repositories analysed."
+    )
+    if not failures.empty:
+        console.print("[bold red]Failures:[/bold red]")
+        console.print(failures.to_string(index=False))
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def branches(
+    repository: str = typer.Argument(
+        ..., help="Local path or GitHub URL of the repository."
+    ),
+    ref: List[str] = typer.Option(
+        ...,
+        "--ref",
+        "-r",
+        help="Branch, tag or glob pattern such as 'release/*'. Repeat to compare several refs.",
+    ),
+    output_format: str = typer.Option(
+        "csv",
+        "--format",
+        "-f",
+        help="Format of the consolidated table: csv, json, ndjson, parquet or html.",
+    ),
+    output: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Destination of the consolidated table."
+    ),
+    ignore_file: str = typer.Option(
+        ".busfactorignore",
+        "--ignore-file",
+        help="Path to the exclusion file (default: .busfactorignore).",
+    ),
+    metric: str = _metric_option(),
+    threshold: float = _threshold_option(),
+    group_by: str = _group_by_option(),
+    depth: int = _depth_option(),
+    scope: Optional[str] = typer.Option(
+        None, "--scope", help="Limit the analysis to a subdirectory."
+    ),
+    aliases: Optional[str] = typer.Option(
+        None, "--aliases", help="File of author aliases (see 'analyze --aliases')."
+    ),
+):
+    """
+    Compares several branches in one run, mining their shared history once.
+    """
+    from rich.table import Table
+    from busfactorpy.core.refs import MultiRefAnalyzer
+
+    console = _status_console(output)
+
+    output_format = output_format.lower()
+    if output_format not in EXPORT_FORMATS:
+        console.print(
+            f"[bold red]Invalid format:[/bold red] {output_format}. "
+            f"Valid options: {', '.join(EXPORT_FORMATS)}"
+        )
+        raise typer.Exit(code=1)
+
+    _, group_by = _check_analysis_options(metric, threshold, group_by, depth, console)
+
+    try:
+        analyzer = MultiRefAnalyzer(
+            repository,
+            ref,
+            ignore_file=ignore_file,
+            scope=scope,
+            aliases=aliases,
+            metric=metric,
+            threshold=threshold,
+            group_by=group_by,
+            depth=depth,
+        )
+        console.print(f"[bold cyan]Mining refs:[/bold cyan] {', '.join(ref)}")
+        results = analyzer.run()
+    except Exception as e:
+        console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    summary = analyzer.summary()
+    table = Table(title="Resumo por Branch")
+    table.add_column("Ref")
+    table.add_column("Commits", justify="right")
+    table.add_column("Arquivos", justify="right")
+    table.add_column("Critical", justify="right")
+    table.add_column("High", justify="right")
+    for row in summary.itertuples(index=False):
+        table.add_row(
+            row.ref,
+            str(row.commits),
+            str(row.files),
+            str(row.critical),
+            str(row.high),
+        )
+    console.print(table)
+    console.print(
+        f"{len(analyzer.miner.mined_commits or [])} distinct commits mined "
+        f"for {sum(summary['commits'])} ref commits."
+    )
+
+    if not results.empty:
+        try:
+            ConsoleReporter(results, console=console).export_report(
+                format=output_format, path=output
+            )
+        except (ImportError, ValueError) as e:
+            console.print(f"[bold red]ERROR exporting report:[/bold red] {e}")
+            raise typer.Exit(code=1)
+
+
+@app.command()
+def authors(
+    repository: str = typer.Argument(
+        ..., help="Local path or GitHub URL of the repository."
+    ),
+    aliases: Optional[str] = typer.Option(
+        None, "--aliases", help="File of author aliases (see 'analyze --aliases')."
+    ),
+):
+    """
+    Lists the authors after .mailmap and alias resolution, with their IDs.
+    """
+    from rich.table import Table
+
+    try:
+        miner = GitMiner(repository, None, aliases=aliases)
+        miner.mine_commit_history()
+    except Exception as e:
+        console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    assert miner.identity is not None
+    table = Table(title="Autores")
+    table.add_column("ID", justify="right")
+    table.add_column("E-mail")
+    table.add_column("Nome")
+    table.add_column("Aliases", overflow="fold")
+    for row in miner.identity.table().itertuples(index=False):
+        table.add_row(str(row.author_id), row.email, row.name or "", row.aliases)
+    console.print(table)
+
+
+@app.command()
+def query(
+    database: str = typer.Argument(
+        ..., help="SQLite database written by 'analyze --store'."
+    ),
+    file: Optional[str] = typer.Option(
+        None, "--file", help="Show the history of a file (or directory key)."
+    ),
+    risk: Optional[str] = typer.Option(
+        None, "--risk", help="List files in a risk class: Critical, High, Medium, Low."
+    ),
+    run: Optional[int] = typer.Option(
+        None, "--run", help="Run id used with --risk. Defaults to the latest run."
+    ),
+    repository: Optional[str] = typer.Option(
+        None,
+        "--repository",
+        help="With --file, only runs of this repository (default: that of the file's latest run).",
+    ),
+    metric: Optional[str] = typer.Option(
+        None,
+        "--metric",
+        "-m",
+        help="With --file, only runs of this metric (default: that of the file's latest run).",
+    ),
+    scope: Optional[str] = typer.Option(
+        None,
+        "--scope",
+        help="With --file, only runs of this scope (default: that of the file's latest run).",
+    ),
+    group_by: Optional[str] = typer.Option(
+        None,
+        "--group-by",
+        "-g",
+        help="With --file, only runs grouped this way (default: that of the file's latest run).",
+    ),
+):
+    """
+    Queries the history of stored runs. Without options, lists the runs.
+    """
+    from busfactorpy.output.store import SQLiteResultStore
+
+    if not os.path.exists(database):
+        console.print(f"[bold red]Database not found:[/bold red] {database}")
+        raise typer.Exit(code=1)
+
+    valid_risks = {"Critical", "High", "Medium", "Low"}
+    if risk is not None:
+        risk = risk.capitalize()
+        if risk not in valid_risks:
+            console.print(
+                f"[bold red]Invalid risk class:[/bold red] {risk}. "
+                f"Valid options: {', '.join(sorted(valid_risks))}"
+            )
+            raise typer.Exit(code=1)
+
+    with SQLiteResultStore(database) as result_store:
+        if file:
+            settings = result_store.history_settings(
+                file,
+                repository=repository,
+                metric=metric.lower() if metric else None,
+                scope=scope,
+                group_by=group_by.lower() if group_by else None,
+            )
+            if settings is None:
+                console.print(f"[yellow]No stored results for:[/yellow] {file}")
+                raise typer.Exit(code=0)
+            history = result_store.file_history(file, **settings)
+
+            described = ", ".join(
+                f"{key}={value}" for key, value in settings.items() if value is not None
+            )
+            console.print(f"[bold]History of[/bold] {file} ({described})")
+            console.print(history.to_string(index=False))
+
+            current = history["risk_class"].iloc[-1]
+            since = result_store.became(file, current, **settings)
+            if since is not None:
+                console.print(
+                    f"{current} since run {since['run_id']} ({since['created_at']})"
+                )
+
+        elif risk:
+            files = result_store.files_with_risk(risk, run_id=run)
+            if files.empty:
+                console.print(f"[yellow]No {risk} files in the selected run.[/yellow]")
+                raise typer.Exit(code=0)
+            console.print(files.to_string(index=False))
+
+        else:
+            runs = result_store.runs()
+            if runs.empty:
+                console.print("[yellow]No runs stored yet.[/yellow]")
+                raise typer.Exit(code=0)
+            console.print(runs.to_string(index=False))
+
+
+BATCH_QUERY_KEYS = {
+    "name",
+    "metric",
+    "threshold",
+    "group_by",
+    "depth",
+    "scope",
+    "since",
+    "until",
+    "format",
+    "top_n",
+}
+
+
+def _load_batch_config(path: str) -> dict:
+    """Reads a batch file; .json files are parsed as JSON, anything else as YAML."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            import json
+
+            return json.load(f)
+
+        import yaml
+
+        return yaml.safe_load(f) or {}
+
+
+@app.command()
+def batch(
+    config: str = typer.Argument(
+        ..., help="YAML (or JSON) file with the repository and a list of queries."
+    ),
+):
+    """
+    Runs many analyses against a single mining pass of the repository.
+    """
+    from busfactorpy.core.session import AnalysisSession
+
+    try:
+        settings = _load_batch_config(config)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]ERROR loading batch file:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    queries = settings.get("queries") or []
+    if not queries:
+        console.print("[yellow]No queries found in the batch file.[/yellow]")
+        raise typer.Exit(code=0)
+    if not isinstance(queries, list):
+        console.print(
+            "[bold red]ERROR loading batch file:[/bold red] 'queries' must be a list."
+        )
+        raise typer.Exit(code=1)
+
+    session_path = settings.get("session")
+    try:
+        if session_path and os.path.exists(session_path):
+            console.print(f"[bold cyan]Loading session:[/bold cyan] {session_path}")
+            session = AnalysisSession.load(session_path)
+        else:
+            repository = settings.get("repository", ".")
+            console.print(f"[bold cyan]Analysing repository:[/bold cyan] {repository}")
+            session = AnalysisSession.from_repository(
+                repository, ignore_file=settings.get("ignore_file", ".busfactorignore")
+            )
+            if session_path:
+                session.save(session_path)
+    except Exception as e:
+        console.print(f"[bold red]ERROR during mining:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    output_dir = settings.get("output_dir", "reports/batch")
+    failures = 0
+
+    for i, spec in enumerate(queries, start=1):
+        if not isinstance(spec, dict):
+            console.print(
+                f"\n[bold red]ERROR in query {i}:[/bold red] expected a mapping of "
+                f"query keys, got {type(spec).__name__}."
+            )
+            failures += 1
+            continue
+
+        spec = dict(spec)
+        name = str(spec.get("name", f"query-{i}"))
+        unknown = set(spec) - BATCH_QUERY_KEYS
+        output_format = str(spec.pop("format", "summary")).lower()
+        spec.pop("name", None)
+
+        console.print(f"\n[bold magenta]Query {name}[/bold magenta]")
+        if unknown:
+            console.print(
+                f"[bold red]Unknown query keys:[/bold red] {', '.join(sorted(unknown))}"
+            )
+            failures += 1
+            continue
+
+        try:
+            n_top = int(spec.pop("top_n", 10))
+            results = session.query(**spec)
+            reporter = ConsoleReporter(results, console=console)
+            if output_format == "summary":
+                reporter.generate_cli_summary(n_top=n_top)
+            else:
+                os.makedirs(output_dir, exist_ok=True)
+                reporter.export_report(
+                    format=output_format,
+                    path=os.path.join(output_dir, f"{name}.{output_format}"),
+                )
+        except (ImportError, ValueError, TypeError) as e:
+            console.print(f"[bold red]ERROR in query {name}:[/bold red] {e}")
+            failures += 1
+
+    if failures:
+        console.print(
+            f"[bold red]{failures} of {len(queries)} queries failed.[/bold red]"
+        )
+        raise typer.Exit(code=1)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,33 @@
+RISK_CLASSES = ("Critical", "High", "Medium", "Low")
+# Upper bound on the thresholds of a sweep (a 0.001 step over [0, 1]).
+MAX_SWEEP_THRESHOLDS = 1001
+
+
+def parse_threshold_sweep(spec: str) -> list[float]:
+    """
+    Parses a start:stop:step range of thresholds (stop included), e.g.
+    "0.5:0.95:0.05" -> [0.5, 0.55, ..., 0.95].
+    """
+    try:
+        start, stop, step = (float(part) for part in spec.split(":"))
+    except ValueError:
+        raise ValueError(
+            f"Invalid threshold sweep '{spec}'. Use start:stop:step, e.g. 0.5:0.95:0.05."
+        )
+    if not (0.0 < start <= stop <= 1.0) or step <= 0:
+        raise ValueError(
+            "A threshold sweep needs 0 < start <= stop <= 1 and a positive step."
+        )
+    # Rounded so that 0.5 + 9 * 0.05 lands on 0.95 and not next to it.
+    count = int(round((stop - start) / step, 9)) + 1
+    if count > MAX_SWEEP_THRESHOLDS:
+        raise ValueError(
+            f"A threshold sweep is limited to {MAX_SWEEP_THRESHOLDS} thresholds "
+            f"('{spec}' has {count}); use a larger step."
+        )
+    return [round(start + i * step, 10) for i in range(count)]
+
+
 class RiskAnalyzer:
     """
     Classifies files into risk levels based on Bus Factor metrics.
@@ -30,3 +60,80 @@ class RiskAnalyzer:
             return "Medium"
         else:
             return "Low"
+
+    @staticmethod
+    def classify_array(n_authors, shares, threshold=0.8):
+        """
+        Vectorized classify_risk: the arguments are broadcast against each
+        other, so e.g. a column of thresholds classifies a whole grid.
+
+        Returns:
+            A NumPy array of risk classes with the broadcast shape.
+        """
+        import numpy as np
+
+        n_authors = np.asarray(n_authors)
+        shares = np.asarray(shares, dtype=float)
+        threshold = np.asarray(threshold, dtype=float)
+        medium_threshold = np.round(threshold * 0.75, 4)
+        return np.select(
+            [n_authors == 1, shares >= threshold, shares >= medium_threshold],
+            ["Critical", "High", "Medium"],
+            "Low",
+        )
+
+    @staticmethod
+    def classify_frame(result, threshold: float = 0.8):
+        """
+        Classifies every row of a metric frame (n_authors, main_author_share).
+
+        Returns:
+            A Series of risk classes aligned with the frame's index.
+        """
+        return result.apply(
+            lambda row: RiskAnalyzer.classify_risk(
+                n_authors=row["n_authors"],
+                share=row["main_author_share"],
+                threshold=threshold,
+            ),
+            axis=1,
+        )
+
+    @staticmethod
+    def sweep(result, thresholds):
+        """
+        Counts the risk classes of a metric frame at every threshold, with
+        the rules of classify_risk. The shares are sorted once and counted
+        per threshold with a binary search, so no thresholds x rows grid is
+        built.
+
+        Returns:
+            A DataFrame: threshold | Critical | High | Medium | Low.
+        """
+        import numpy as np
+        import pandas as pd
+
+        thresholds = np.asarray(thresholds, dtype=float)
+        n_authors = result["n_authors"].to_numpy()
+        shares = result["main_author_share"].to_numpy(dtype=float)
+
+        single = n_authors == 1
+        others = shares[~single]
+        # NaN shares compare False with every threshold: always Low.
+        ranked = np.sort(others[~np.isnan(others)])
+
+        def at_least(values):
+            return len(ranked) - np.searchsorted(ranked, values, side="left")
+
+        high = at_least(thresholds)
+        medium = at_least(np.round(thresholds * 0.75, 4)) - high
+        critical = np.full(len(thresholds), int(single.sum()))
+        return pd.DataFrame(
+            {
+                "threshold": thresholds,
+                "Critical": critical,
+                "High": high,
+                "Medium": medium,
+                "Low": len(others) - high - medium,
+            }
+        )
@@ -0,0 +1,291 @@
+"""
+Current ownership from `git blame`, for `analyze --metric blame`.
+
+Every file at HEAD is blamed with `git blame --line-porcelain` in a process
+pool, and the lines that survive are counted per author: the top author's
+share of a file is the share of its current lines they wrote, whatever the
+churn that led there.
+
+Blaming is by far the slow part, so the counts are cached in the git
+directory, keyed by the file's blob SHA (and path, since blame follows the
+path's history): a file whose content did not change since the last run is
+never blamed again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterable
+
+import pandas as pd
+
+from .identity import AuthorIdentity
+from .profiling import stage
+from .scope import ScopeResolver
+
+if TYPE_CHECKING:
+    from .ignore import BusFactorIgnore
+
+CACHE_KIND = "busfactorpy-blame-cache"
+
+# Relative to the repository's git directory, like the file index.
+CACHE_FILE = os.path.join("busfactorpy", "blame-cache.json")
+
+# (surviving lines, commits with surviving lines) per author e-mail.
+BlameCounts = tuple[dict[str, int], dict[str, int]]
+
+
+def _git(repo_path: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        check=True,
+    ).stdout
+
+
+def parse_line_porcelain(output: str) -> BlameCounts:
+    """
+    Counts the lines and distinct commits of every author in the output of
+    `git blame --line-porcelain`, where each line of the file is a header
+    (`<sha> <orig line> <final line>`), its commit's fields and the content
+    prefixed by a tab.
+    """
+    lines: Counter[str] = Counter()
+    commits: dict[str, set[str]] = {}
+    sha = ""
+    expect_header = True
+    for line in output.split("\n"):
+        if expect_header:
+            sha = line.split(" ", 1)[0]
+            expect_header = False
+        elif line.startswith("\t"):
+            expect_header = True
+        elif line.startswith("author-mail "):
+            email = line[len("author-mail ") :].strip().strip("<>")
+            lines[email] += 1
+            commits.setdefault(email, set()).add(sha)
+    return dict(lines), {email: len(shas) for email, shas in commits.items()}
+
+
+def _blame_file(job: tuple[str, str, str]) -> BlameCounts:
+    repo_path, rev, path = job
+    return parse_line_porcelain(
+        _git(repo_path, "blame", "--line-porcelain", rev, "--", path)
+    )
+
+
+class BlameCache:
+    """
+    Blame counts of (blob, path) pairs, stored as one JSON file. .mailmap is
+    applied by git blame itself, so the cache is dropped when it changes.
+    Each save keeps only the entries of the current tree, so the file does
+    not grow with the history.
+    """
+
+    def __init__(self, path: str, mailmap_digest: str):
+        self.path = path
+        self.mailmap_digest = mailmap_digest
+
+    @staticmethod
+    def key(blob: str, path: str) -> str:
+        return f"{blob} {path}"
+
+    def load(self) -> dict[str, BlameCounts]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (
+            content.get("kind") != CACHE_KIND
+            or content.get("mailmap") != self.mailmap_digest
+        ):
+            return {}
+        return {
+            key: (entry["lines"], entry["commits"])
+            for key, entry in content["entries"].items()
+        }
+
+    def save(self, entries: dict[str, BlameCounts]):
+        """Replaces the cache with entries (atomically)."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        content = {
+            "kind": CACHE_KIND,
+            "mailmap": self.mailmap_digest,
+            "entries": {
+                key: {"lines": lines, "commits": commits}
+                for key, (lines, commits) in entries.items()
+            },
+        }
+        # A unique temporary name, so concurrent runs never share it.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(content, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+class BlameOwnership:
+    """
+    Surviving lines per (file, author) at rev of a local repository. Files
+    matched by the ignore rules, outside the scopes, symlinks and submodules
+    are skipped. Like the pre-aggregated inputs of `analyze`, it provides
+    author_stats() for BusFactorCalculator.from_author_stats.
+
+    workers=1 blames in the calling process; cache_dir=None keeps the cache
+    in the git directory.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        ignorer: BusFactorIgnore | None = None,
+        scopes: Iterable[str] | None = None,
+        aliases: str | None = None,
+        rev: str = "HEAD",
+        workers: int | None = None,
+        cache_dir: str | None = None,
+    ):
+        self.repo_path = repo_path
+        self.ignorer = ignorer
+        self.scopes = list(scopes or [])
+        self.aliases = aliases
+        self.rev = rev
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        # Files blamed and read from the cache by the last run.
+        self.blamed = 0
+        self.cached = 0
+        self._stats: pd.DataFrame | None = None
+
+    def __len__(self) -> int:
+        return len(self.author_stats())
+
+    def tree(self) -> list[tuple[str, str]]:
+        """(path, blob SHA) of every regular file at rev, sorted by path."""
+        output = _git(self.repo_path, "ls-tree", "-r", "-z", self.rev)
+        files = []
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            meta, path = entry.split("\t", 1)
+            mode, kind, blob = meta.split()
+            # Symlinks hold a path, submodules are commits: neither has lines.
+            if kind != "blob" or mode == "120000":
+                continue
+            files.append((path, blob))
+        files.sort()
+        return files
+
+    def files(self, tree: list[tuple[str, str]] | None = None) -> list[tuple[str, str]]:
+        """
+        (path, blob SHA) of the analysed files at rev, sorted by path; tree
+        may carry the listing already read by tree().
+        """
+        files = self.tree() if tree is None else tree
+        if self.ignorer is not None:
+            files = [f for f in files if not self.ignorer.is_ignored(f[0])]
+
+        if self.scopes:
+            paths = [path for path, _ in files]
+            matched = ScopeResolver(self.scopes).resolve(paths).values()
+            keep = sorted({int(i) for indices in matched for i in indices})
+            files = [files[i] for i in keep]
+        return files
+
+    def _cache(self) -> BlameCache:
+        if self.cache_dir is not None:
+            path = os.path.join(self.cache_dir, os.path.basename(CACHE_FILE))
+        else:
+            git_dir = _git(self.repo_path, "rev-parse", "--git-dir").strip()
+            path = os.path.join(self.repo_path, git_dir, CACHE_FILE)
+
+        mailmap = os.path.join(self.repo_path, ".mailmap")
+        digest = ""
+        if os.path.isfile(mailmap):
+            with open(mailmap, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        return BlameCache(path, digest)
+
+    def _blame(self, paths: list[str]) -> list[BlameCounts]:
+        jobs = [(self.repo_path, self.rev, path) for path in paths]
+        if self.workers == 1 or len(jobs) <= 1:
+            return [_blame_file(job) for job in jobs]
+        chunksize = max(1, len(jobs) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(_blame_file, jobs, chunksize=chunksize))
+
+    def blame(self) -> dict[str, BlameCounts]:
+        """Counts of every analysed file, blaming only those not cached."""
+        tree = self.tree()
+        files = self.files(tree)
+        cache = self._cache()
+        loaded = cache.load()
+        # Entries of files outside the analysed set (ignored, other scopes)
+        # are kept; those of blobs no longer in the tree are dropped.
+        live = {BlameCache.key(blob, path) for path, blob in tree}
+        entries = {key: entry for key, entry in loaded.items() if key in live}
+
+        counts: dict[str, BlameCounts] = {}
+        missing = []
+        for path, blob in files:
+            entry = entries.get(BlameCache.key(blob, path))
+            if entry is None:
+                missing.append((path, blob))
+            else:
+                counts[path] = entry
+
+        with stage("blame.files", rows=len(missing)):
+            blamed = self._blame([path for path, _ in missing])
+        for (path, blob), entry in zip(missing, blamed):
+            counts[path] = entries[BlameCache.key(blob, path)] = entry
+
+        self.blamed, self.cached = len(missing), len(files) - len(missing)
+        if missing or len(entries) < len(loaded):
+            cache.save(entries)
+        return counts
+
+    def author_stats(self, since=None, until=None) -> pd.DataFrame:
+        """
+        Returns a table: file | author | total_churn | commits, where
+        total_churn counts the author's lines at rev and commits the commits
+        those lines come from.
+        """
+        if since is not None or until is not None:
+            raise ValueError(
+                "Blame ownership is read at a single revision: since and until "
+                "do not apply."
+            )
+        if self._stats is not None:
+            return self._stats
+
+        identity = AuthorIdentity.from_files(
+            mailmap=os.path.join(self.repo_path, ".mailmap"), aliases=self.aliases
+        )
+        rows = []
+        for path, (lines, commits) in self.blame().items():
+            for email, n_lines in lines.items():
+                author = identity.emails[identity.intern(email)]
+                rows.append((path, author, n_lines, commits[email]))
+
+        stats = pd.DataFrame(rows, columns=["file", "author", "total_churn", "commits"])
+        # Aliases may merge e-mails of one file into one author.
+        self._stats = (
+            stats.groupby(["file", "author"], sort=True)[["total_churn", "commits"]]
+            .sum()
+            .reset_index()
+        )
+        return self._stats
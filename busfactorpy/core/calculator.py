@@ -1,6 +1,9 @@
 import pandas as pd
-import numpy as np
 from .analyzer import RiskAnalyzer
+from .metrics import RESULT_COLUMNS, MetricEngine, aggregate_columns, get_metric
+from .profiling import stage
+
+EMPTY_RESULT_COLUMNS = RESULT_COLUMNS
 
 
 class BusFactorCalculator:
@@ -16,28 +19,89 @@ class BusFactorCalculator:
         group_by: str = "file",
         depth: int = 1,
     ):
-        self.metric = metric.lower()
-        self.threshold = threshold
-        self.valid_metrics = {"churn", "entropy", "hhi", "ownership", "commit-number"}
+        self._configure(metric, threshold)
+        self.author_stats: pd.DataFrame | None = None
 
-        if self.metric not in self.valid_metrics:
-            raise ValueError(
-                f"Invalid metric '{metric}'. "
-                f"Valid metrics: {', '.join(self.valid_metrics)}"
+        if self._check_group_by(group_by, depth) == "directory":
+            self.data = self._apply_directory_grouping(commit_data, depth)
+        else:
+            self.data = commit_data
+
+    @classmethod
+    def from_author_stats(
+        cls,
+        author_stats: pd.DataFrame,
+        metric: str = "churn",
+        threshold: float = 0.8,
+        group_by: str = "file",
+        depth: int = 1,
+    ) -> "BusFactorCalculator":
+        """
+        Builds a calculator over a pre-aggregated table
+        (file | author | total_churn | commits) instead of raw commit rows.
+        Directory grouping re-aggregates the table by directory key.
+        """
+        calculator = cls.__new__(cls)
+        calculator._configure(metric, threshold)
+        calculator.data = None
+
+        if calculator._check_group_by(group_by, depth) == "directory":
+            author_stats = (
+                calculator._apply_directory_grouping(author_stats, depth)
+                .groupby(["file", "author"], observed=True)[["total_churn", "commits"]]
+                .sum()
+                .reset_index()
             )
+        else:
+            # Same order as a groupby on raw rows, so ties resolve identically.
+            author_stats = author_stats.sort_values(["file", "author"])
+
+        calculator.author_stats = author_stats.reset_index(drop=True)
+        return calculator
+
+    @classmethod
+    def from_cube(
+        cls,
+        cube,
+        metric: str = "churn",
+        threshold: float = 0.8,
+        group_by: str = "file",
+        depth: int = 1,
+        since=None,
+        until=None,
+        scope: str | None = None,
+    ) -> "BusFactorCalculator":
+        """
+        Builds a calculator over an AggregateCube, reading only the
+        (file, author) sums of the requested days and scope.
+        """
+        return cls.from_author_stats(
+            cube.author_stats(since=since, until=until, scope=scope),
+            metric=metric,
+            threshold=threshold,
+            group_by=group_by,
+            depth=depth,
+        )
+
+    def _configure(self, metric: str, threshold: float):
+        # Raises ValueError for metrics missing from the registry.
+        self.metric_spec = get_metric(metric)
+        self.metric = metric.lower()
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be between 0.0 (exclusive) and 1.0.")
+        self.threshold = threshold
 
+    @staticmethod
+    def _check_group_by(group_by: str, depth: int) -> str:
         group_by = (group_by or "file").lower()
         if group_by not in {"file", "directory"}:
             raise ValueError("group_by must be 'file' or 'directory'.")
+        if group_by == "directory" and depth < 1:
+            raise ValueError("depth must be >= 1 when grouping by directory.")
+        return group_by
 
-        if group_by == "directory":
-            if depth < 1:
-                raise ValueError("depth must be >= 1 when grouping by directory.")
-            self.data = self._apply_directory_grouping(commit_data, depth)
-        else:
-            self.data = commit_data
-
-    def _dir_key_and_depth(self, path: str, depth: int) -> tuple[str, int]:
+    @staticmethod
+    def _dir_key_and_depth(path: str, depth: int) -> tuple[str, int]:
         """
         Convert a file path to a directory key with the given depth and return its depth.
         Depth is the number of path segments in the directory key.
@@ -80,200 +144,69 @@ class BusFactorCalculator:
         return tmp
 
     # =============================================================
-    # BASE EXTRACTION: author × file × churn
-    # =============================================================
-    def _aggregate_author_churn(self) -> pd.DataFrame:
-        """
-        Returns a table: file | author | total_churn
-        """
-        author_churn = (
-            self.data.groupby(["file", "author"])
-            .agg(
-                total_churn=(
-                    "lines_added",
-                    lambda x: x.sum() + self.data.loc[x.index, "lines_deleted"].sum(),
-                )
-            )
-            .reset_index()
-        )
-
-        return author_churn
-
-    # =============================================================
-    # METRIC IMPLEMENTATIONS
+    # BASE EXTRACTION: author × file × aggregates
     # =============================================================
-
-    def _metric_churn(self, author_churn: pd.DataFrame) -> pd.DataFrame:
+    def _author_stats(self, columns) -> pd.DataFrame:
         """
-        Counts unique authors per file and calculates the share of changes
-        made by the top contributor (based on total lines changed/churn).
+        Returns a table: file | author | columns
         """
-        # Identify main contributor (highest churn)
-        idx_max = author_churn.loc[author_churn.groupby("file")["total_churn"].idxmax()]
+        if self.author_stats is not None:
+            return self.author_stats
 
-        main_author_data = idx_max[["file", "author", "total_churn"]].rename(
-            columns={"author": "main_author", "total_churn": "main_author_churn"}
-        )
-
-        # Aggregate file-level churn and authors
-        file_metrics = (
-            author_churn.groupby("file")
-            .agg(
-                n_authors=("author", "nunique"), total_file_churn=("total_churn", "sum")
-            )
-            .reset_index()
-        )
-
-        file_metrics = file_metrics.merge(main_author_data, on="file", how="left")
+        with stage("calculate.aggregate", rows=len(self.data)):
+            return aggregate_columns(self.data, columns)
 
-        file_metrics["main_author_share"] = (
-            file_metrics["main_author_churn"] / file_metrics["total_file_churn"]
-        ).fillna(0)
-
-        return file_metrics
-
-    def _metric_entropy(self, author_churn: pd.DataFrame) -> pd.DataFrame:
+    def aggregate_author_stats(self) -> pd.DataFrame:
         """
-        Shannon entropy of contributions per file.
+        Returns a table: file | author | total_churn | commits
         """
+        return self._author_stats(["total_churn", "commits"])
 
-        def shannon_entropy(group):
-            churn = group["total_churn"].values
-            p = churn / churn.sum()
-            return -np.sum(p * np.log2(p))
-
-        entropy_df = (
-            author_churn.groupby("file")[["author", "total_churn"]]
-            .apply(
-                lambda g: pd.Series(
-                    {
-                        "entropy": shannon_entropy(g),
-                        "n_authors": g["author"].nunique(),
-                        "total_file_churn": g["total_churn"].sum(),
-                    }
-                )
-            )
-            .reset_index()
-        )
-
-        # Normalize entropy so it can be used as a share-like metric (High value = High Risk)
-        # Normal entropy: High value = Distributed (Low Risk).
-        # We invert it: 1 - (H / H_max), where H_max = log2(n_authors)
-        # If n_authors=1, entropy is 0, share is 1.0
-
-        def normalize_entropy_risk(row):
-            if row["n_authors"] <= 1:
-                return 1.0
-            max_entropy = np.log2(row["n_authors"])
-            if max_entropy == 0:
-                return 1.0
-            return 1 - (row["entropy"] / max_entropy)
-
-        entropy_df["main_author_share"] = entropy_df.apply(
-            normalize_entropy_risk, axis=1
-        )
-
-        entropy_df["main_author"] = None
-        entropy_df["main_author_churn"] = None
-
-        return entropy_df
+    # =============================================================
+    # METRICS (see busfactorpy.core.metrics)
+    # =============================================================
 
-    def _metric_hhi(self, author_churn: pd.DataFrame) -> pd.DataFrame:
+    def compute_metrics(self, metrics: list[str]) -> dict[str, pd.DataFrame]:
         """
-        Herfindahl-Hirschman Index (HHI).
+        Computes several registered metrics, without the risk classification.
+        The aggregates they need are computed (and grouped) once for all.
         """
-
-        def compute_hhi(group):
-            churn = group["total_churn"].values
-            p = churn / churn.sum()
-            return np.sum(p**2)
-
-        hhi_df = (
-            author_churn.groupby("file")[["author", "total_churn"]]
-            .apply(
-                lambda g: pd.Series(
-                    {
-                        "hhi": compute_hhi(g),
-                        "n_authors": g["author"].nunique(),
-                        "total_file_churn": g["total_churn"].sum(),
-                    }
-                )
+        specs = [get_metric(metric) for metric in metrics]
+        if self.author_stats is None and any(s.source == "blame" for s in specs):
+            raise ValueError(
+                "The blame metric needs the author stats of BlameOwnership "
+                "(see from_author_stats)."
             )
-            .reset_index()
-        )
-
-        # HHI ranges from 1/N to 1. 1 means monopoly (High Risk).
-        hhi_df["main_author_share"] = hhi_df["hhi"]
 
-        hhi_df["main_author"] = None
-        hhi_df["main_author_churn"] = None
+        source = self.author_stats if self.author_stats is not None else self.data
+        if source.empty:
+            return {
+                spec.name: pd.DataFrame(columns=EMPTY_RESULT_COLUMNS) for spec in specs
+            }
 
-        return hhi_df
+        with stage("calculate.metric", rows=len(source)):
+            columns = list(dict.fromkeys(c for spec in specs for c in spec.columns))
+            engine = MetricEngine(self._author_stats(columns))
+            return {spec.name: engine.evaluate(spec) for spec in specs}
 
-    def _metric_commit_count(self) -> pd.DataFrame:
+    def compute_metric(self) -> pd.DataFrame:
         """
-        Calculates share based on pure number of commits (frequency),
-        ignoring lines changed.
+        Computes the selected metric per file (or directory) without the risk
+        classification, which only depends on the threshold.
         """
-        # Count commits per file per author
-        # Note: We use self.data directly here, not author_churn
-        commits_df = (
-            self.data.groupby(["file", "author"]).size().reset_index(name="commits")
-        )
-
-        idx_max = commits_df.loc[commits_df.groupby("file")["commits"].idxmax()]
-
-        main_author_data = idx_max[["file", "author", "commits"]].rename(
-            columns={"author": "main_author", "commits": "main_author_commits"}
-        )
-
-        file_metrics = (
-            commits_df.groupby("file")
-            .agg(n_authors=("author", "nunique"), total_commits=("commits", "sum"))
-            .reset_index()
-        )
-
-        file_metrics = file_metrics.merge(main_author_data, on="file", how="left")
+        return self.compute_metrics([self.metric])[self.metric_spec.name]
 
-        file_metrics["main_author_share"] = (
-            file_metrics["main_author_commits"] / file_metrics["total_commits"]
-        ).fillna(0)
+    def classify(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Adds the risk_class column using the calculator's threshold."""
+        if result.empty:
+            result["risk_class"] = pd.Series(dtype=object)
+            return result
 
-        file_metrics["total_file_churn"] = None
-        file_metrics["main_author_churn"] = None
+        with stage("calculate.classify", rows=len(result)):
+            result["risk_class"] = RiskAnalyzer.classify_frame(result, self.threshold)
 
-        return file_metrics
+        return result
 
     def calculate(self) -> pd.DataFrame:
-        # Aggregation based on churn (lines) is needed for churn, entropy, hhi
-        # Commit count logic uses raw data directly
-
-        if self.metric == "churn":
-            result = self._metric_churn(self._aggregate_author_churn())
-
-        elif self.metric == "entropy":
-            result = self._metric_entropy(self._aggregate_author_churn())
-
-        elif self.metric == "hhi":
-            result = self._metric_hhi(self._aggregate_author_churn())
-
-        elif self.metric == "ownership":
-            # Mapping ownership to commit count as per typical implementation,
-            # or could remain alias for churn depending on definition.
-            # Given previous file, it was commit-based.
-            result = self._metric_commit_count()
-
-        elif self.metric == "commit-number":
-            result = self._metric_commit_count()
-
         # Add risk classification with dynamic threshold
-        result["risk_class"] = result.apply(
-            lambda row: RiskAnalyzer.classify_risk(
-                n_authors=row["n_authors"],
-                share=row["main_author_share"],
-                threshold=self.threshold,
-            ),
-            axis=1,
-        )
-
-        return result
+        return self.classify(self.compute_metric())
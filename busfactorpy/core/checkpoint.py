@@ -0,0 +1,229 @@
+"""
+Mining checkpoints for `--checkpoint-every` / `--resume`.
+
+Every N commits GitMiner appends the rows mined since the previous
+checkpoint to a new part (a columnar directory, see core/columnar.py),
+saves its author identity table as JSON and then replaces a small state
+file naming the last processed commit. A checkpoint therefore only writes
+the new rows, and since the state is replaced last (atomically), a run
+killed mid-checkpoint resumes from the previous one.
+
+Nothing in a checkpoint is unpickled, and a directory owned by another
+user is refused, so a planted checkpoint cannot run code on --resume.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .identity import AuthorIdentity
+
+CHECKPOINT_KIND = "busfactorpy-mining-checkpoint"
+DEFAULT_CHECKPOINT_EVERY = 1000
+STATE_FILE = "state.json"
+IDENTITY_FILE = "identity.json"
+PART_KIND = "busfactorpy-checkpoint-rows"
+
+
+def _user_cache_dir() -> str:
+    return os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+
+def default_checkpoint_dir(key: dict) -> str:
+    """
+    Directory for a run, derived from its checkpoint key: inside the git
+    dir of a local repository, or the user's cache dir (e.g. for clones).
+    """
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    repository = key.get("repository")
+    if repository and os.path.isdir(repository):
+        try:
+            git_dir = subprocess.run(
+                ["git", "rev-parse", "--git-dir"],
+                cwd=repository,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            return os.path.join(
+                repository, git_dir, "busfactorpy", "checkpoints", digest[:16]
+            )
+        except (OSError, subprocess.CalledProcessError):
+            pass
+    return os.path.join(_user_cache_dir(), "busfactorpy", "checkpoints", digest[:16])
+
+
+def _check_owner(path: str):
+    """Refuses a checkpoint directory created by another user."""
+    if hasattr(os, "getuid") and os.path.exists(path):
+        if os.stat(path).st_uid != os.getuid():
+            raise ValueError(
+                f"Checkpoint directory {path} is not owned by the current user."
+            )
+
+
+def _encode_rows(rows: list[tuple]) -> tuple[dict, dict[str, list[str]]]:
+    """Mined rows as columns: dictionary codes, epoch seconds and UTC offsets."""
+    import numpy as np
+    import pandas as pd
+
+    files, hashes, dates = zip(*((r[0], r[5], r[2]) for r in rows))
+    file_codes, file_names = pd.factorize(pd.Series(files, dtype=object))
+    commit_codes, commit_hashes = pd.factorize(pd.Series(hashes, dtype=object))
+    offsets = [date.utcoffset() or timedelta(0) for date in dates]
+    columns = {
+        "file": file_codes.astype(np.int32),
+        "author": np.array([r[1] for r in rows], dtype=np.int32),
+        "date": np.array(
+            [
+                (date.replace(tzinfo=None) - offset - datetime(1970, 1, 1))
+                // timedelta(microseconds=1)
+                for date, offset in zip(dates, offsets)
+            ],
+            dtype=np.int64,
+        ),
+        "utc_offset": np.array(
+            [offset // timedelta(seconds=1) for offset in offsets], dtype=np.int32
+        ),
+        "lines_added": np.array([r[3] for r in rows], dtype=np.int64),
+        "lines_deleted": np.array([r[4] for r in rows], dtype=np.int64),
+        "commit": commit_codes.astype(np.int32),
+    }
+    dictionaries = {
+        "files": [str(f) for f in file_names],
+        "commit_hashes": [str(h) for h in commit_hashes],
+    }
+    return columns, dictionaries
+
+
+def _decode_rows(columns: dict, dictionaries: dict[str, list[str]]) -> list[tuple]:
+    files = dictionaries["files"]
+    hashes = dictionaries["commit_hashes"]
+    zones: dict[int, timezone] = {}
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for file, author, micros, offset, added, deleted, commit in zip(
+        columns["file"].tolist(),
+        columns["author"].tolist(),
+        columns["date"].tolist(),
+        columns["utc_offset"].tolist(),
+        columns["lines_added"].tolist(),
+        columns["lines_deleted"].tolist(),
+        columns["commit"].tolist(),
+    ):
+        zone = zones.get(offset)
+        if zone is None:
+            zone = zones[offset] = timezone(timedelta(seconds=offset))
+        date = (epoch + timedelta(microseconds=micros)).astimezone(zone)
+        rows.append((files[file], author, date, added, deleted, hashes[commit]))
+    return rows
+
+
+@dataclass
+class CheckpointState:
+    # Commits processed, in PyDriller traversal order.
+    commits: int
+    last_commit: str | None
+    parts: int
+
+
+class MiningCheckpoint:
+    """
+    Checkpoint directory of one mining run. key describes the run (source,
+    range, refs, ignore and alias rules); a checkpoint written for another
+    key is never resumed.
+    """
+
+    def __init__(self, path: str, key: dict):
+        self.path = path
+        self.key = key
+        self.state = CheckpointState(0, None, 0)
+
+    def _part(self, index: int) -> str:
+        return os.path.join(self.path, f"rows-{index:05d}")
+
+    def load(self) -> tuple[list[tuple], AuthorIdentity] | None:
+        """
+        Rows and author identity saved by the last checkpoint, or None when
+        there is no checkpoint; self.state tells where mining stopped.
+        """
+        from .columnar import load_columns
+        from .identity import AuthorIdentity
+
+        state_path = os.path.join(self.path, STATE_FILE)
+        if not os.path.isfile(state_path):
+            return None
+        _check_owner(self.path)
+        with open(state_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("kind") != CHECKPOINT_KIND or meta.get("key") != self.key:
+            raise ValueError(
+                f"Checkpoint at {self.path} was written by a different run "
+                "(repository, range, refs, ignore or alias rules)."
+            )
+
+        self.state = CheckpointState(
+            meta["commits"], meta["last_commit"], meta["parts"]
+        )
+        rows: list[tuple] = []
+        for index in range(self.state.parts):
+            columns, dictionaries, _ = load_columns(
+                self._part(index), PART_KIND, mmap=False
+            )
+            rows.extend(_decode_rows(columns, dictionaries))
+        with open(os.path.join(self.path, IDENTITY_FILE), encoding="utf-8") as f:
+            identity = AuthorIdentity.from_dict(json.load(f))
+        return rows, identity
+
+    def save(
+        self,
+        new_rows: list[tuple],
+        commits: int,
+        last_commit: str,
+        identity: AuthorIdentity,
+    ):
+        """Records new_rows (mined since the last save) and the position."""
+        from .columnar import save_columns
+
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        _check_owner(self.path)
+        parts = self.state.parts
+        if new_rows:
+            # A part left over by a run killed before its state was saved.
+            shutil.rmtree(self._part(parts), ignore_errors=True)
+            columns, dictionaries = _encode_rows(new_rows)
+            save_columns(self._part(parts), PART_KIND, columns, dictionaries)
+            parts += 1
+        self._replace(IDENTITY_FILE, json.dumps(identity.to_dict()).encode())
+
+        self.state = CheckpointState(commits, last_commit, parts)
+        meta = {
+            "kind": CHECKPOINT_KIND,
+            "key": self.key,
+            "commits": commits,
+            "last_commit": last_commit,
+            "parts": parts,
+        }
+        self._replace(STATE_FILE, json.dumps(meta, indent=2).encode())
+
+    def _replace(self, name: str, content: bytes):
+        tmp = os.path.join(self.path, f"{name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, os.path.join(self.path, name))
+
+    def clear(self):
+        """Removes the checkpoint (after a completed run, or to start over)."""
+        _check_owner(self.path)
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.state = CheckpointState(0, None, 0)
@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+from typing import Literal, Mapping
+import numpy as np
+from numpy.typing import DTypeLike
+
+META_FILE = "meta.json"
+
+
+def save_columns(
+    path: str,
+    kind: str,
+    columns: dict[str, np.ndarray],
+    dictionaries: dict[str, list[str]] | None = None,
+    meta: dict | None = None,
+):
+    """
+    Writes a directory holding one .npy file per column, one JSON list per
+    string dictionary and a meta.json describing its contents.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name, values in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(values))
+    _write_meta(path, kind, list(columns), dictionaries, meta)
+
+
+def _write_meta(
+    path: str,
+    kind: str,
+    column_names: list[str],
+    dictionaries: dict[str, list[str]] | None,
+    meta: dict | None,
+):
+    for name, entries in (dictionaries or {}).items():
+        with open(os.path.join(path, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(list(entries), f)
+
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "kind": kind,
+                "columns": column_names,
+                "dictionaries": list(dictionaries or {}),
+                **(meta or {}),
+            },
+            f,
+            indent=2,
+        )
+
+
+class ColumnWriter:
+    """
+    Writes the same directory layout as save_columns, one chunk at a time,
+    so columns larger than memory can be produced. Chunks are appended to
+    raw files; close() prefixes them with the .npy header.
+    """
+
+    def __init__(self, path: str, kind: str, dtypes: Mapping[str, DTypeLike]):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.kind = kind
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in dtypes.items()}
+        self.rows = 0
+        self._files = {
+            name: open(os.path.join(path, f"{name}.raw"), "wb") for name in dtypes
+        }
+
+    def append(self, columns: dict[str, np.ndarray]):
+        lengths = {len(values) for values in columns.values()}
+        if set(columns) != set(self.dtypes) or len(lengths) != 1:
+            raise ValueError("Every column must be appended with the same length.")
+
+        for name, values in columns.items():
+            np.ascontiguousarray(values, dtype=self.dtypes[name]).tofile(
+                self._files[name]
+            )
+        self.rows += lengths.pop()
+
+    def close(
+        self,
+        dictionaries: dict[str, list[str]] | None = None,
+        meta: dict | None = None,
+    ):
+        for name, raw in self._files.items():
+            raw.close()
+            raw_path = os.path.join(self.path, f"{name}.raw")
+            with open(os.path.join(self.path, f"{name}.npy"), "wb") as out:
+                np.lib.format.write_array_header_1_0(
+                    out,
+                    {
+                        "descr": np.lib.format.dtype_to_descr(self.dtypes[name]),
+                        "fortran_order": False,
+                        "shape": (self.rows,),
+                    },
+                )
+                with open(raw_path, "rb") as src:
+                    shutil.copyfileobj(src, out, length=1 << 20)
+            os.remove(raw_path)
+
+        _write_meta(self.path, self.kind, list(self.dtypes), dictionaries, meta)
+
+
+def read_meta(path: str) -> dict | None:
+    """Returns the meta.json of a columnar directory, or None if there is none."""
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.isfile(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_columns(
+    path: str, kind: str, mmap: bool = True
+) -> tuple[dict[str, np.ndarray], dict[str, list[str]], dict]:
+    """
+    Loads a directory written by save_columns. Columns are memory-mapped
+    read-only unless mmap is False.
+    """
+    meta = read_meta(path)
+    if meta is None or meta.get("kind") != kind:
+        raise ValueError(f"'{path}' is not a {kind} directory.")
+
+    mode: Literal["r"] | None = "r" if mmap else None
+    columns = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+        for name in meta["columns"]
+    }
+    dictionaries = {}
+    for name in meta["dictionaries"]:
+        with open(os.path.join(path, f"{name}.json"), encoding="utf-8") as f:
+            dictionaries[name] = json.load(f)
+    return columns, dictionaries, meta
@@ -0,0 +1,213 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from .columnar import ColumnWriter, load_columns, read_meta
+from .miner import GitMiner
+from .scope import ScopeResolver, normalize_scope
+
+TABLE_KIND = "busfactorpy-commit-table"
+
+# Rows mined before a batch is flushed to disk, and rows read per chunk when
+# aggregating; both bound the memory used independently of the history size.
+DEFAULT_BATCH_ROWS = 500_000
+DEFAULT_CHUNK_ROWS = 2_000_000
+
+TABLE_DTYPES = {
+    "file": np.int32,
+    "author": np.int32,
+    "date": np.int64,  # seconds since the epoch, UTC
+    "lines_added": np.int32,
+    "lines_deleted": np.int32,
+    "commit": np.int32,
+}
+
+
+def _to_seconds(value: str | datetime | pd.Timestamp) -> int:
+    """Seconds since the epoch (timezone-aware values are taken in UTC)."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.to_datetime64().astype("datetime64[s]").astype(np.int64))
+
+
+class CommitTable:
+    """
+    The mined per-modification rows stored on disk as fixed-width columns:
+    int32 codes into string dictionaries for files, authors and commits,
+    int64 timestamps and int32 line counts. It is written while mining and
+    memory-mapped when loaded, and author_stats() aggregates it chunk by
+    chunk, so histories larger than the available memory can be analysed.
+    """
+
+    def __init__(
+        self,
+        files: list[str],
+        authors: list[str],
+        commit_hashes: list[str],
+        columns: dict[str, np.ndarray],
+    ):
+        self.files = np.asarray(files, dtype=object)
+        self.authors = np.asarray(authors, dtype=object)
+        self.commit_hashes = commit_hashes
+        self.file = columns["file"]
+        self.author = columns["author"]
+        self.date = columns["date"]
+        self.lines_added = columns["lines_added"]
+        self.lines_deleted = columns["lines_deleted"]
+        self.commit = columns["commit"]
+
+    def __len__(self) -> int:
+        return len(self.file)
+
+    @classmethod
+    def mine(
+        cls, miner: GitMiner, path: str, batch_rows: int = DEFAULT_BATCH_ROWS
+    ) -> "CommitTable":
+        """
+        Mines the repository of miner into a table at path. Only one batch
+        of rows and the string dictionaries are held in memory.
+        """
+        writer = ColumnWriter(path, TABLE_KIND, TABLE_DTYPES)
+        files: dict[str, int] = {}
+        commits: dict[str, int] = {}
+
+        def encode(values: pd.Series, codes: dict[str, int]) -> np.ndarray:
+            local_codes, uniques = pd.factorize(values)
+            mapping = np.array(
+                [codes.setdefault(value, len(codes)) for value in uniques],
+                dtype=np.int32,
+            )
+            return mapping[local_codes]
+
+        for batch in miner.mine_batches(batch_rows):
+            dates = pd.to_datetime(batch["date"], utc=True).dt.tz_localize(None)
+            writer.append(
+                {
+                    "file": encode(batch["file"], files),
+                    "author": batch["author"].to_numpy(),
+                    "date": dates.to_numpy("datetime64[s]").astype(np.int64),
+                    "lines_added": batch["lines_added"].to_numpy(),
+                    "lines_deleted": batch["lines_deleted"].to_numpy(),
+                    "commit": encode(batch["commit_hash"], commits),
+                }
+            )
+
+        assert miner.identity is not None
+        writer.close(
+            dictionaries={
+                "files": list(files),
+                "authors": miner.identity.emails,
+                "commit_hashes": list(commits),
+            },
+            meta={"rows": writer.rows},
+        )
+        return cls.load(path)
+
+    @staticmethod
+    def is_table(path: str) -> bool:
+        meta = read_meta(path)
+        return meta is not None and meta.get("kind") == TABLE_KIND
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CommitTable":
+        columns, dictionaries, _ = load_columns(path, TABLE_KIND, mmap=mmap)
+        return cls(
+            dictionaries["files"],
+            dictionaries["authors"],
+            dictionaries["commit_hashes"],
+            columns,
+        )
+
+    def date_range(self) -> tuple[pd.Timestamp, pd.Timestamp]:
+        """First and last commit date."""
+        if not len(self):
+            raise ValueError("The commit table is empty.")
+        return (
+            pd.Timestamp(int(self.date.min()), unit="s"),
+            pd.Timestamp(int(self.date.max()), unit="s"),
+        )
+
+    def author_stats(
+        self,
+        since: str | datetime | None = None,
+        until: str | datetime | None = None,
+        scope: str | None = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> pd.DataFrame:
+        """
+        Returns file | author | total_churn | commits, sorted by file and
+        author, for the rows dated within [since, until] and, optionally,
+        inside scope. Rows are read
+        chunk_rows at a time; only the running per-(file, author) totals are
+        kept in memory.
+        """
+        n_authors = len(self.authors)
+        since_s = _to_seconds(since) if since is not None else None
+        until_s = _to_seconds(until) if until is not None else None
+
+        # The dictionaries are in mining order; rank their codes by sorted
+        # value so the totals come out sorted by path, then author.
+        file_order = np.argsort(self.files, kind="stable")
+        author_order = np.argsort(self.authors, kind="stable")
+        file_rank = np.empty(len(self.files), dtype=np.int64)
+        file_rank[file_order] = np.arange(len(self.files))
+        author_rank = np.empty(n_authors, dtype=np.int64)
+        author_rank[author_order] = np.arange(n_authors)
+
+        in_scope = None
+        scope = normalize_scope(scope)
+        if scope:
+            matched = ScopeResolver([scope]).resolve(self.files[file_order].tolist())[
+                scope
+            ]
+            in_scope = np.zeros(len(self.files), dtype=bool)
+            in_scope[file_order[matched]] = True
+
+        # Running totals, keyed by file rank * n_authors + author rank and
+        # kept sorted.
+        keys = np.empty(0, dtype=np.int64)
+        churn = np.empty(0, dtype=np.int64)
+        commits = np.empty(0, dtype=np.int64)
+
+        for start in range(0, len(self), chunk_rows):
+            chunk = slice(start, start + chunk_rows)
+            file = np.asarray(self.file[chunk])
+            mask = np.ones(len(file), dtype=bool)
+            if since_s is not None or until_s is not None:
+                date = np.asarray(self.date[chunk])
+                if since_s is not None:
+                    mask &= date >= since_s
+                if until_s is not None:
+                    mask &= date <= until_s
+            if in_scope is not None:
+                mask &= in_scope[file]
+
+            author = np.asarray(self.author[chunk])
+            chunk_keys = (file_rank[file] * n_authors + author_rank[author])[mask]
+            chunk_churn = (
+                np.asarray(self.lines_added[chunk], dtype=np.int64)
+                + np.asarray(self.lines_deleted[chunk])
+            )[mask]
+
+            keys, inverse = np.unique(
+                np.concatenate([keys, chunk_keys]), return_inverse=True
+            )
+            churn = np.bincount(
+                inverse,
+                weights=np.concatenate([churn, chunk_churn]),
+                minlength=len(keys),
+            ).astype(np.int64)
+            commits = np.bincount(
+                inverse,
+                weights=np.concatenate([commits, np.ones(len(chunk_keys))]),
+                minlength=len(keys),
+            ).astype(np.int64)
+
+        return pd.DataFrame(
+            {
+                "file": self.files[file_order[keys // max(n_authors, 1)]],
+                "author": self.authors[author_order[keys % max(n_authors, 1)]],
+                "total_churn": churn,
+                "commits": commits,
+            }
+        )
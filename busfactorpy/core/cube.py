@@ -0,0 +1,174 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from .columnar import load_columns, read_meta, save_columns
+from .scope import ScopeResolver, normalize_scope
+
+CUBE_KIND = "busfactorpy-cube"
+
+
+def _to_day(value: str | datetime | pd.Timestamp) -> int:
+    """Days since 1970-01-01 of a date (timezone-aware values are taken in UTC)."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.to_datetime64().astype("datetime64[D]").astype(np.int64))
+
+
+class AggregateCube:
+    """
+    (file, author, day) aggregate of a commit history with churn and commit
+    counts. It is much smaller than the per-modification rows and answers any
+    date-range, scope, directory or churn/commit based query.
+
+    Files and authors are stored as int32 codes into sorted dictionaries, so
+    code order equals string order, and rows are sorted by (file, author, day).
+    On disk each column is a .npy file that load() memory-maps.
+    """
+
+    def __init__(
+        self,
+        files: list[str],
+        authors: list[str],
+        columns: dict[str, np.ndarray],
+    ):
+        self.files = np.asarray(files, dtype=object)
+        self.authors = np.asarray(authors, dtype=object)
+        self.file = columns["file"]
+        self.author = columns["author"]
+        self.day = columns["day"]
+        self.lines_added = columns["lines_added"]
+        self.lines_deleted = columns["lines_deleted"]
+        self.commits = columns["commits"]
+
+    def __len__(self) -> int:
+        return len(self.file)
+
+    @classmethod
+    def from_commits(cls, commit_data: pd.DataFrame) -> "AggregateCube":
+        """Builds the cube from GitMiner rows (file, author, date, lines)."""
+        if "date" not in commit_data.columns:
+            raise ValueError("Commit dates are required to build the cube.")
+
+        file_codes, files = pd.factorize(commit_data["file"], sort=True)
+        author_codes, authors = pd.factorize(commit_data["author"], sort=True)
+        dates = pd.to_datetime(commit_data["date"], utc=True).dt.tz_localize(None)
+
+        cube = (
+            pd.DataFrame(
+                {
+                    "file": file_codes.astype(np.int32),
+                    "author": author_codes.astype(np.int32),
+                    "day": dates.to_numpy("datetime64[D]").astype(np.int32),
+                    "lines_added": commit_data["lines_added"].to_numpy(np.int64),
+                    "lines_deleted": commit_data["lines_deleted"].to_numpy(np.int64),
+                }
+            )
+            .groupby(["file", "author", "day"], sort=True)
+            .agg(
+                lines_added=("lines_added", "sum"),
+                lines_deleted=("lines_deleted", "sum"),
+                commits=("lines_added", "size"),
+            )
+            .reset_index()
+        )
+
+        return cls(
+            files.tolist(),
+            authors.tolist(),
+            {
+                "file": cube["file"].to_numpy(np.int32),
+                "author": cube["author"].to_numpy(np.int32),
+                "day": cube["day"].to_numpy(np.int32),
+                "lines_added": cube["lines_added"].to_numpy(np.int64),
+                "lines_deleted": cube["lines_deleted"].to_numpy(np.int64),
+                "commits": cube["commits"].to_numpy(np.int32),
+            },
+        )
+
+    @staticmethod
+    def is_cube(path: str) -> bool:
+        meta = read_meta(path)
+        return meta is not None and meta.get("kind") == CUBE_KIND
+
+    def save(self, path: str):
+        save_columns(
+            path,
+            CUBE_KIND,
+            {
+                "file": self.file,
+                "author": self.author,
+                "day": self.day,
+                "lines_added": self.lines_added,
+                "lines_deleted": self.lines_deleted,
+                "commits": self.commits,
+            },
+            dictionaries={
+                "files": self.files.tolist(),
+                "authors": self.authors.tolist(),
+            },
+            meta={"rows": len(self)},
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "AggregateCube":
+        columns, dictionaries, _ = load_columns(path, CUBE_KIND, mmap=mmap)
+        return cls(dictionaries["files"], dictionaries["authors"], columns)
+
+    def date_range(self) -> tuple[pd.Timestamp, pd.Timestamp]:
+        """First and last day with activity."""
+        if not len(self):
+            raise ValueError("The cube is empty.")
+        first, last = int(self.day.min()), int(self.day.max())
+        return (
+            pd.Timestamp(np.datetime64(first, "D")),
+            pd.Timestamp(np.datetime64(last, "D")),
+        )
+
+    def author_stats(
+        self,
+        since: str | datetime | None = None,
+        until: str | datetime | None = None,
+        scope: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Returns file | author | total_churn | commits for the rows whose day is
+        within [since, until] (whole days, both inclusive) and, optionally,
+        inside scope. The output is sorted by (file, author).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if since is not None:
+            mask &= self.day >= _to_day(since)
+        if until is not None:
+            mask &= self.day <= _to_day(until)
+
+        scope = normalize_scope(scope)
+        if scope:
+            in_scope = np.zeros(len(self.files), dtype=bool)
+            in_scope[ScopeResolver([scope]).resolve(self.files.tolist())[scope]] = True
+            mask &= in_scope[self.file]
+
+        file = np.asarray(self.file[mask])
+        author = np.asarray(self.author[mask])
+        churn = np.asarray(self.lines_added[mask]) + np.asarray(
+            self.lines_deleted[mask]
+        )
+        commits = np.asarray(self.commits[mask], dtype=np.int64)
+
+        if not len(file):
+            return pd.DataFrame(
+                {"file": [], "author": [], "total_churn": [], "commits": []}
+            )
+
+        # Rows are sorted by (file, author, day): each pair is a contiguous run.
+        key = file.astype(np.int64) * len(self.authors) + author
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+
+        return pd.DataFrame(
+            {
+                "file": self.files[file[starts]],
+                "author": self.authors[author[starts]],
+                "total_churn": np.add.reduceat(churn, starts),
+                "commits": np.add.reduceat(commits, starts),
+            }
+        )
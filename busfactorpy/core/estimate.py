@@ -0,0 +1,339 @@
+"""
+Sampling-based estimates for `analyze --estimate`.
+
+Only a sample of the commits listed by `git rev-list` is mined: a uniform
+sample, or one stratified by commit time (equal-width time buckets, each
+sampled in proportion to its size). Every sampled commit stands for
+N_h / n_h commits of its stratum, so sums are extrapolated with those
+weights while share metrics, being ratios, are estimated directly.
+
+Uncertainty comes from a bootstrap over the sampled commits (resampled
+within their strata): each replicate reweights the mined rows by how often
+their commit was drawn, so all replicates reuse one set of pair codes and
+cost one bincount each.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import warnings
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .analyzer import RiskAnalyzer
+from .calculator import BusFactorCalculator
+from .metrics import GroupedValues, get_metric
+
+SAMPLE_STRATEGIES = ("uniform", "time")
+DEFAULT_SAMPLE_SIZE = 2_000
+DEFAULT_BOOTSTRAP = 200
+DEFAULT_STRATA = 10
+
+
+@dataclass
+class CommitSample:
+    hashes: list[str]
+    # Stratum of every sampled commit, and the weight N_h / n_h per stratum.
+    strata: np.ndarray
+    weights: np.ndarray
+    population: int
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+
+def _git_date(value: datetime) -> str:
+    """A date for git's --since/--until; naive values are taken in UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return f"{value:%Y-%m-%d %H:%M:%S} +0000"
+
+
+def sample_commits(
+    repo_path: str,
+    size: int,
+    strategy: str = "time",
+    seed: int = 0,
+    rev: str = "HEAD",
+    n_strata: int = DEFAULT_STRATA,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> CommitSample:
+    """
+    Draws size commits (without replacement) from `git rev-list rev`,
+    restricted to [since, until] so the sample covers the analysed window.
+    """
+    if strategy not in SAMPLE_STRATEGIES:
+        raise ValueError(
+            f"Invalid sample strategy '{strategy}'. "
+            f"Valid options: {', '.join(SAMPLE_STRATEGIES)}"
+        )
+    if size < 1:
+        raise ValueError("The sample size must be >= 1.")
+
+    window = []
+    if since is not None:
+        window.append(f"--since={_git_date(since)}")
+    if until is not None:
+        window.append(f"--until={_git_date(until)}")
+    output = subprocess.run(
+        ["git", "rev-list", "--timestamp", *window, rev],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    timestamps = np.asarray(output[0::2], dtype=np.int64)
+    hashes = np.asarray(output[1::2], dtype=object)
+    population = len(hashes)
+    if not population:
+        raise ValueError("There are no commits to sample in the selected range.")
+    rng = np.random.default_rng(seed)
+
+    if strategy == "uniform" or size >= population:
+        strata = np.zeros(population, dtype=np.int64)
+    else:
+        edges = np.linspace(timestamps.min(), timestamps.max(), n_strata + 1)
+        strata = np.clip(
+            np.searchsorted(edges, timestamps, side="right") - 1, 0, n_strata - 1
+        )
+
+    sizes = np.bincount(strata)
+    chosen, chosen_strata = [], []
+    weights = np.ones(len(sizes))
+    for stratum, n_total in enumerate(sizes):
+        if not n_total:
+            continue
+        # Proportional allocation, with at least one commit per stratum.
+        n_drawn = min(n_total, max(1, round(size * n_total / population)))
+        members = np.flatnonzero(strata == stratum)
+        chosen.append(rng.choice(members, n_drawn, replace=False))
+        chosen_strata.append(np.full(n_drawn, stratum))
+        weights[stratum] = n_total / n_drawn
+
+    order = np.concatenate(chosen)
+    return CommitSample(
+        hashes=hashes[order].tolist(),
+        strata=np.concatenate(chosen_strata),
+        weights=weights,
+        population=population,
+    )
+
+
+class SampleEstimator:
+    """
+    Estimates the results of BusFactorCalculator from the rows mined for a
+    CommitSample, with bootstrap confidence intervals for main_author_share
+    and the probability of every file (or directory) being Critical.
+    """
+
+    def __init__(
+        self,
+        commit_data: pd.DataFrame,
+        sample: CommitSample,
+        metric: str = "churn",
+        threshold: float = 0.8,
+        group_by: str = "file",
+        depth: int = 1,
+        n_bootstrap: int = DEFAULT_BOOTSTRAP,
+        confidence: float = 0.95,
+        seed: int = 0,
+    ):
+        if n_bootstrap < 1:
+            raise ValueError("n_bootstrap must be >= 1.")
+        self.spec = get_metric(metric)
+        if self.spec.source != "history" or len(self.spec.columns) != 1:
+            raise ValueError(
+                f"The '{metric}' metric cannot be estimated from sampled commits."
+            )
+        self.data = commit_data
+        self.sample = sample
+        self.metric = metric.lower()
+        self.threshold = threshold
+        self.group_by = BusFactorCalculator._check_group_by(group_by, depth)
+        self.depth = depth
+        self.n_bootstrap = n_bootstrap
+        self.confidence = confidence
+        self.seed = seed
+
+    def _rows(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Commit index, group key, author and value of every usable row."""
+        position = {h: i for i, h in enumerate(self.sample.hashes)}
+        commit = self.data["commit_hash"].map(position).to_numpy()
+        if self.spec.columns == ("commits",):
+            value = np.ones(len(self.data))
+        else:
+            value = (self.data["lines_added"] + self.data["lines_deleted"]).to_numpy(
+                float
+            )
+        key = self.data["file"].to_numpy(dtype=object)
+        author = self.data["author"].astype(str).to_numpy(dtype=object)
+
+        if self.group_by == "directory":
+            files, inverse = np.unique(key.astype(str), return_inverse=True)
+            keys_and_depths = [
+                BusFactorCalculator._dir_key_and_depth(f, self.depth) for f in files
+            ]
+            dir_keys = np.array([k for k, _ in keys_and_depths], dtype=object)
+            exact = np.array([d == self.depth for _, d in keys_and_depths], dtype=bool)
+            keep = exact[inverse]
+            key = dir_keys[inverse]
+        else:
+            keep = np.ones(len(key), dtype=bool)
+
+        keep &= ~pd.isna(commit)
+        return (
+            commit[keep].astype(np.int64),
+            key[keep],
+            author[keep],
+            value[keep],
+        )
+
+    def _point_estimate(self) -> pd.DataFrame:
+        """The calculator's results over the weighted (extrapolated) rows."""
+        position = {h: i for i, h in enumerate(self.sample.hashes)}
+        commit = self.data["commit_hash"].map(position)
+        data = self.data[commit.notna().to_numpy()]
+        stratum = self.sample.strata[commit.dropna().to_numpy(np.int64)]
+        weight = self.sample.weights[stratum]
+        stats = (
+            pd.DataFrame(
+                {
+                    "file": data["file"].to_numpy(),
+                    "author": data["author"].astype(str).to_numpy(),
+                    "total_churn": (
+                        data["lines_added"] + data["lines_deleted"]
+                    ).to_numpy(float)
+                    * weight,
+                    "commits": weight,
+                }
+            )
+            .groupby(["file", "author"], sort=True)[["total_churn", "commits"]]
+            .sum()
+            .reset_index()
+        )
+        return BusFactorCalculator.from_author_stats(
+            stats,
+            metric=self.metric,
+            threshold=self.threshold,
+            group_by=self.group_by,
+            depth=self.depth,
+        ).calculate()
+
+    def _replicates(
+        self, commit, key_codes, author_codes, pair_codes, value, n_keys
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Shares and author counts per replicate: two (n_bootstrap, n_keys) arrays."""
+        n_pairs = int(pair_codes.max()) + 1 if len(pair_codes) else 0
+        # Pairs sorted by key: every key owns a contiguous run of pairs.
+        pair_key = np.zeros(n_pairs, dtype=np.int64)
+        pair_key[pair_codes] = key_codes
+        pair_author = np.zeros(n_pairs, dtype=np.int64)
+        pair_author[pair_codes] = author_codes
+        order = np.argsort(pair_key, kind="stable")
+        offsets = np.searchsorted(pair_key[order], np.arange(n_keys))
+
+        rng = np.random.default_rng(self.seed)
+        strata = self.sample.strata
+        row_weight = self.sample.weights[strata[commit]] * value
+        members = [np.flatnonzero(strata == s) for s in np.unique(strata)]
+
+        shares = np.empty((self.n_bootstrap, n_keys))
+        n_authors = np.empty((self.n_bootstrap, n_keys), dtype=np.int64)
+        for b in range(self.n_bootstrap):
+            # Each stratum's commits are redrawn with replacement.
+            drawn = np.concatenate([rng.choice(m, len(m)) for m in members])
+            times = np.bincount(drawn, minlength=len(strata))[commit]
+
+            pair_value = np.bincount(pair_codes, row_weight * times, n_pairs)[order]
+            present = np.bincount(pair_codes, times, n_pairs)[order] > 0
+            n_authors[b] = np.add.reduceat(present, offsets)
+            grouped = GroupedValues(
+                codes=pair_author[order],
+                offsets=np.append(offsets, n_pairs),
+                values={self.spec.columns[0]: pair_value},
+                n_authors=n_authors[b],
+            )
+            shares[b] = self.spec.reduce(grouped).share
+            shares[b, n_authors[b] == 0] = np.nan
+        return shares, n_authors
+
+    def estimate(self) -> tuple[pd.DataFrame, dict]:
+        """
+        Returns the estimated results, with share_ci_low, share_ci_high and
+        critical_probability columns, and a summary of how stable the
+        Critical set is across the bootstrap replicates. A file missing from
+        a replicate counts as not Critical in it.
+        """
+        result = self._point_estimate()
+        commit, key, author, value = self._rows()
+        if result.empty:
+            for column in ("share_ci_low", "share_ci_high", "critical_probability"):
+                result[column] = pd.Series(dtype=float)
+            return result, {
+                "sampled_commits": len(self.sample),
+                "population_commits": self.sample.population,
+                "bootstrap": self.n_bootstrap,
+                "confidence": self.confidence,
+                "critical": 0,
+                "critical_jaccard_mean": 1.0,
+                "critical_jaccard_low": 1.0,
+                "stable_critical": 0,
+                "unstable_critical": 0,
+            }
+        keys, key_codes = np.unique(key.astype(str), return_inverse=True)
+        _, author_codes = np.unique(author.astype(str), return_inverse=True)
+        _, pair_codes = np.unique(
+            np.char.add(np.char.add(key.astype(str), "\0"), author.astype(str)),
+            return_inverse=True,
+        )
+        shares, n_authors = self._replicates(
+            commit, key_codes, author_codes, pair_codes, value, len(keys)
+        )
+
+        index = pd.Index(keys).get_indexer(result["file"].astype(str))
+        point_share = np.full(len(keys), np.nan)
+        point_share[index] = result["main_author_share"].to_numpy(float)
+
+        # A resample's top-author share is biased upwards (the maximum of
+        # noisier sums), so the percentile interval is shifted by the
+        # bootstrap estimate of that bias.
+        alpha = (1 - self.confidence) / 2
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low, high = np.nanquantile(shares, [alpha, 1 - alpha], axis=0)
+            bias = np.nanmean(shares, axis=0) - point_share
+        classes = RiskAnalyzer.classify_array(n_authors, shares, self.threshold)
+        critical = (classes == "Critical") & (n_authors > 0)
+
+        result["share_ci_low"] = np.clip(low - bias, 0, 1)[index]
+        result["share_ci_high"] = np.clip(high - bias, 0, 1)[index]
+        result["critical_probability"] = critical.mean(axis=0)[index]
+
+        point = np.zeros(len(keys), dtype=bool)
+        point[index[(result["risk_class"] == "Critical").to_numpy()]] = True
+        union = (critical | point).sum(axis=1)
+        jaccard = np.where(
+            union > 0, (critical & point).sum(axis=1) / np.maximum(union, 1), 1.0
+        )
+        probability = critical.mean(axis=0)
+        summary = {
+            "sampled_commits": len(self.sample),
+            "population_commits": self.sample.population,
+            "bootstrap": self.n_bootstrap,
+            "confidence": self.confidence,
+            "critical": int(point.sum()),
+            "critical_jaccard_mean": float(jaccard.mean()),
+            "critical_jaccard_low": float(np.quantile(jaccard, alpha)),
+            "stable_critical": int((probability >= self.confidence).sum()),
+            "unstable_critical": int(
+                (
+                    (probability > 1 - self.confidence)
+                    & (probability < self.confidence)
+                ).sum()
+            ),
+        }
+        return result, summary
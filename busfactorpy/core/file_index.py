@@ -0,0 +1,235 @@
+import hashlib
+import os
+import subprocess
+from bisect import bisect_left
+from typing import Iterable
+import numpy as np
+import pandas as pd
+from .columnar import load_columns, read_meta, save_columns
+from .miner import MINED_COLUMNS, GitMiner
+from .scope import _expand_ranges
+
+INDEX_KIND = "busfactorpy-file-index"
+
+# Relative to the repository's git directory, so the cache never shows up in
+# the working tree.
+INDEX_DIR = os.path.join("busfactorpy", "file-index")
+
+
+def _git(repo_path: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def identity_key(repo_path: str, aliases: str | None = None) -> str:
+    """
+    Digest of the author identity rules (.mailmap and the alias file): an
+    index mined under other rules resolves authors differently.
+    """
+    digest = hashlib.sha256()
+    for path in (os.path.join(repo_path, ".mailmap"), aliases):
+        digest.update(b"\0")
+        if path and os.path.isfile(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def changed_paths(repo_path: str, base_ref: str) -> list[str]:
+    """Paths touched since the merge base of base_ref and HEAD."""
+    output = _git(repo_path, "diff", "--name-only", "-z", f"{base_ref}...HEAD")
+    return [path for path in output.split("\0") if path]
+
+
+class FileIndex:
+    """
+    Mined commit rows of a local repository grouped by file: the rows of
+    files[i] are offsets[i]:offsets[i + 1], in commit order. Looking up the
+    history of a few files only touches their slices of the memory-mapped
+    columns.
+
+    The index is cached in the git directory and keyed by HEAD and the
+    identity rules (see identity_key). It is built without ignore rules,
+    which callers apply to the looked-up paths.
+    """
+
+    def __init__(
+        self,
+        files: list[str],
+        authors: list[str],
+        commit_hashes: list[str],
+        columns: dict[str, np.ndarray],
+        head: str,
+        identity: str = "",
+    ):
+        self.files = files
+        self.authors = np.asarray(authors, dtype=object)
+        self.commit_hashes = np.asarray(commit_hashes, dtype=object)
+        self.offsets = columns["offsets"]
+        self.author = columns["author"]
+        self.commit = columns["commit"]
+        self.date = columns["date"]
+        self.lines_added = columns["lines_added"]
+        self.lines_deleted = columns["lines_deleted"]
+        self.head = head
+        self.identity = identity
+
+    def __len__(self) -> int:
+        return len(self.author)
+
+    @classmethod
+    def from_commits(
+        cls, commit_data: pd.DataFrame, head: str, identity: str = ""
+    ) -> "FileIndex":
+        """Builds the index from GitMiner rows (in commit order)."""
+        commit_data = commit_data.sort_values("file", kind="stable")
+        file_codes, files = pd.factorize(commit_data["file"], sort=True)
+        author_codes, authors = pd.factorize(commit_data["author"])
+        commit_codes, commit_hashes = pd.factorize(commit_data["commit_hash"])
+        dates = pd.to_datetime(commit_data["date"], utc=True).dt.tz_localize(None)
+
+        offsets = np.zeros(len(files) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(file_codes, minlength=len(files)), out=offsets[1:])
+
+        return cls(
+            files.tolist(),
+            authors.tolist(),
+            commit_hashes.tolist(),
+            {
+                "offsets": offsets,
+                "author": author_codes.astype(np.int32),
+                "commit": commit_codes.astype(np.int32),
+                "date": dates.to_numpy("datetime64[s]"),
+                "lines_added": commit_data["lines_added"].to_numpy(np.int64),
+                "lines_deleted": commit_data["lines_deleted"].to_numpy(np.int64),
+            },
+            head,
+            identity,
+        )
+
+    def save(self, path: str):
+        save_columns(
+            path,
+            INDEX_KIND,
+            {
+                "offsets": self.offsets,
+                "author": self.author,
+                "commit": self.commit,
+                "date": self.date,
+                "lines_added": self.lines_added,
+                "lines_deleted": self.lines_deleted,
+            },
+            dictionaries={
+                "files": self.files,
+                "authors": self.authors.tolist(),
+                "commit_hashes": self.commit_hashes.tolist(),
+            },
+            meta={"head": self.head, "identity": self.identity, "rows": len(self)},
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "FileIndex":
+        columns, dictionaries, meta = load_columns(path, INDEX_KIND)
+        return cls(
+            dictionaries["files"],
+            dictionaries["authors"],
+            dictionaries["commit_hashes"],
+            columns,
+            meta["head"],
+            meta.get("identity", ""),
+        )
+
+    @classmethod
+    def load_or_build(cls, repo_path: str, aliases: str | None = None) -> "FileIndex":
+        """
+        Loads the cached index when it matches HEAD and the identity rules
+        (.mailmap plus the aliases file). When HEAD moved forward, only the
+        new commits are mined; otherwise the history is mined again.
+        """
+        git_dir, head = _git(repo_path, "rev-parse", "--git-dir", "HEAD").splitlines()
+        path = os.path.join(repo_path, git_dir, INDEX_DIR)
+        identity = identity_key(repo_path, aliases)
+
+        meta = read_meta(path)
+        if (
+            meta is not None
+            and meta.get("kind") == INDEX_KIND
+            and meta.get("identity") == identity
+        ):
+            if meta["head"] == head:
+                return cls.load(path)
+
+            is_ancestor = subprocess.run(
+                ["git", "merge-base", "--is-ancestor", meta["head"], head],
+                cwd=repo_path,
+                capture_output=True,
+            )
+            if is_ancestor.returncode == 0:
+                cached = cls.load(path)
+                new_rows = GitMiner(
+                    repo_path,
+                    None,
+                    commit_range=f"{cached.head}..{head}",
+                    aliases=aliases,
+                ).mine_commit_history()
+                new_rows["date"] = pd.to_datetime(
+                    new_rows["date"], utc=True
+                ).dt.tz_localize(None)
+                index = cls.from_commits(
+                    pd.concat([cached.history(), new_rows], ignore_index=True),
+                    head,
+                    identity,
+                )
+                index.save(path)
+                return index
+
+        index = cls.from_commits(
+            GitMiner(repo_path, None, aliases=aliases).mine_commit_history(),
+            head,
+            identity,
+        )
+        index.save(path)
+        return index
+
+    def history(self, paths: Iterable[str] | None = None) -> pd.DataFrame:
+        """
+        Returns the GitMiner rows of the given paths (all rows when None).
+        Paths without history are skipped.
+        """
+        if paths is None:
+            codes = np.arange(len(self.files))
+        else:
+            positions = [
+                (bisect_left(self.files, path), path) for path in sorted(set(paths))
+            ]
+            codes = np.array(
+                [
+                    pos
+                    for pos, path in positions
+                    if pos < len(self.files) and self.files[pos] == path
+                ],
+                dtype=np.int64,
+            )
+
+        starts, ends = self.offsets[codes], self.offsets[codes + 1]
+        rows = _expand_ranges(starts, ends)
+        files = np.array([self.files[code] for code in codes], dtype=object)
+
+        return pd.DataFrame(
+            {
+                "file": np.repeat(files, ends - starts),
+                "author": pd.Categorical.from_codes(
+                    self.author[rows], categories=self.authors
+                ),
+                "date": self.date[rows],
+                "lines_added": self.lines_added[rows],
+                "lines_deleted": self.lines_deleted[rows],
+                "commit_hash": self.commit_hashes[self.commit[rows]],
+            },
+            columns=MINED_COLUMNS,
+        )
@@ -1,5 +1,4 @@
 from pathlib import Path
-import pathspec
 
 
 class BusFactorIgnore:
@@ -11,9 +10,12 @@ class BusFactorIgnore:
         self, ignore_file_path: str = ".busfactorignore", root_path: str = "."
     ):
         self.root_path = Path(root_path)
+        self.patterns: list[str] = []
         self.spec = self._load_spec(ignore_file_path)
 
     def _load_spec(self, ignore_file_path: str):
+        import pathspec
+
         ignore_path = Path(ignore_file_path)
 
         if not ignore_path.exists():
@@ -21,9 +23,9 @@ class BusFactorIgnore:
             return pathspec.PathSpec.from_lines("gitwildmatch", [])
 
         with open(ignore_path, "r", encoding="utf-8") as f:
-            patterns = f.read().splitlines()
+            self.patterns = f.read().splitlines()
 
-        return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+        return pathspec.PathSpec.from_lines("gitwildmatch", self.patterns)
 
     def is_ignored(self, file_path: str) -> bool:
         """
@@ -0,0 +1,311 @@
+"""
+Registry of Bus Factor metrics.
+
+A metric declares the (file, author) aggregate columns it needs (see
+AGGREGATES) and a vectorized reduction over them. Pairs are grouped CSR
+style: the pairs of group g are offsets[g]:offsets[g + 1], each with an
+author code and one value per declared column. The reduction returns a
+share per group (the value RiskAnalyzer classifies) and, optionally, the
+pair of the group's main author.
+
+MetricEngine groups an aggregate table once and evaluates any number of
+metrics over it. Metrics of other packages are registered through the
+"busfactorpy.metrics" entry point group, each entry point naming a Metric:
+
+    [project.entry-points."busfactorpy.metrics"]
+    gini = "my_package.metrics:GINI"
+"""
+
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass, field
+from importlib.metadata import entry_points
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+ENTRY_POINT_GROUP = "busfactorpy.metrics"
+
+# Aggregate columns a metric can ask for: name -> how commit rows (with a
+# total_churn column) are reduced into it per (file, author).
+AGGREGATES = {
+    "total_churn": ("total_churn", "sum"),
+    "commits": ("total_churn", "size"),
+}
+
+# Result columns holding the group total and the main author's value of an
+# aggregate, so commit-based metrics keep their own column names.
+_TOTAL_COLUMNS = {
+    "total_churn": ("total_file_churn", "main_author_churn"),
+    "commits": ("total_commits", "main_author_commits"),
+}
+
+RESULT_COLUMNS = [
+    "file",
+    "n_authors",
+    "total_file_churn",
+    "main_author",
+    "main_author_churn",
+    "main_author_share",
+]
+
+
+@dataclass
+class GroupedValues:
+    # Author code of every (group, author) pair; pairs are sorted by group.
+    codes: np.ndarray
+    # The pairs of group g are offsets[g]:offsets[g + 1].
+    offsets: np.ndarray
+    # One array per declared aggregate column, aligned with codes.
+    values: dict[str, np.ndarray]
+    # Authors per group (pairs, unless the caller counts only some of them).
+    n_authors: np.ndarray
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self.offsets[:-1]
+
+    def totals(self, column: str) -> np.ndarray:
+        return np.add.reduceat(self.values[column], self.starts)
+
+    def broadcast(self, per_group: np.ndarray) -> np.ndarray:
+        """Repeats a per-group array over the pairs of each group."""
+        return np.repeat(per_group, np.diff(self.offsets))
+
+
+@dataclass
+class MetricValues:
+    # Share-like value per group, in [0, 1]: the higher the riskier.
+    share: np.ndarray
+    # Pair index of every group's main author, if the metric has one.
+    main: np.ndarray | None = None
+    # Additional result columns (e.g. the raw entropy).
+    extra: dict[str, np.ndarray] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    # Aggregate columns the reduction reads; the first one is reported as
+    # the group total and the main author's value.
+    columns: tuple[str, ...]
+    reduce: Callable[[GroupedValues], MetricValues]
+    help: str = ""
+    # "blame" metrics read the surviving lines of BlameOwnership instead of
+    # aggregates of commit rows.
+    source: str = "history"
+
+
+def top_author_share(column: str) -> Callable[[GroupedValues], MetricValues]:
+    """Reduction: the share of the group's total held by its top author."""
+
+    def reduce(grouped: GroupedValues) -> MetricValues:
+        values = grouped.values[column]
+        top = np.maximum.reduceat(values, grouped.starts)
+        # First pair of every group reaching the maximum, like idxmax.
+        pairs = np.arange(len(values))
+        is_top = values == grouped.broadcast(top)
+        main = np.minimum.reduceat(np.where(is_top, pairs, len(values)), grouped.starts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.nan_to_num(top / grouped.totals(column))
+        return MetricValues(share, main=main)
+
+    return reduce
+
+
+def _entropy(grouped: GroupedValues) -> MetricValues:
+    """1 - H / log2(n_authors): the Shannon entropy inverted into a risk."""
+    values = grouped.values["total_churn"]
+    total = grouped.totals("total_churn")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = values / grouped.broadcast(total)
+        plogp = np.where(values > 0, p * np.log2(np.where(values > 0, p, 1)), 0.0)
+        entropy = -np.add.reduceat(plogp, grouped.starts)
+        normalized = 1 - entropy / np.log2(np.maximum(grouped.n_authors, 2))
+    # A single author is a monopoly; without any churn there is no share.
+    share = np.where(
+        grouped.n_authors <= 1, 1.0, np.where(total > 0, normalized, np.nan)
+    )
+    return MetricValues(share, extra={"entropy": np.where(total > 0, entropy, np.nan)})
+
+
+def _hhi(grouped: GroupedValues) -> MetricValues:
+    """Herfindahl-Hirschman Index: from 1/N to 1 (monopoly)."""
+    values = grouped.values["total_churn"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = values / grouped.broadcast(grouped.totals("total_churn"))
+    hhi = np.add.reduceat(p**2, grouped.starts)
+    return MetricValues(hhi, extra={"hhi": hhi})
+
+
+BUILTIN_METRICS = [
+    Metric(
+        "churn",
+        ("total_churn",),
+        top_author_share("total_churn"),
+        help="Share of the lines changed (added + deleted) by the top author.",
+    ),
+    Metric(
+        "commit-number",
+        ("commits",),
+        top_author_share("commits"),
+        help="Share of the commits made by the top author.",
+    ),
+    Metric(
+        "entropy",
+        ("total_churn",),
+        _entropy,
+        help="1 - normalized Shannon entropy of the churn shares.",
+    ),
+    Metric(
+        "hhi",
+        ("total_churn",),
+        _hhi,
+        help="Herfindahl-Hirschman Index of the churn shares.",
+    ),
+    Metric(
+        "ownership",
+        ("commits",),
+        top_author_share("commits"),
+        help="Share of the commits made by the top author (alias of commit-number).",
+    ),
+    Metric(
+        "blame",
+        ("total_churn",),
+        top_author_share("total_churn"),
+        help="Share of the lines at HEAD written by the top author (git blame).",
+        source="blame",
+    ),
+]
+
+_REGISTRY: dict[str, Metric] = {}
+_entry_points_loaded = False
+
+
+def register_metric(metric: Metric, replace: bool = False):
+    """Adds a metric to the registry (replace=True to override one)."""
+    unknown = set(metric.columns) - set(AGGREGATES)
+    if not metric.columns or unknown:
+        raise ValueError(
+            f"Metric '{metric.name}' needs aggregate columns among "
+            f"{', '.join(AGGREGATES)}."
+        )
+    name = metric.name.lower()
+    if name in _REGISTRY and not replace:
+        raise ValueError(f"Metric '{name}' is already registered.")
+    _REGISTRY[name] = metric
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        # A broken plugin must not take the built-in metrics down with it.
+        try:
+            metric = entry_point.load()
+            if not isinstance(metric, Metric):
+                raise TypeError(f"{entry_point.value} is not a Metric")
+            register_metric(metric)
+        except Exception as e:
+            warnings.warn(
+                f"Skipping metric plugin '{entry_point.name}': {e}", stacklevel=2
+            )
+
+
+def available_metrics() -> dict[str, Metric]:
+    """Registered metrics by name: the built-in ones, then plugins."""
+    _load_entry_points()
+    return dict(_REGISTRY)
+
+
+def get_metric(name: str) -> Metric:
+    metrics = available_metrics()
+    metric = metrics.get(name.lower())
+    if metric is None:
+        raise ValueError(
+            f"Invalid metric '{name}'. Valid metrics: {', '.join(metrics)}"
+        )
+    return metric
+
+
+def aggregate_columns(
+    commit_data: pd.DataFrame, columns: Iterable[str]
+) -> pd.DataFrame:
+    """
+    Returns a table: file | author | columns, aggregating the commit rows
+    once for every requested column.
+    """
+    specs = {column: AGGREGATES[column] for column in columns}
+    return (
+        commit_data.assign(
+            total_churn=commit_data["lines_added"] + commit_data["lines_deleted"]
+        )
+        .groupby(["file", "author"], observed=True)
+        .agg(**specs)
+        .reset_index()
+    )
+
+
+class MetricEngine:
+    """
+    Groups a file | author | <aggregates> table by file once; evaluate()
+    then runs a metric's reduction over the grouped arrays. Within a file,
+    pairs keep the table's order, which breaks ties between top authors.
+    """
+
+    def __init__(self, author_stats: pd.DataFrame):
+        files = author_stats["file"].to_numpy(dtype=object)
+        self.files, group = np.unique(files.astype(str), return_inverse=True)
+        order = np.argsort(group, kind="stable")
+        self.stats = author_stats.iloc[order]
+
+        self.codes, self.authors = pd.factorize(self.stats["author"])
+        self.offsets = np.zeros(len(self.files) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(group, minlength=len(self.files)), out=self.offsets[1:])
+
+    def grouped(self, columns: Iterable[str]) -> GroupedValues:
+        return GroupedValues(
+            codes=self.codes,
+            offsets=self.offsets,
+            values={column: self.stats[column].to_numpy() for column in columns},
+            n_authors=np.diff(self.offsets),
+        )
+
+    def evaluate(self, metric: Metric) -> pd.DataFrame:
+        """The metric per file, with the columns of RESULT_COLUMNS."""
+        if not len(self.files):
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+
+        grouped = self.grouped(metric.columns)
+        values = metric.reduce(grouped)
+        column = metric.columns[0]
+        total_name, main_name = _TOTAL_COLUMNS[column]
+
+        result = pd.DataFrame(
+            {"file": self.files, "n_authors": grouped.n_authors},
+        )
+        result[total_name] = grouped.totals(column)
+        if values.main is not None:
+            authors = np.asarray(self.authors, dtype=object)
+            result["main_author"] = authors[self.codes[values.main]]
+            result[main_name] = grouped.values[column][values.main]
+        else:
+            result["main_author"] = None
+            result[main_name] = None
+        result["main_author_share"] = values.share
+        for name, extra in values.extra.items():
+            result[name] = extra
+
+        for missing in RESULT_COLUMNS:
+            if missing not in result.columns:
+                result[missing] = None
+        return result
+
+
+for _metric in BUILTIN_METRICS:
+    register_metric(_metric)
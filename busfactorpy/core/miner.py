@@ -1,10 +1,32 @@
+from __future__ import annotations
+
 import os
 import shutil
+import sys
 import tempfile
-import pandas as pd
-from pydriller import Repository
-from git import Repo, GitCommandError
+import time
+from typing import TYPE_CHECKING, Generator, Iterator
+from .checkpoint import MiningCheckpoint, default_checkpoint_dir
+from .identity import AuthorIdentity
 from .ignore import BusFactorIgnore
+from .profiling import stage, timed_call, timed_iter
+from .progress import DEFAULT_INTERVAL, MiningProgress, ProgressCallback, count_commits
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MINED_COLUMNS = [
+    "file",
+    "author",
+    "date",
+    "lines_added",
+    "lines_deleted",
+    "commit_hash",
+]
+
+_HISTORY_CHANGED = (
+    "The history changed since the checkpoint was written; mine again without resuming."
+)
 
 
 class GitMiner:
@@ -13,37 +35,214 @@ class GitMiner:
     """
 
     def __init__(
-        self, path_to_repo: str, ignorer: BusFactorIgnore, scope: str | None = None
+        self,
+        path_to_repo: str,
+        ignorer: BusFactorIgnore | None,
+        scope: str | list[str] | None = None,
+        commit_range: str | None = None,
+        aliases: str | None = None,
+        refs: list[str] | None = None,
+        commits: list[str] | None = None,
+        on_progress: ProgressCallback | None = None,
+        progress_interval: float = DEFAULT_INTERVAL,
+        checkpoint_every: int | None = None,
+        checkpoint_dir: str | None = None,
+        resume: bool = False,
     ):
+        from .scope import load_scopes
+
+        self.source = path_to_repo
         self.repo_path = path_to_repo
         self.temp_dir = None
         self.is_cloned = False
         self.ignorer = ignorer
 
-        if scope:
-            normalized = scope.strip().replace("\\", "/").strip("/")
-            self.scope = normalized if normalized else None
-        else:
-            self.scope = None
+        # One or many subdirectories; rows outside all of them are dropped.
+        self.scopes = load_scopes([scope] if isinstance(scope, str) else scope)
+
+        # git revision range (e.g. 'A..B'); None mines the whole history.
+        self.commit_range = commit_range
+        self.mined_commits: list[str] | None = None
+
+        # Refs or ref patterns (e.g. 'release/*'): mines every commit
+        # reachable from any of them once; ref_commits keeps each ref's set.
+        if refs and commit_range:
+            raise ValueError("refs and commit_range cannot be combined.")
+        self.refs = refs
+        self.ref_commits: dict[str, list[str]] = {}
+
+        # Explicit commit hashes to mine (e.g. a sample); others are skipped.
+        if commits is not None and (refs or commit_range):
+            raise ValueError("commits cannot be combined with refs or commit_range.")
+        self.commits = commits
+
+        # Optional alias rules, applied on top of the repository's .mailmap.
+        self.aliases = aliases
+        self.identity: AuthorIdentity | None = None
+
+        # Called with the live MiningProgress at most every progress_interval
+        # seconds while mining, and once more when the walk ends.
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.progress: MiningProgress | None = None
+
+        # Saves the rows mined so far every checkpoint_every commits (to
+        # checkpoint_dir, or a scratch directory derived from the run), and
+        # with resume continues from the last checkpoint of the same run.
+        if resume and not checkpoint_every:
+            raise ValueError("resume needs checkpoint_every.")
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_dir = checkpoint_dir
+        self.resume = resume
+        self.resumed_commits = 0
 
     def _clone_repo(self):
         """Clones a remote GitHub URL into a temporary directory."""
+        from git import GitCommandError, Repo
+
         if self.repo_path.startswith(("http", "git@")):
             self.temp_dir = tempfile.mkdtemp(prefix="busfactorpy_")
             try:
-                Repo.clone_from(self.repo_path, self.temp_dir)
+                with stage("mine.clone"):
+                    Repo.clone_from(self.repo_path, self.temp_dir)
                 self.repo_path = self.temp_dir
                 self.is_cloned = True
-                print(f"Cloned repository to: {self.repo_path}")
+                print(f"Cloned repository to: {self.repo_path}", file=sys.stderr)
             except GitCommandError as e:
                 self.cleanup()
                 raise ConnectionError(f"Failed to clone repository: {e}")
 
-    def _extract_data(self) -> pd.DataFrame:
-        """Iterates commits and extracts file changes and authors."""
-        data = []
-        for commit in Repository(self.repo_path).traverse_commits():
-            for modification in commit.modified_files:
+    def _rev_list(self) -> list[str] | None:
+        """
+        Full hashes of the commits in commit_range or refs (as `git rev-list`),
+        or the explicit commits.
+        """
+        if self.commits is not None:
+            return list(self.commits)
+
+        if self.refs:
+            from .refs import reachable_commits, resolve_refs
+
+            self.ref_commits = reachable_commits(
+                self.repo_path, resolve_refs(self.repo_path, self.refs)
+            )
+            # Union in first-seen order; shared history appears only once.
+            return list(
+                dict.fromkeys(h for hashes in self.ref_commits.values() for h in hashes)
+            )
+
+        if self.commit_range is None:
+            return None
+
+        from git import Repo
+
+        output = Repo(self.repo_path).git.rev_list(self.commit_range)
+        return output.split()
+
+    def checkpoint_key(self) -> dict:
+        """What a checkpoint must match to be resumed by this miner."""
+        source = self.source
+        if os.path.exists(source):
+            source = os.path.abspath(source)
+        return {
+            "repository": source,
+            "commit_range": self.commit_range,
+            "refs": self.refs,
+            "commits": self.commits,
+            "ignore": self.ignorer.patterns if self.ignorer is not None else None,
+            "aliases": self.aliases,
+        }
+
+    def _open_checkpoint(self) -> tuple[MiningCheckpoint, list[tuple]]:
+        """
+        The run's checkpoint and the rows it restored (setting self.identity),
+        or an emptied checkpoint when not resuming.
+        """
+        key = self.checkpoint_key()
+        checkpoint = MiningCheckpoint(
+            self.checkpoint_dir or default_checkpoint_dir(key), key
+        )
+        restored = checkpoint.load() if self.resume else None
+        self.resumed_commits = 0
+        if restored is None:
+            checkpoint.clear()
+            return checkpoint, []
+        rows, self.identity = restored
+        self.resumed_commits = checkpoint.state.commits
+        return checkpoint, rows
+
+    def _iter_batches(self, batch_rows: int | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Iterates commits and yields the kept file changes in frames of about
+        batch_rows rows (a single frame when None). The author column holds
+        the interned integer IDs of self.identity.
+        """
+        import pandas as pd
+        from pydriller import Repository
+
+        self.mined_commits = self._rev_list()
+        self.identity = AuthorIdentity.from_files(
+            mailmap=os.path.join(self.repo_path, ".mailmap"), aliases=self.aliases
+        )
+        checkpoint, resume_from = None, None
+        every = self.checkpoint_every or 0
+        data: list[tuple] = []
+        if every:
+            checkpoint, data = self._open_checkpoint()
+            resume_from = checkpoint.state.last_commit
+        skip, saved = self.resumed_commits, len(data)
+        identity = self.identity
+        resolver = None
+        if self.scopes:
+            from .scope import ScopeResolver
+
+            resolver = ScopeResolver(self.scopes)
+
+        def to_frame(data: list[tuple]) -> pd.DataFrame:
+            with stage("mine.frame", rows=len(data)):
+                # Explicit columns keep the schema when a range has no kept rows.
+                df = pd.DataFrame(data, columns=MINED_COLUMNS).dropna(subset=["file"])
+                df["author"] = df["author"].astype("int32")
+                return resolver.filter(df) if resolver is not None else df
+
+        is_ignored = (
+            timed_call("mine.ignore", self.ignorer.is_ignored)
+            if self.ignorer is not None
+            else None
+        )
+
+        progress = None
+        if self.on_progress is not None:
+            self.progress = progress = MiningProgress(
+                total_commits=(
+                    len(self.mined_commits)
+                    if self.mined_commits is not None
+                    else count_commits(self.repo_path)
+                ),
+                commits=skip,
+                resumed_commits=skip,
+            )
+            next_report = progress.started + self.progress_interval
+        ignored = emitted = position = 0
+
+        # PyDriller walks HEAD by default; with an explicit commit set, walk
+        # all refs so commits only reachable from other branches are visited.
+        repository = Repository(
+            self.repo_path,
+            only_commits=self.mined_commits,
+            include_refs=self.mined_commits is not None,
+        )
+        for position, commit in enumerate(repository.traverse_commits(), 1):
+            if position <= skip:
+                # Already mined before the checkpoint; the diff is never read.
+                if position == skip and commit.hash != resume_from:
+                    raise ValueError(_HISTORY_CHANGED)
+                continue
+
+            author_id = identity.intern(commit.author.email, commit.author.name)
+            # PyDriller recomputes the diff on every access of modified_files.
+            modifications = commit.modified_files
+            for modification in modifications:
                 file_path = (
                     modification.new_path
                     if modification.new_path
@@ -52,29 +251,65 @@ class GitMiner:
                 if not file_path:
                     continue
 
-                if self.ignorer.is_ignored(file_path):
+                if is_ignored is not None and is_ignored(file_path):
+                    ignored += 1
                     continue
 
                 data.append(
-                    {
-                        "file": file_path,
-                        "author": commit.author.email,
-                        "date": commit.author_date,
-                        "lines_added": modification.added_lines,
-                        "lines_deleted": modification.deleted_lines,
-                        "commit_hash": commit.hash,
-                    }
+                    (
+                        file_path,
+                        author_id,
+                        commit.author_date,
+                        modification.added_lines,
+                        modification.deleted_lines,
+                        commit.hash,
+                    )
                 )
 
-        df = pd.DataFrame(data).dropna(subset=["file"])
+            if progress is not None:
+                progress.commits += 1
+                progress.modifications += len(modifications)
+                progress.last_commit = commit.hash
+                now = time.perf_counter()
+                if now >= next_report:
+                    self._report_progress(now, emitted + len(data), ignored)
+                    next_report = now + self.progress_interval
+
+            full = batch_rows is not None and len(data) >= batch_rows
+            if checkpoint is not None and (full or position % every == 0):
+                checkpoint.save(data[saved:], position, commit.hash, identity)
+                saved = len(data)
+
+            if full:
+                emitted += len(data)
+                yield to_frame(data)
+                data = []
+                saved = 0
 
-        if self.scope:
-            scope_prefix = f"{self.scope}/"
-            scoped_df = df[
-                (df["file"] == self.scope) | (df["file"].str.startswith(scope_prefix))
-            ]
-            return scoped_df
+        if position < skip:
+            raise ValueError(_HISTORY_CHANGED)
+        if progress is not None:
+            progress.done = True
+            self._report_progress(time.perf_counter(), emitted + len(data), ignored)
+        if data or batch_rows is None:
+            yield to_frame(data)
+        if checkpoint is not None:
+            checkpoint.clear()
 
+    def _report_progress(self, now: float, kept: int, ignored: int):
+        progress = self.progress
+        assert progress is not None and self.on_progress is not None
+        progress.elapsed_seconds = now - progress.started
+        progress.rows_kept = kept
+        progress.rows_ignored = ignored
+        self.on_progress(progress)
+
+    def _extract_data(self) -> pd.DataFrame:
+        """Iterates commits and extracts file changes and authors."""
+        (df,) = timed_iter("mine.traverse", self._iter_batches())
+        # Authors are interned integer IDs; the categories are the side table.
+        assert self.identity is not None
+        df["author"] = self.identity.categorical(df["author"].to_numpy())
         return df
 
     def mine_commit_history(self) -> pd.DataFrame:
@@ -82,11 +317,24 @@ class GitMiner:
         if not os.path.exists(self.repo_path):
             self._clone_repo()
 
-        df = self._extract_data()
+        try:
+            return self._extract_data()
+        finally:
+            self.cleanup()
 
-        self.cleanup()
+    def mine_batches(self, batch_rows: int) -> Generator[pd.DataFrame, None, None]:
+        """
+        Like mine_commit_history, but yields the rows in frames of about
+        batch_rows rows, with integer author IDs (see self.identity), so the
+        whole history never has to fit in memory at once.
+        """
+        if not os.path.exists(self.repo_path):
+            self._clone_repo()
 
-        return df
+        try:
+            yield from timed_iter("mine.traverse", self._iter_batches(batch_rows))
+        finally:
+            self.cleanup()
 
     def cleanup(self):
         """Removes the temporary cloned repository directory."""
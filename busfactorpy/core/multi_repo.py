@@ -0,0 +1,145 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+import pandas as pd
+from .calculator import BusFactorCalculator
+from .ignore import BusFactorIgnore
+from .miner import GitMiner
+
+
+def read_repository_list(path: str) -> list[str]:
+    """Repositories (paths or URLs) listed one per line; '#' starts a comment."""
+    repositories = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line and line not in repositories:
+                repositories.append(line)
+    return repositories
+
+
+def _analyze_repository(repo_path: str, params: dict) -> pd.DataFrame:
+    """Worker entry point: mines one local repository and calculates its metrics."""
+    ignorer = BusFactorIgnore(params.pop("ignore_file"))
+    commit_data = GitMiner(repo_path, ignorer).mine_commit_history()
+    if commit_data.empty:
+        return pd.DataFrame()
+    return BusFactorCalculator(commit_data, **params).calculate()
+
+
+async def _clone(source: str, destination: str):
+    process = await asyncio.create_subprocess_exec(
+        "git",
+        "clone",
+        "--quiet",
+        "--single-branch",
+        source,
+        destination,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise ConnectionError(
+            f"Failed to clone repository: {stderr.decode(errors='replace').strip()}"
+        )
+
+
+class MultiRepoAnalyzer:
+    """
+    Analyses many repositories in one process. Clones run as asyncio-driven
+    git subprocesses; mining and metrics run in a process pool. At most
+    `concurrency` repositories are cloned or analysed at the same time, and a
+    failing repository is recorded without stopping the others.
+    """
+
+    def __init__(
+        self,
+        repositories: list[str],
+        concurrency: int = 4,
+        workers: int | None = None,
+        ignore_file: str = ".busfactorignore",
+        metric: str = "churn",
+        threshold: float = 0.8,
+        group_by: str = "file",
+        depth: int = 1,
+        on_done: Callable[[str, str | None], None] | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("The concurrency limit must be >= 1.")
+
+        self.repositories = repositories
+        self.concurrency = concurrency
+        self.workers = workers or min(concurrency, os.cpu_count() or 1)
+        self.params = {
+            "ignore_file": ignore_file,
+            "metric": metric,
+            "threshold": threshold,
+            "group_by": group_by,
+            "depth": depth,
+        }
+        # Called with (repository, error message or None) as each one finishes.
+        self.on_done = on_done
+
+    async def _analyze_one(
+        self, repository: str, pool: ProcessPoolExecutor, limit: asyncio.Semaphore
+    ) -> pd.DataFrame:
+        async with limit:
+            temp_dir = None
+            repo_path = repository
+            try:
+                if not os.path.isdir(repository):
+                    temp_dir = tempfile.mkdtemp(prefix="busfactorpy_")
+                    repo_path = os.path.join(temp_dir, "repo")
+                    await _clone(repository, repo_path)
+
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    pool, _analyze_repository, repo_path, dict(self.params)
+                )
+            finally:
+                if temp_dir:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+
+    async def _run(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        limit = asyncio.Semaphore(self.concurrency)
+        results: dict[str, pd.DataFrame] = {}
+        errors: dict[str, str] = {}
+
+        async def run_one(repository: str):
+            try:
+                results[repository] = await self._analyze_one(repository, pool, limit)
+            except Exception as e:
+                errors[repository] = str(e)
+            if self.on_done:
+                self.on_done(repository, errors.get(repository))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            await asyncio.gather(*(run_one(repo) for repo in self.repositories))
+
+        # Keep the order of the input list in both tables.
+        frames = [
+            results[repo].assign(repository=repo)
+            for repo in self.repositories
+            if repo in results and not results[repo].empty
+        ]
+        table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if not table.empty:
+            table.insert(0, "repository", table.pop("repository"))
+
+        failed = pd.DataFrame(
+            [
+                {"repository": repo, "error": errors[repo]}
+                for repo in self.repositories
+                if repo in errors
+            ],
+            columns=["repository", "error"],
+        )
+        return table, failed
+
+    def run(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Returns the consolidated results and a repository | error table."""
+        return asyncio.run(self._run())
@@ -0,0 +1,173 @@
+"""
+Overlapped mining and aggregation for `analyze --pipeline`.
+
+A producer thread runs GitMiner.mine_batches and puts each frame on a
+bounded queue; the calling thread folds the frames into running
+(file, author) totals while the next batch is being mined. When the
+consumer falls behind, the full queue blocks the producer (backpressure),
+so at most `queue_size` batches are held in memory besides the totals.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import TYPE_CHECKING, Generator
+
+import numpy as np
+import pandas as pd
+
+from .profiling import stage
+from .shard import AggregateShard
+
+if TYPE_CHECKING:
+    from .miner import GitMiner
+
+DEFAULT_BATCH_ROWS = 50_000
+DEFAULT_QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _Producer(threading.Thread):
+    """Puts the miner's batches on the queue, then _DONE (or a _Failure)."""
+
+    def __init__(
+        self, batches: Generator[pd.DataFrame, None, None], bounded: queue.Queue
+    ):
+        super().__init__(name="busfactorpy-miner", daemon=True)
+        self.batches = batches
+        self.queue = bounded
+        self.stop = threading.Event()
+
+    def _put(self, item) -> bool:
+        # Blocks while the queue is full, but gives up once the consumer
+        # has stopped reading.
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        try:
+            for batch in self.batches:
+                if not self._put(batch):
+                    return
+        except BaseException as e:
+            self._put(_Failure(e))
+            return
+        finally:
+            self.batches.close()
+        self._put(_DONE)
+
+
+class PipelinedAggregator:
+    """
+    Mines with miner and aggregates at the same time, returning an
+    AggregateShard of the kept rows. since/until drop rows outside the
+    dates before they are folded.
+    """
+
+    def __init__(
+        self,
+        miner: GitMiner,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        since=None,
+        until=None,
+    ):
+        if batch_rows < 1 or queue_size < 1:
+            raise ValueError("batch_rows and queue_size must be >= 1.")
+        self.miner = miner
+        self.batch_rows = batch_rows
+        self.queue_size = queue_size
+        self.since = since
+        self.until = until
+        self.batches = 0
+        self._totals: pd.DataFrame | None = None
+        self._pending: list[pd.DataFrame] = []
+        self._pending_rows = 0
+        self._hashes: list[np.ndarray] = []
+
+    def _fold(self, batch: pd.DataFrame):
+        """Aggregates one batch and merges it into the running totals."""
+        with stage("pipeline.aggregate", rows=len(batch)):
+            if self.since is not None or self.until is not None:
+                dates = pd.to_datetime(batch["date"], utc=True).dt.tz_localize(None)
+                keep = np.ones(len(batch), dtype=bool)
+                if self.since is not None:
+                    keep &= (dates >= self.since).to_numpy()
+                if self.until is not None:
+                    keep &= (dates <= self.until).to_numpy()
+                batch = batch[keep]
+            if batch.empty:
+                return
+
+            # Interned IDs only grow, so every ID in the batch is known.
+            assert self.miner.identity is not None
+            emails = np.asarray(self.miner.identity.emails, dtype=object)
+            partial = AggregateShard.from_commits(
+                batch.assign(author=emails[batch["author"].to_numpy()])
+            ).stats
+            self._hashes.append(batch["commit_hash"].unique())
+
+            # Fold the partials once they outgrow the totals, so every row is
+            # re-aggregated O(log n) times.
+            self._pending.append(partial)
+            self._pending_rows += len(partial)
+            if self._totals is None or self._pending_rows >= len(self._totals):
+                self._compact()
+
+    def _compact(self):
+        frames = (
+            self._pending if self._totals is None else [self._totals, *self._pending]
+        )
+        if frames:
+            self._totals = AggregateShard.combine_stats(frames)
+        self._pending, self._pending_rows = [], 0
+
+    def run(self) -> AggregateShard:
+        bounded: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        producer = _Producer(self.miner.mine_batches(self.batch_rows), bounded)
+        producer.start()
+        try:
+            while True:
+                item = bounded.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                self.batches += 1
+                self._fold(item)
+        finally:
+            producer.stop.set()
+            producer.join()
+
+        self._compact()
+        stats = self._totals
+        if stats is None:
+            stats = pd.DataFrame(
+                {
+                    "file": pd.Series(dtype=object),
+                    "author": pd.Series(dtype=object),
+                    "lines_added": pd.Series(dtype=np.int64),
+                    "lines_deleted": pd.Series(dtype=np.int64),
+                    "commits": pd.Series(dtype=np.int64),
+                    "first_date": pd.Series(dtype="datetime64[ns]"),
+                    "last_date": pd.Series(dtype="datetime64[ns]"),
+                }
+            )
+        hashes = np.concatenate(self._hashes) if self._hashes else np.empty(0)
+        return AggregateShard(
+            stats,
+            pd.unique(hashes).tolist(),
+            [self.miner.commit_range or "HEAD"],
+        )
@@ -0,0 +1,322 @@
+"""
+Stage timers for `analyze --profile`.
+
+Instrumented code wraps its stages in `stage(name)`; while no profiler is
+active (the default) that is a shared no-op context, so the instrumentation
+costs a function call per stage. When a StageProfiler is active, each stage
+records its wall time, CPU time, processed rows and memory high-water marks.
+Stages with the same name are accumulated, and every stage remembers the
+stage it first ran inside (its parent), so nested timings are not added up.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, TypeVar
+
+if TYPE_CHECKING:
+    import cProfile
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageRecord:
+    name: str
+    parent: str | None = None
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows: int = 0
+    # tracemalloc peak of traced Python/NumPy allocations (None when off).
+    peak_traced_bytes: int | None = None
+    # Process resident set high-water mark when the stage ended.
+    peak_rss_bytes: int | None = None
+
+
+class _StageRun:
+    """
+    Handle yielded by stage(): set .rows to the rows the stage processed, or
+    .calls to 0 when the run should not count as a call.
+    """
+
+    __slots__ = ("rows", "calls")
+
+    def __init__(self, rows: int = 0):
+        self.rows = rows
+        self.calls = 1
+
+
+class _NullRun:
+    """
+    Handle yielded while profiling is off. Writes to .rows and .calls are
+    dropped, so the single instance is safe to share between threads.
+    """
+
+    __slots__ = ()
+
+    @property
+    def rows(self) -> int:
+        return 0
+
+    @rows.setter
+    def rows(self, value: int) -> None:
+        pass
+
+    @property
+    def calls(self) -> int:
+        return 1
+
+    @calls.setter
+    def calls(self, value: int) -> None:
+        pass
+
+
+class _NullStage:
+    """Context used when profiling is off."""
+
+    run = _NullRun()
+
+    def __enter__(self) -> _NullRun:
+        return self.run
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+_active: "StageProfiler | None" = None
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageProfiler:
+    """
+    Collects StageRecords between start() and stop(). trace_memory enables
+    tracemalloc (slow, but exact per-stage peaks); cprofile_stage names a
+    stage to run under cProfile.
+    """
+
+    def __init__(self, trace_memory: bool = False, cprofile_stage: str | None = None):
+        self.trace_memory = trace_memory
+        self.cprofile_stage = cprofile_stage
+        self.records: dict[str, StageRecord] = {}
+        # Stage stacks are per thread, so a pipeline's producer thread keeps
+        # its own nesting.
+        self._local = threading.local()
+        self._cprofile: cProfile.Profile | None = None
+        self._started: float | None = None
+        self.total_wall_seconds = 0.0
+
+    @property
+    def _stack(self) -> list[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @property
+    def _stack_peaks(self) -> list[int]:
+        if not hasattr(self._local, "peaks"):
+            self._local.peaks = []
+        return self._local.peaks
+
+    # Activation ---------------------------------------------------------
+
+    def start(self) -> "StageProfiler":
+        global _active
+        if self.trace_memory:
+            tracemalloc.start()
+        self._started = time.perf_counter()
+        _active = self
+        return self
+
+    def stop(self):
+        global _active
+        if _active is self:
+            _active = None
+        if self._started is not None:
+            self.total_wall_seconds = time.perf_counter() - self._started
+            self._started = None
+        if self.trace_memory:
+            tracemalloc.stop()
+
+    # Recording ----------------------------------------------------------
+
+    def _record(self, name: str) -> StageRecord:
+        record = self.records.get(name)
+        if record is None:
+            parent = self._stack[-1] if self._stack else None
+            record = self.records[name] = StageRecord(name, parent)
+        return record
+
+    def add(
+        self,
+        name: str,
+        wall_seconds: float,
+        cpu_seconds: float,
+        rows: int = 0,
+        calls: int = 1,
+    ):
+        """Adds a measurement taken elsewhere (e.g. in a worker process)."""
+        record = self._record(name)
+        record.calls += calls
+        record.wall_seconds += wall_seconds
+        record.cpu_seconds += cpu_seconds
+        record.rows += rows
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[_StageRun]:
+        record = self._record(name)
+        run = _StageRun(rows)
+
+        if self.trace_memory:
+            # The enclosing stage keeps the peak reached before this one.
+            if self._stack_peaks:
+                self._stack_peaks[-1] = max(
+                    self._stack_peaks[-1], tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+        self._stack.append(name)
+        self._stack_peaks.append(0)
+
+        profile = None
+        if name == self.cprofile_stage:
+            if self._cprofile is None:
+                import cProfile
+
+                self._cprofile = cProfile.Profile()
+            profile = self._cprofile
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield run
+        finally:
+            if profile is not None:
+                profile.disable()
+            record.calls += run.calls
+            record.wall_seconds += time.perf_counter() - wall
+            record.cpu_seconds += time.process_time() - cpu
+            record.rows += run.rows
+
+            self._stack.pop()
+            peak = self._stack_peaks.pop()
+            if self.trace_memory:
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                record.peak_traced_bytes = max(record.peak_traced_bytes or 0, peak)
+                if self._stack_peaks:
+                    self._stack_peaks[-1] = max(self._stack_peaks[-1], peak)
+            record.peak_rss_bytes = _peak_rss_bytes()
+
+    # Output -------------------------------------------------------------
+
+    def report(self) -> dict:
+        return {
+            "total_wall_seconds": self.total_wall_seconds,
+            "peak_rss_bytes": _peak_rss_bytes(),
+            "trace_memory": self.trace_memory,
+            "stages": [asdict(record) for record in self.records.values()],
+        }
+
+    def save(self, path: str) -> str | None:
+        """
+        Writes the JSON report to path. When a cProfile stage was requested,
+        its dump is written next to it (same name, .prof) and returned.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+        if self._cprofile is None:
+            return None
+        dump = f"{os.path.splitext(path)[0]}.prof"
+        self._cprofile.dump_stats(dump)
+        return dump
+
+
+def active() -> StageProfiler | None:
+    return _active
+
+
+def stage(name: str, rows: int = 0):
+    """Times a stage on the active profiler; a no-op when profiling is off."""
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, rows)
+
+
+def timed_iter(name: str, items: Iterable[T]) -> Iterator[T]:
+    """
+    Yields from items, timing only the work done to produce each item (not
+    the consumer's), with len(item) rows when available.
+    """
+    iterator = iter(items)
+    while True:
+        with stage(name) as run:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                run.calls = 0
+                return
+            run.rows = len(item) if hasattr(item, "__len__") else 0
+        yield item
+
+
+def timed_call(name: str, fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    fn, or, while profiling, a wrapper accumulating the time of every call
+    (one row per call). Meant for small functions called in hot loops.
+    """
+    profiler = _active
+    if profiler is None:
+        return fn
+
+    record = profiler._record(name)
+    perf_counter, process_time = time.perf_counter, time.process_time
+
+    def timed(*args, **kwargs):
+        wall, cpu = perf_counter(), process_time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record.calls += 1
+            record.rows += 1
+            record.wall_seconds += perf_counter() - wall
+            record.cpu_seconds += process_time() - cpu
+
+    return timed
+
+
+def staged(name: str, rows: Callable[..., int] | None = None):
+    """
+    Decorator running the function as a stage; rows, if given, is called
+    with the function's arguments to count the rows it processes.
+    """
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with _active.stage(name) as run:
+                if rows is not None:
+                    run.rows = rows(*args, **kwargs)
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,113 @@
+"""
+Mining progress counters.
+
+GitMiner updates a MiningProgress while it walks the history and passes it
+to its on_progress callback at most every `interval` seconds (and once more
+when the walk ends), so the counters cost a few integer additions per commit
+and callbacks cannot slow the loop down however often commits arrive.
+"""
+
+import json
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import IO, Callable
+
+DEFAULT_INTERVAL = 0.5
+
+
+@dataclass
+class MiningProgress:
+    # Commits walked, including the resumed_commits restored from a checkpoint.
+    commits: int = 0
+    resumed_commits: int = 0
+    # Commits the walk will visit (`git rev-list --count`); None if unknown.
+    total_commits: int | None = None
+    modifications: int = 0
+    # Rows mined so far (before --scope filtering).
+    rows_kept: int = 0
+    # Modifications dropped by the ignore rules.
+    rows_ignored: int = 0
+    elapsed_seconds: float = 0.0
+    last_commit: str | None = None
+    done: bool = False
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def commits_mined(self) -> int:
+        """Commits mined by this run, i.e. not restored from a checkpoint."""
+        return self.commits - self.resumed_commits
+
+    @property
+    def commits_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.commits_mined / self.elapsed_seconds
+
+    @property
+    def modifications_per_second(self) -> float:
+        return (
+            self.modifications / self.elapsed_seconds if self.elapsed_seconds else 0.0
+        )
+
+    @property
+    def eta_seconds(self) -> float | None:
+        """Remaining time at the current commit rate."""
+        if self.done:
+            return 0.0
+        if self.total_commits is None or not self.commits_per_second:
+            return None
+        remaining = max(self.total_commits - self.commits, 0)
+        return remaining / self.commits_per_second
+
+    def to_dict(self) -> dict:
+        return {
+            "commits": self.commits,
+            "resumed_commits": self.resumed_commits,
+            "total_commits": self.total_commits,
+            "modifications": self.modifications,
+            "rows_kept": self.rows_kept,
+            "rows_ignored": self.rows_ignored,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "commits_per_second": round(self.commits_per_second, 2),
+            "modifications_per_second": round(self.modifications_per_second, 2),
+            "eta_seconds": (
+                None if self.eta_seconds is None else round(self.eta_seconds, 1)
+            ),
+            "last_commit": self.last_commit,
+            "done": self.done,
+        }
+
+
+ProgressCallback = Callable[[MiningProgress], None]
+
+
+def count_commits(repo_path: str, rev: str = "HEAD") -> int | None:
+    """`git rev-list --count rev`, or None when git cannot tell."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-list", "--count", rev],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return int(output)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+class ProgressLog:
+    """
+    on_progress callback appending every snapshot as a JSON line (with a
+    wall-clock timestamp), so a supervisor can tail the file and flag jobs
+    whose counters stop moving.
+    """
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+
+    def __call__(self, progress: MiningProgress):
+        record = {"timestamp": round(time.time(), 3), **progress.to_dict()}
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+RISKY_CLASSES = ("Critical", "High", "Medium")
+
+
+def select_top_risks(
+    results_df: pd.DataFrame,
+    n_top: int = 10,
+    classes: tuple[str, ...] | None = RISKY_CLASSES,
+) -> pd.DataFrame:
+    """
+    Returns the n_top riskiest rows (Critical, High or Medium by default),
+    ordered by main_author_share and then total_file_churn, both descending.
+    With classes=None every row competes, whatever its risk class.
+
+    Gives the same rows and order as a stable
+    sort_values([...], ascending=False).head(n_top), but only the candidates
+    selected with np.partition are sorted, so the cost stays linear in the
+    number of results for the usual small n_top.
+    """
+    risky = results_df
+    if classes is not None:
+        risky = results_df[results_df["risk_class"].isin(classes)]
+    if n_top <= 0 or risky.empty:
+        return risky.iloc[:0]
+
+    # sort_values places NaN last, which -inf reproduces for a descending order.
+    share = np.nan_to_num(
+        pd.to_numeric(risky["main_author_share"], errors="coerce").to_numpy(float),
+        nan=-np.inf,
+    )
+    if "total_file_churn" in risky.columns:
+        churn = np.nan_to_num(
+            pd.to_numeric(risky["total_file_churn"], errors="coerce").to_numpy(float),
+            nan=-np.inf,
+        )
+    else:
+        churn = np.zeros(len(risky))
+
+    candidates = np.arange(len(risky))
+    if len(risky) > n_top:
+        kth = len(risky) - n_top
+        cutoff = np.partition(share, kth)[kth]
+        above = np.flatnonzero(share > cutoff)
+        ties = np.flatnonzero(share == cutoff)
+
+        # Rows tied on the cut-off share compete on churn for the last slots.
+        missing = n_top - len(above)
+        if len(ties) > missing:
+            tie_churn = churn[ties]
+            kth = len(ties) - missing
+            ties = ties[tie_churn >= np.partition(tie_churn, kth)[kth]]
+        candidates = np.concatenate([above, ties])
+
+    # np.lexsort sorts by the last key first; position keeps the order stable.
+    order = np.lexsort((candidates, -churn[candidates], -share[candidates]))
+    return risky.iloc[candidates[order][:n_top]]
@@ -0,0 +1,156 @@
+import subprocess
+from typing import Any, Iterable
+import pandas as pd
+from .calculator import BusFactorCalculator
+from .ignore import BusFactorIgnore
+from .miner import GitMiner
+
+_GLOB_CHARS = set("*?[")
+
+
+def _git(repo_path: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def _verify(repo_path: str, ref: str) -> bool:
+    return (
+        subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"],
+            cwd=repo_path,
+            capture_output=True,
+        ).returncode
+        == 0
+    )
+
+
+def resolve_refs(repo_path: str, patterns: Iterable[str]) -> list[str]:
+    """
+    Expands ref names and glob patterns (e.g. 'release/*') into existing refs.
+    Patterns match local branches, tags and origin's remote-tracking branches;
+    a plain name missing locally falls back to 'origin/<name>' (fresh clones
+    only have the default branch locally).
+    """
+    refs: list[str] = []
+    for pattern in patterns:
+        if _GLOB_CHARS.intersection(pattern):
+            matched = _git(
+                repo_path,
+                "for-each-ref",
+                "--format=%(refname:short)",
+                f"refs/heads/{pattern}",
+                f"refs/tags/{pattern}",
+                f"refs/remotes/origin/{pattern}",
+            ).split()
+        elif _verify(repo_path, pattern):
+            matched = [pattern]
+        elif _verify(repo_path, f"origin/{pattern}"):
+            matched = [f"origin/{pattern}"]
+        else:
+            matched = []
+
+        if not matched:
+            raise ValueError(f"No ref matches '{pattern}'.")
+        refs.extend(ref for ref in matched if ref not in refs)
+    return refs
+
+
+def reachable_commits(repo_path: str, refs: Iterable[str]) -> dict[str, list[str]]:
+    """Full hashes of the commits reachable from each ref (as `git rev-list`)."""
+    return {ref: _git(repo_path, "rev-list", ref).split() for ref in refs}
+
+
+class MultiRefAnalyzer:
+    """
+    Compares several branches of one repository. Every commit reachable from
+    any of the refs is mined exactly once into a shared store; each ref's
+    result is then calculated from the rows of its own reachable commits, so
+    the history the branches share is not mined again per branch.
+    """
+
+    def __init__(
+        self,
+        repository: str,
+        refs: list[str],
+        ignore_file: str = ".busfactorignore",
+        scope: str | None = None,
+        aliases: str | None = None,
+        metric: str = "churn",
+        threshold: float = 0.8,
+        group_by: str = "file",
+        depth: int = 1,
+    ):
+        if not refs:
+            raise ValueError("At least one ref is required.")
+
+        self.miner = GitMiner(
+            repository,
+            BusFactorIgnore(ignore_file),
+            scope=scope,
+            refs=refs,
+            aliases=aliases,
+        )
+        self.params: dict[str, Any] = {
+            "metric": metric,
+            "threshold": threshold,
+            "group_by": group_by,
+            "depth": depth,
+        }
+        self.commit_data: pd.DataFrame | None = None
+        self.results: dict[str, pd.DataFrame] = {}
+
+    @property
+    def ref_commits(self) -> dict[str, list[str]]:
+        return self.miner.ref_commits
+
+    def run(self) -> pd.DataFrame:
+        """Returns the results of all refs, with a leading ref column."""
+        self.commit_data = data = self.miner.mine_commit_history()
+
+        # Rows are selected per ref through their commit codes, so each
+        # membership test runs once per distinct commit rather than per row.
+        commit_codes, commits = pd.factorize(data["commit_hash"])
+        for ref, reachable in self.ref_commits.items():
+            rows = data[commits.isin(reachable)[commit_codes]]
+            self.results[ref] = (
+                BusFactorCalculator(rows, **self.params).calculate()
+                if not rows.empty
+                else pd.DataFrame()
+            )
+
+        frames = [
+            result.assign(ref=ref)
+            for ref, result in self.results.items()
+            if not result.empty
+        ]
+        table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if not table.empty:
+            table.insert(0, "ref", table.pop("ref"))
+        return table
+
+    def summary(self) -> pd.DataFrame:
+        """ref | commits | files | critical | high, one row per ref."""
+        rows = []
+        for ref, result in self.results.items():
+            risks = (
+                result["risk_class"].value_counts()
+                if not result.empty
+                else pd.Series(dtype=int)
+            )
+            rows.append(
+                {
+                    "ref": ref,
+                    "commits": len(self.ref_commits[ref]),
+                    "files": len(result),
+                    "critical": int(risks.get("Critical", 0)),
+                    "high": int(risks.get("High", 0)),
+                }
+            )
+        return pd.DataFrame(
+            rows, columns=["ref", "commits", "files", "critical", "high"]
+        )
@@ -0,0 +1,132 @@
+from bisect import bisect_left
+from typing import Iterable, Sequence
+import numpy as np
+import pandas as pd
+from .calculator import BusFactorCalculator
+
+
+def normalize_scope(scope: str | None) -> str | None:
+    """Normalizes a scope to a POSIX path relative to the repository root."""
+    if not scope:
+        return None
+    normalized = scope.strip().replace("\\", "/").strip("/")
+    return normalized or None
+
+
+def load_scopes(
+    scopes: Iterable[str] | None, scope_file: str | None = None
+) -> list[str]:
+    """
+    Combines scopes given on the command line with those listed in a file
+    (one per line, '#' starts a comment). Duplicates are dropped, order kept.
+    """
+    values = list(scopes or [])
+    if scope_file:
+        with open(scope_file, encoding="utf-8") as f:
+            values.extend(line.split("#", 1)[0] for line in f)
+
+    normalized = (normalize_scope(v) for v in values)
+    return list(dict.fromkeys(s for s in normalized if s))
+
+
+class ScopeResolver:
+    """
+    Resolves scopes (exact paths or directory prefixes) against a sorted list
+    of unique paths with bisect, so each scope costs O(log n) plus its matches.
+    """
+
+    def __init__(self, scopes: Iterable[str]):
+        self.scopes = load_scopes(scopes)
+
+    @staticmethod
+    def _match(sorted_paths: Sequence[str], scope: str) -> np.ndarray:
+        matches = []
+        i = bisect_left(sorted_paths, scope)
+        if i < len(sorted_paths) and sorted_paths[i] == scope:
+            matches.append(i)
+
+        # Everything under 'scope/' sorts before 'scope0' ('0' follows '/').
+        lo = bisect_left(sorted_paths, f"{scope}/")
+        hi = bisect_left(sorted_paths, f"{scope}0")
+        return np.concatenate(
+            [np.array(matches, dtype=np.int64), np.arange(lo, hi, dtype=np.int64)]
+        )
+
+    def resolve(self, sorted_paths: Sequence[str]) -> dict[str, np.ndarray]:
+        """Returns, for every scope, the indices of the paths it contains."""
+        return {scope: self._match(sorted_paths, scope) for scope in self.scopes}
+
+    def filter(self, commit_data: pd.DataFrame) -> pd.DataFrame:
+        """Keeps the rows whose file belongs to at least one scope."""
+        paths = sorted(commit_data["file"].unique())
+        matched = [np.empty(0, dtype=np.int64), *self.resolve(paths).values()]
+        keep = [paths[i] for i in np.unique(np.concatenate(matched))]
+        return commit_data[commit_data["file"].isin(keep)]
+
+
+def _expand_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenates arange(start, end) for every pair, without a Python loop."""
+    lengths = ends - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum())
+
+
+def calculate_scopes(
+    commit_data: pd.DataFrame,
+    scopes: Iterable[str],
+    metric: str = "churn",
+    threshold: float = 0.8,
+    group_by: str = "file",
+    depth: int = 1,
+) -> dict[str, pd.DataFrame]:
+    """
+    Computes one result frame per scope from a single file/author aggregation
+    of commit_data. Each scope only slices the aggregate before the metric
+    (and the optional directory grouping) is applied.
+    """
+    stats = BusFactorCalculator(
+        commit_data, metric=metric, threshold=threshold
+    ).aggregate_author_stats()
+    return calculate_scopes_from_stats(
+        stats,
+        scopes,
+        metric=metric,
+        threshold=threshold,
+        group_by=group_by,
+        depth=depth,
+    )
+
+
+def calculate_scopes_from_stats(
+    stats: pd.DataFrame,
+    scopes: Iterable[str],
+    metric: str = "churn",
+    threshold: float = 0.8,
+    group_by: str = "file",
+    depth: int = 1,
+) -> dict[str, pd.DataFrame]:
+    """
+    Same as calculate_scopes, over a file | author | total_churn | commits
+    table in any row order (e.g. AggregateCube.author_stats()).
+    """
+    # Once stably sorted by file, each unique file owns a contiguous row range.
+    order = np.argsort(stats["file"].to_numpy(), kind="stable")
+    files = stats["file"].to_numpy()[order]
+    unique_files, starts = np.unique(files, return_index=True)
+    ends = np.append(starts[1:], len(files))
+
+    results = {}
+    for scope, file_idx in ScopeResolver(scopes).resolve(unique_files.tolist()).items():
+        file_idx = np.sort(file_idx)
+        # Back to input positions, kept in the input order.
+        rows = np.sort(order[_expand_ranges(starts[file_idx], ends[file_idx])])
+        calculator = BusFactorCalculator.from_author_stats(
+            stats.iloc[rows],
+            metric=metric,
+            threshold=threshold,
+            group_by=group_by,
+            depth=depth,
+        )
+        results[scope] = calculator.calculate()
+
+    return results
@@ -0,0 +1,204 @@
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from .analyzer import RiskAnalyzer
+from .calculator import BusFactorCalculator
+from .columnar import load_columns, save_columns
+from .ignore import BusFactorIgnore
+from .metrics import get_metric
+from .miner import GitMiner
+from .scope import normalize_scope
+
+SESSION_KIND = "busfactorpy-session"
+
+
+def _to_timestamp(value: str | datetime | None) -> pd.Timestamp | None:
+    return None if value is None else pd.Timestamp(value)
+
+
+class AnalysisSession:
+    """
+    Mines (or loads) a commit history once and answers many
+    BusFactorCalculator-style queries against factorized in-memory arrays.
+
+    Per-query aggregates and metric frames are memoized with an LRU keyed by
+    the query parameters; the threshold only affects the final classification.
+    """
+
+    def __init__(self, commit_data: pd.DataFrame, cache_size: int = 128):
+        self.file_codes, self.files = pd.factorize(commit_data["file"])
+        self.author_codes, self.authors = pd.factorize(commit_data["author"])
+        self.churn = (
+            commit_data["lines_added"] + commit_data["lines_deleted"]
+        ).to_numpy(np.int64)
+
+        self.dates = None
+        if "date" in commit_data.columns:
+            dates = pd.to_datetime(commit_data["date"], utc=True).dt.tz_localize(None)
+            self.dates = dates.to_numpy("datetime64[ns]")
+
+        self._aggregate = lru_cache(maxsize=cache_size)(self._compute_aggregate)
+        self._metric = lru_cache(maxsize=cache_size)(self._compute_metric)
+
+    @classmethod
+    def from_repository(
+        cls,
+        repository: str,
+        ignore_file: str = ".busfactorignore",
+        cache_size: int = 128,
+    ) -> "AnalysisSession":
+        """Mines the repository once (without scope, so every query can use it)."""
+        miner = GitMiner(repository, BusFactorIgnore(ignore_file))
+        return cls(miner.mine_commit_history(), cache_size=cache_size)
+
+    def save(self, path: str):
+        """
+        Persists the factorized arrays to the directory path (one .npy per
+        array, the file and author dictionaries as JSON) so the history can
+        be reloaded later.
+        """
+        columns = {
+            "file_codes": self.file_codes,
+            "author_codes": self.author_codes,
+            "churn": self.churn,
+        }
+        if self.dates is not None:
+            columns["dates"] = self.dates.astype(np.int64)
+        save_columns(
+            path,
+            SESSION_KIND,
+            columns,
+            dictionaries={
+                "files": [str(f) for f in self.files],
+                "authors": [str(a) for a in self.authors],
+            },
+        )
+
+    @classmethod
+    def load(cls, path: str, cache_size: int = 128) -> "AnalysisSession":
+        """Reloads a session written by save() without mining again."""
+        columns, dictionaries, _ = load_columns(path, SESSION_KIND, mmap=False)
+        session = cls.__new__(cls)
+        session.file_codes = columns["file_codes"]
+        session.files = pd.Index(dictionaries["files"], dtype=object)
+        session.author_codes = columns["author_codes"]
+        session.authors = pd.Index(dictionaries["authors"], dtype=object)
+        session.churn = columns["churn"]
+        session.dates = (
+            columns["dates"].view("datetime64[ns]") if "dates" in columns else None
+        )
+        session._aggregate = lru_cache(maxsize=cache_size)(session._compute_aggregate)
+        session._metric = lru_cache(maxsize=cache_size)(session._compute_metric)
+        return session
+
+    def cache_info(self) -> dict:
+        return {
+            "aggregate": self._aggregate.cache_info(),
+            "metric": self._metric.cache_info(),
+        }
+
+    def _group_codes(self, group_by: str, depth: int, scope: str | None):
+        """
+        Maps every distinct file to a group code (-1 when out of scope or not
+        at the requested directory depth). Works on the file dictionary, not
+        on the commit rows.
+        """
+        files = pd.Series(self.files.astype(str))
+        keep = np.ones(len(files), dtype=bool)
+
+        if scope:
+            keep &= ((files == scope) | files.str.startswith(f"{scope}/")).to_numpy()
+
+        if group_by == "directory":
+            keys_and_depths = [
+                BusFactorCalculator._dir_key_and_depth(p, depth) for p in files
+            ]
+            keys = pd.Series([k for k, _ in keys_and_depths])
+            keep &= np.array([d == depth for _, d in keys_and_depths], dtype=bool)
+        else:
+            keys = files
+
+        codes, groups = pd.factorize(keys.where(keep))
+        return codes, groups
+
+    def _compute_aggregate(
+        self,
+        group_by: str,
+        depth: int,
+        scope: str | None,
+        since: pd.Timestamp | None,
+        until: pd.Timestamp | None,
+    ) -> pd.DataFrame:
+        """Returns file | author | total_churn | commits for one query."""
+        file_group, groups = self._group_codes(group_by, depth, scope)
+        group = file_group[self.file_codes]
+        mask = group >= 0
+
+        if since is not None or until is not None:
+            if self.dates is None:
+                raise ValueError("Date filters need commit dates in the history.")
+            if since is not None:
+                mask &= self.dates >= since.to_datetime64()
+            if until is not None:
+                mask &= self.dates <= until.to_datetime64()
+
+        n_authors = len(self.authors)
+        pairs = group[mask].astype(np.int64) * n_authors + self.author_codes[mask]
+        unique_pairs, inverse = np.unique(pairs, return_inverse=True)
+
+        return pd.DataFrame(
+            {
+                "file": np.asarray(groups)[unique_pairs // n_authors],
+                "author": np.asarray(self.authors)[unique_pairs % n_authors],
+                "total_churn": np.bincount(
+                    inverse, weights=self.churn[mask], minlength=len(unique_pairs)
+                ).astype(np.int64),
+                "commits": np.bincount(inverse, minlength=len(unique_pairs)),
+            }
+        )
+
+    def _compute_metric(self, metric: str, *aggregate_key) -> pd.DataFrame:
+        aggregate = self._aggregate(*aggregate_key)
+        # Grouping was already applied while aggregating.
+        calculator = BusFactorCalculator.from_author_stats(aggregate, metric=metric)
+        return calculator.compute_metric()
+
+    def query(
+        self,
+        metric: str = "churn",
+        threshold: float = 0.8,
+        group_by: str = "file",
+        depth: int = 1,
+        scope: str | None = None,
+        since: str | datetime | None = None,
+        until: str | datetime | None = None,
+    ) -> pd.DataFrame:
+        """
+        Answers one query with the same result schema as
+        BusFactorCalculator.calculate().
+        """
+        metric = metric.lower()
+        if get_metric(metric).source != "history":
+            raise ValueError(f"The '{metric}' metric is not computed from commits.")
+        group_by = BusFactorCalculator._check_group_by(group_by, depth)
+        if group_by == "file":
+            depth = 1  # depth is irrelevant when grouping by file
+
+        result = self._metric(
+            metric,
+            group_by,
+            depth,
+            normalize_scope(scope),
+            _to_timestamp(since),
+            _to_timestamp(until),
+        )
+
+        # The cached frame is shared between queries; classify a copy.
+        result = result.copy()
+        result["risk_class"] = (
+            RiskAnalyzer.classify_frame(result, threshold)
+            if not result.empty
+            else pd.Series(dtype=object)
+        )
+        return result
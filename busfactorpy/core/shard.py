@@ -0,0 +1,179 @@
+from typing import Iterable
+import numpy as np
+import pandas as pd
+from .columnar import load_columns, read_meta, save_columns
+from .scope import ScopeResolver, normalize_scope
+
+SHARD_KIND = "busfactorpy-shard"
+
+SHARD_COLUMNS = [
+    "file",
+    "author",
+    "lines_added",
+    "lines_deleted",
+    "commits",
+    "first_date",
+    "last_date",
+]
+
+
+class AggregateShard:
+    """
+    Partial (file, author) aggregate of a slice of the history, written by
+    `busfactorpy mine-shard`. Sums, counts and first/last dates combine
+    associatively, so shards mined on different machines can be merged in any
+    order and grouping.
+
+    The mined commit hashes are kept so merging overlapping shards (which
+    would count commits twice) is rejected.
+    """
+
+    def __init__(
+        self,
+        stats: pd.DataFrame,
+        commit_hashes: Iterable[str] = (),
+        ranges: Iterable[str] = (),
+    ):
+        self.stats = stats[SHARD_COLUMNS].reset_index(drop=True)
+        self.commit_hashes = list(commit_hashes)
+        self.ranges = list(ranges)
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    @classmethod
+    def from_commits(
+        cls,
+        commit_data: pd.DataFrame,
+        commit_hashes: Iterable[str] = (),
+        commit_range: str | None = None,
+    ) -> "AggregateShard":
+        """Aggregates GitMiner rows (file, author, date, lines) into a shard."""
+        dates = pd.to_datetime(commit_data["date"], utc=True).dt.tz_localize(None)
+        stats = (
+            commit_data.assign(date=dates, author=commit_data["author"].astype(str))
+            .groupby(["file", "author"], sort=True)
+            .agg(
+                lines_added=("lines_added", "sum"),
+                lines_deleted=("lines_deleted", "sum"),
+                commits=("lines_added", "size"),
+                first_date=("date", "min"),
+                last_date=("date", "max"),
+            )
+            .reset_index()
+        )
+        return cls(stats, commit_hashes, [commit_range or "HEAD"])
+
+    @classmethod
+    def merge(cls, shards: Iterable["AggregateShard"]) -> "AggregateShard":
+        """Combines shards of disjoint commit sets into a single shard."""
+        shards = list(shards)
+        seen: set[str] = set()
+        for shard in shards:
+            overlap = seen.intersection(shard.commit_hashes)
+            if overlap:
+                raise ValueError(
+                    f"Shards overlap on {len(overlap)} commits "
+                    f"(e.g. {min(overlap)}); their ranges must be disjoint."
+                )
+            seen.update(shard.commit_hashes)
+
+        return cls(
+            cls.combine_stats(shard.stats for shard in shards),
+            [h for shard in shards for h in shard.commit_hashes],
+            [r for shard in shards for r in shard.ranges],
+        )
+
+    @staticmethod
+    def combine_stats(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """Folds partial stats frames (SHARD_COLUMNS) into one row per pair."""
+        return (
+            pd.concat(list(frames), ignore_index=True)
+            .groupby(["file", "author"], sort=True)
+            .agg(
+                lines_added=("lines_added", "sum"),
+                lines_deleted=("lines_deleted", "sum"),
+                commits=("commits", "sum"),
+                first_date=("first_date", "min"),
+                last_date=("last_date", "max"),
+            )
+            .reset_index()
+        )
+
+    @staticmethod
+    def is_shard(path: str) -> bool:
+        meta = read_meta(path)
+        return meta is not None and meta.get("kind") == SHARD_KIND
+
+    def save(self, path: str):
+        file_codes, files = pd.factorize(self.stats["file"], sort=True)
+        author_codes, authors = pd.factorize(self.stats["author"], sort=True)
+        save_columns(
+            path,
+            SHARD_KIND,
+            {
+                "file": file_codes.astype(np.int32),
+                "author": author_codes.astype(np.int32),
+                "lines_added": self.stats["lines_added"].to_numpy(np.int64),
+                "lines_deleted": self.stats["lines_deleted"].to_numpy(np.int64),
+                "commits": self.stats["commits"].to_numpy(np.int64),
+                "first_date": self.stats["first_date"].to_numpy("datetime64[s]"),
+                "last_date": self.stats["last_date"].to_numpy("datetime64[s]"),
+            },
+            dictionaries={
+                "files": files.tolist(),
+                "authors": authors.tolist(),
+                "commit_hashes": self.commit_hashes,
+            },
+            meta={"rows": len(self), "ranges": self.ranges},
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "AggregateShard":
+        columns, dictionaries, meta = load_columns(path, SHARD_KIND, mmap=False)
+        files = np.asarray(dictionaries["files"], dtype=object)
+        authors = np.asarray(dictionaries["authors"], dtype=object)
+        stats = pd.DataFrame(
+            {
+                "file": files[columns["file"]],
+                "author": authors[columns["author"]],
+                "lines_added": columns["lines_added"],
+                "lines_deleted": columns["lines_deleted"],
+                "commits": columns["commits"],
+                "first_date": columns["first_date"],
+                "last_date": columns["last_date"],
+            }
+        )
+        return cls(stats, dictionaries["commit_hashes"], meta.get("ranges", []))
+
+    def author_stats(
+        self, since=None, until=None, scope: str | None = None
+    ) -> pd.DataFrame:
+        """
+        Returns file | author | total_churn | commits, the input of
+        BusFactorCalculator.from_author_stats. Shards only keep first/last
+        dates per pair, so date filters are not supported.
+        """
+        if since is not None or until is not None:
+            raise ValueError("Shards cannot be filtered by date; use a cube.")
+
+        stats = self.stats
+        scope = normalize_scope(scope)
+        if scope:
+            files = stats["file"].to_numpy()
+            unique_files, inverse = np.unique(files, return_inverse=True)
+            matched = ScopeResolver([scope]).resolve(unique_files.tolist())[scope]
+            in_scope = np.zeros(len(unique_files), dtype=bool)
+            in_scope[matched] = True
+            stats = stats[in_scope[inverse]]
+
+        return pd.DataFrame(
+            {
+                "file": stats["file"].to_numpy(),
+                "author": stats["author"].to_numpy(),
+                "total_churn": (
+                    stats["lines_added"] + stats["lines_deleted"]
+                ).to_numpy(),
+                "commits": stats["commits"].to_numpy(),
+            }
+        )
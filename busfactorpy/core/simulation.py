@@ -0,0 +1,109 @@
+from typing import Iterable
+import numpy as np
+import pandas as pd
+from .calculator import BusFactorCalculator
+from .scope import _expand_ranges
+
+ORPHANED = "Orphaned"
+
+COMPARED_COLUMNS = ["n_authors", "main_author", "main_author_share", "risk_class"]
+
+
+class AuthorRemovalSimulator:
+    """
+    Answers "what if these authors leave?" scenarios. The baseline results
+    are computed once; each scenario looks up the files of the removed
+    authors through an author -> rows inverted index and recomputes the
+    metric for those files only, without the removed authors' work.
+    """
+
+    def __init__(
+        self,
+        author_stats: pd.DataFrame,
+        metric: str = "churn",
+        threshold: float = 0.8,
+        group_by: str = "file",
+        depth: int = 1,
+    ):
+        baseline = BusFactorCalculator.from_author_stats(
+            author_stats,
+            metric=metric,
+            threshold=threshold,
+            group_by=group_by,
+            depth=depth,
+        )
+        self.metric = baseline.metric
+        self.threshold = threshold
+
+        # Sorted by (file, author), already grouped by directory if requested.
+        self.stats = baseline.aggregate_author_stats()
+        self.baseline = baseline.calculate().set_index("file")
+
+        file_codes, self.files = pd.factorize(self.stats["file"], sort=True)
+        self.file_offsets = np.zeros(len(self.files) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(file_codes, minlength=len(self.files)),
+            out=self.file_offsets[1:],
+        )
+        self.file_codes = file_codes
+
+        # Inverted index: rows of author i are author_rows[author_offsets[i]:...].
+        self.author_codes, authors = pd.factorize(self.stats["author"])
+        self.author_ids = {author: i for i, author in enumerate(authors)}
+        self.author_rows = np.argsort(self.author_codes, kind="stable")
+        self.author_offsets = np.zeros(len(authors) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.author_codes, minlength=len(authors)),
+            out=self.author_offsets[1:],
+        )
+
+    @property
+    def authors(self) -> list[str]:
+        return list(self.author_ids)
+
+    def affected_files(self, removed_authors: Iterable[str]) -> np.ndarray:
+        """Sorted codes of the files touched by any of the removed authors."""
+        codes = np.array(
+            [self.author_ids[a] for a in removed_authors if a in self.author_ids],
+            dtype=np.int64,
+        )
+        rows = self.author_rows[
+            _expand_ranges(self.author_offsets[codes], self.author_offsets[codes + 1])
+        ]
+        return np.unique(self.file_codes[rows])
+
+    def simulate(self, removed_authors: Iterable[str]) -> pd.DataFrame:
+        """
+        Returns one row per affected file with n_authors, main_author,
+        main_author_share and risk_class before and after the removal. Files
+        left without any author are classified as Orphaned.
+        """
+        removed_authors = list(removed_authors)
+        unknown = [a for a in removed_authors if a not in self.author_ids]
+        if unknown:
+            raise ValueError(f"Unknown authors: {', '.join(unknown)}")
+
+        files = self.affected_files(removed_authors)
+        rows = _expand_ranges(self.file_offsets[files], self.file_offsets[files + 1])
+        removed = [self.author_ids[a] for a in removed_authors]
+        remaining = self.stats.iloc[rows[~np.isin(self.author_codes[rows], removed)]]
+
+        # Grouping was already applied to self.stats.
+        after = BusFactorCalculator.from_author_stats(
+            remaining, metric=self.metric, threshold=self.threshold
+        ).calculate()
+
+        affected = pd.Index(self.files[files], name="file")
+        before = self.baseline.loc[affected, COMPARED_COLUMNS]
+        after = after.set_index("file").reindex(affected)[COMPARED_COLUMNS]
+        after["n_authors"] = after["n_authors"].fillna(0).astype(int)
+        after["risk_class"] = after["risk_class"].astype(object).fillna(ORPHANED)
+
+        comparison = before.join(after, lsuffix="_before", rsuffix="_after")
+        return comparison[
+            [
+                f"{column}_{when}"
+                for column in COMPARED_COLUMNS
+                for when in ("before", "after")
+            ]
+        ].reset_index()
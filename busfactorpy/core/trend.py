@@ -1,23 +1,57 @@
 from datetime import datetime, timedelta
 import pandas as pd
 from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.commit_table import CommitTable
+from busfactorpy.core.cube import AggregateCube
+from busfactorpy.core.profiling import stage, staged
+from busfactorpy.core.scope import ScopeResolver, normalize_scope
 
 
 class TrendAnalyzer:
-    def __init__(self, commit_data, calculator_params):
+    def __init__(self, commit_data, calculator_params, scope: str | None = None):
         """
-        :param commit_data: DataFrame com todo o histórico minerado.
+        :param commit_data: DataFrame com todo o histórico minerado, ou um AggregateCube / CommitTable.
         :param calculator_params: Dicionário com parâmetros para o BusFactorCalculator (metric, threshold, etc).
+        :param scope: Subdiretório ao qual cada janela é limitada (opcional).
         """
         self.commit_data = commit_data
+        self.params = calculator_params
+        self.scope = normalize_scope(scope)
+
+        if isinstance(commit_data, (AggregateCube, CommitTable)):
+            return
+
+        if self.scope:
+            self.commit_data = (
+                ScopeResolver([self.scope]).filter(self.commit_data).copy()
+            )
 
         if not pd.api.types.is_datetime64_any_dtype(self.commit_data["date"]):
             self.commit_data["date"] = pd.to_datetime(
                 self.commit_data["date"], utc=True
             )
 
-        self.params = calculator_params
-
+    def _window_calculator(
+        self, window_start: datetime, window_end: datetime
+    ) -> BusFactorCalculator | None:
+        """Calculator for one window, or None when the window has no commits."""
+        if isinstance(self.commit_data, (AggregateCube, CommitTable)):
+            author_stats = self.commit_data.author_stats(
+                window_start, window_end, scope=self.scope
+            )
+            if author_stats.empty:
+                return None
+            return BusFactorCalculator.from_author_stats(author_stats, **self.params)
+
+        mask = (self.commit_data["date"] >= window_start) & (
+            self.commit_data["date"] <= window_end
+        )
+        window_data = self.commit_data.loc[mask].copy()
+        if window_data.empty:
+            return None
+        return BusFactorCalculator(window_data, **self.params)
+
+    @staged("trend")
     def analyze(
         self, start_date: datetime, end_date: datetime, window_days: int, step_days: int
     ):
@@ -29,14 +63,10 @@ class TrendAnalyzer:
 
         while current_date <= end_date:
             window_start = current_date - timedelta(days=window_days)
+            with stage("trend.window"):
+                calculator = self._window_calculator(window_start, current_date)
 
-            mask = (self.commit_data["date"] >= window_start) & (
-                self.commit_data["date"] <= current_date
-            )
-            window_data = self.commit_data.loc[mask].copy()
-
-            if not window_data.empty:
-                calculator = BusFactorCalculator(window_data, **self.params)
+            if calculator is not None:
                 bf_results = calculator.calculate()
 
                 total_files = len(bf_results)
@@ -0,0 +1,403 @@
+"""
+Static HTML report for result sets too large for one table.
+
+The results are sorted once (risk class, then main_author_share and
+total_file_churn descending, then path) and written as JSON shards of at
+most shard_rows rows: one series per risk class and one per top-level
+directory, so every view of the page is a contiguous, already sorted run of
+shards. A small index.json lists the shards and the row counts, and
+index.html loads only the shards of the page being shown. Filtering by
+path, or by class inside a directory, loads the shards of that view once.
+
+Browsers do not let pages opened from file:// fetch files, so the report
+is meant to be served over HTTP (e.g. `python -m http.server`).
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from busfactorpy.core.analyzer import RISK_CLASSES
+from busfactorpy.core.profiling import staged
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+REPORT_KIND = "busfactorpy-html-report"
+DEFAULT_SHARD_ROWS = 5_000
+DEFAULT_PAGE_SIZE = 100
+
+
+class HtmlReportWriter:
+    """
+    Writes results (any frame with file and risk_class columns, e.g. the
+    output of BusFactorCalculator.calculate()) as a static, paginated report.
+    Directories are the first depth segments of every file's parent path;
+    files at the repository root belong to '.'.
+    """
+
+    def __init__(
+        self,
+        results: pd.DataFrame,
+        shard_rows: int = DEFAULT_SHARD_ROWS,
+        depth: int = 1,
+        title: str = "BusFactorPy",
+    ):
+        missing = {"file", "risk_class"} - set(results.columns)
+        if missing:
+            raise ValueError(
+                f"HTML reports need the columns: {', '.join(sorted(missing))}."
+            )
+        if shard_rows < 1 or depth < 1:
+            raise ValueError("shard_rows and depth must be >= 1.")
+        self.results = results
+        self.shard_rows = shard_rows
+        self.depth = depth
+        self.title = title
+
+    def _sorted(self) -> pd.DataFrame:
+        import numpy as np
+        import pandas as pd
+
+        results = self.results.reset_index(drop=True)
+        # Known classes first, in order of severity; others (e.g. Orphaned)
+        # follow alphabetically.
+        others = sorted(set(results["risk_class"].dropna()) - set(RISK_CLASSES))
+        rank = {risk: i for i, risk in enumerate([*RISK_CLASSES, *others])}
+        risk = results["risk_class"].map(rank).fillna(len(rank)).to_numpy()
+
+        keys = [results["file"].astype(str).to_numpy()]
+        for column in ("total_file_churn", "main_author_share"):
+            if column in results.columns:
+                values = pd.to_numeric(results[column], errors="coerce")
+                keys.append(-np.nan_to_num(values.to_numpy(float), nan=-np.inf))
+        # np.lexsort sorts by the last key first.
+        return results.iloc[np.lexsort([*keys, risk])].reset_index(drop=True)
+
+    def _directories(self, files: pd.Series) -> pd.Series:
+        parent = files.astype(str).str.rpartition("/")[0]
+        keys = parent.str.split("/").str[: self.depth].str.join("/")
+        return keys.mask(parent == "", ".")
+
+    def _write_shards(self, rows: pd.DataFrame, path: str, prefix: str) -> list[str]:
+        """Writes rows in order as shards <prefix>-00000.json, ...; returns their paths."""
+        shards = []
+        for i, start in enumerate(range(0, len(rows), self.shard_rows)):
+            name = f"{prefix}-{i:05d}.json"
+            rows.iloc[start : start + self.shard_rows].to_json(
+                os.path.join(path, name), orient="values", force_ascii=False
+            )
+            shards.append(name)
+        return shards
+
+    @staticmethod
+    def is_report(path: str) -> bool:
+        """Whether path holds a report written by HtmlReportWriter."""
+        try:
+            with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+                return json.load(f).get("kind") == REPORT_KIND
+        except (OSError, ValueError, AttributeError):
+            return False
+
+    @staged("report.html", rows=lambda self, *args, **kwargs: len(self.results))
+    def write(self, path: str) -> str:
+        """
+        Writes the report into the directory path, which must be new, empty
+        or hold a previous report (replaced), and returns the path of its
+        index.html.
+        """
+        import numpy as np
+
+        if os.path.exists(path) and not os.path.isdir(path):
+            raise ValueError(f"'{path}' is a file; HTML reports need a directory.")
+        if os.path.isdir(path) and os.listdir(path) and not self.is_report(path):
+            raise ValueError(
+                f"'{path}' is not empty and does not hold an HTML report; "
+                "choose a new or empty directory."
+            )
+        shards_dir = os.path.join(path, "shards")
+        shutil.rmtree(shards_dir, ignore_errors=True)
+        os.makedirs(os.path.join(shards_dir, "class"))
+        os.makedirs(os.path.join(shards_dir, "dir"))
+
+        rows = self._sorted()
+        risks = rows["risk_class"].fillna("Unknown").astype(str)
+
+        classes: list[dict] = []
+        # Rows are sorted by class, so each class is one contiguous run.
+        for risk in dict.fromkeys(risks):
+            selected = rows[(risks == risk).to_numpy()]
+            shards = self._write_shards(
+                selected, shards_dir, f"class/{len(classes):02d}"
+            )
+            classes.append(
+                {
+                    "name": risk,
+                    "rows": len(selected),
+                    "shards": [f"shards/{name}" for name in shards],
+                }
+            )
+
+        directories: list[dict] = []
+        dir_names, dir_codes = np.unique(
+            self._directories(rows["file"]).to_numpy(dtype=str), return_inverse=True
+        )
+        # A stable sort keeps the global order inside every directory.
+        order = np.argsort(dir_codes, kind="stable")
+        bounds = np.searchsorted(dir_codes[order], np.arange(len(dir_names) + 1))
+        for code, directory in enumerate(dir_names):
+            selected = rows.iloc[order[bounds[code] : bounds[code + 1]]]
+            shards = self._write_shards(selected, shards_dir, f"dir/{code:05d}")
+            counts = selected["risk_class"].value_counts()
+            directories.append(
+                {
+                    "name": str(directory),
+                    "rows": len(selected),
+                    "counts": {str(k): int(v) for k, v in counts.items()},
+                    "shards": [f"shards/{name}" for name in shards],
+                }
+            )
+
+        index = {
+            "kind": REPORT_KIND,
+            "title": self.title,
+            "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "columns": [str(column) for column in rows.columns],
+            "rows": len(rows),
+            "shard_rows": self.shard_rows,
+            "page_size": DEFAULT_PAGE_SIZE,
+            "classes": classes,
+            "directories": directories,
+        }
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+
+        page = os.path.join(path, "index.html")
+        with open(page, "w", encoding="utf-8") as f:
+            f.write(_PAGE.replace("__TITLE__", html.escape(self.title)))
+        return page
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__ - Relatório de Bus Factor</title>
+<style>
+  body { font-family: system-ui, sans-serif; margin: 1.5rem; color: #222; }
+  h1 { font-size: 1.4rem; margin: 0 0 .25rem; }
+  #meta { color: #666; margin-bottom: 1rem; }
+  #summary button { margin: 0 .4rem .4rem 0; border: 1px solid #ccc;
+    background: #fafafa; padding: .3rem .7rem; border-radius: 4px; cursor: pointer; }
+  #summary button.active { border-color: #333; font-weight: bold; }
+  #controls { display: flex; flex-wrap: wrap; gap: .6rem; align-items: center;
+    margin: .6rem 0; }
+  #controls input { min-width: 18rem; }
+  table { border-collapse: collapse; width: 100%; font-size: .9rem; }
+  th, td { border-bottom: 1px solid #eee; padding: .3rem .5rem; text-align: left; }
+  th { background: #f4f4f4; position: sticky; top: 0; }
+  td.number { text-align: right; font-variant-numeric: tabular-nums; }
+  .Critical { background: #c62828; color: #fff; }
+  .High { color: #c62828; font-weight: bold; }
+  .Medium { color: #b58900; font-weight: bold; }
+  .Low { color: #2e7d32; }
+  .Orphaned { background: #8e24aa; color: #fff; }
+  #status { color: #666; margin: .5rem 0; min-height: 1.2rem; }
+  #error { color: #c62828; }
+</style>
+</head>
+<body>
+<h1>__TITLE__ - Relatório de Bus Factor</h1>
+<div id="meta"></div>
+<div id="summary"></div>
+<div id="controls">
+  <label>Classe <select id="risk"><option value="">Todas</option></select></label>
+  <label>Diretório <select id="dir"><option value="">Todos</option></select></label>
+  <input id="query" type="search" placeholder="Filtrar por caminho...">
+  <label>Linhas <select id="size">
+    <option>50</option><option selected>100</option><option>500</option>
+  </select></label>
+  <button id="prev">&laquo; Anterior</button>
+  <span id="page"></span>
+  <button id="next">Próxima &raquo;</button>
+</div>
+<div id="status"></div>
+<div id="error"></div>
+<table><thead><tr id="head"></tr></thead><tbody id="body"></tbody></table>
+<script>
+"use strict";
+const $ = (id) => document.getElementById(id);
+const state = { risk: "", dir: "", query: "", page: 0, size: 100 };
+const shards = new Map();
+let index = null;
+let filtered = null; // { key, rows } of the last filtered view
+
+function load(path) {
+  if (!shards.has(path)) {
+    shards.set(path, fetch(path).then((response) => {
+      if (!response.ok) throw new Error(path + ": HTTP " + response.status);
+      return response.json();
+    }));
+  }
+  return shards.get(path);
+}
+
+// The shards of the current view, in order; each holds shard_rows rows
+// except the last one of every series.
+function segments() {
+  let series;
+  if (state.dir !== "") {
+    series = [index.directories[Number(state.dir)]];
+  } else {
+    series = index.classes.filter((c) => !state.risk || c.name === state.risk);
+  }
+  const result = [];
+  let start = 0;
+  for (const s of series) {
+    s.shards.forEach((path, i) => {
+      const rows = Math.min(index.shard_rows, s.rows - i * index.shard_rows);
+      result.push({ path, start, rows });
+      start += rows;
+    });
+  }
+  return { list: result, total: start };
+}
+
+function needsScan() {
+  return state.query !== "" || (state.dir !== "" && state.risk !== "");
+}
+
+async function scan(list) {
+  const key = [state.risk, state.dir, state.query].join("\\u0000");
+  if (filtered && filtered.key === key) return filtered.rows;
+  const fileColumn = index.columns.indexOf("file");
+  const riskColumn = index.columns.indexOf("risk_class");
+  const query = state.query.toLowerCase();
+  const parts = await Promise.all(list.map((s) => load(s.path)));
+  const rows = parts.flat().filter((row) =>
+    (!state.risk || row[riskColumn] === state.risk) &&
+    (!query || String(row[fileColumn]).toLowerCase().includes(query)));
+  filtered = { key, rows };
+  return rows;
+}
+
+async function pageRows(list, from, to) {
+  const needed = list.filter((s) => s.start < to && s.start + s.rows > from);
+  const parts = await Promise.all(needed.map((s) => load(s.path)));
+  const rows = [];
+  needed.forEach((s, i) => {
+    rows.push(...parts[i].slice(Math.max(from - s.start, 0), to - s.start));
+  });
+  return rows;
+}
+
+function cell(value, column) {
+  const td = document.createElement("td");
+  if (value === null || value === undefined) {
+    td.textContent = "-";
+  } else if (typeof value === "number") {
+    td.className = "number";
+    td.textContent = Number.isInteger(value) ? String(value) : value.toFixed(3);
+  } else {
+    td.textContent = String(value);
+  }
+  if (column === "risk_class" && value) td.classList.add(String(value));
+  return td;
+}
+
+async function render() {
+  const { list, total } = segments();
+  const from = state.page * state.size;
+  $("status").textContent = "Carregando...";
+  $("error").textContent = "";
+  try {
+    let rows;
+    let count = total;
+    if (needsScan()) {
+      const all = await scan(list);
+      count = all.length;
+      rows = all.slice(from, from + state.size);
+    } else {
+      rows = await pageRows(list, from, from + state.size);
+    }
+    const body = $("body");
+    body.replaceChildren();
+    for (const row of rows) {
+      const tr = document.createElement("tr");
+      row.forEach((value, i) => tr.appendChild(cell(value, index.columns[i])));
+      body.appendChild(tr);
+    }
+    const pages = Math.max(1, Math.ceil(count / state.size));
+    $("page").textContent = "Página " + (state.page + 1) + " de " + pages;
+    $("prev").disabled = state.page === 0;
+    $("next").disabled = state.page + 1 >= pages;
+    $("status").textContent = count + " linhas";
+  } catch (error) {
+    $("status").textContent = "";
+    $("error").textContent = "Falha ao carregar os dados: " + error.message;
+  }
+  for (const button of $("summary").children) {
+    button.classList.toggle("active", button.dataset.risk === state.risk);
+  }
+}
+
+function update(changes) {
+  Object.assign(state, changes, { page: changes.page ?? 0 });
+  render();
+}
+
+async function main() {
+  try {
+    const response = await fetch("index.json");
+    index = await response.json();
+  } catch (error) {
+    $("error").textContent = "Não foi possível ler index.json. Sirva este " +
+      "diretório por HTTP, por exemplo: python -m http.server";
+    return;
+  }
+  state.size = index.page_size;
+  $("size").value = String(index.page_size);
+  $("meta").textContent = index.rows + " linhas, gerado em " + index.generated;
+
+  for (const c of index.classes) {
+    const button = document.createElement("button");
+    button.dataset.risk = c.name;
+    button.className = c.name;
+    button.textContent = c.name + ": " + c.rows;
+    button.onclick = () => update({ risk: state.risk === c.name ? "" : c.name });
+    $("summary").appendChild(button);
+    $("risk").add(new Option(c.name + " (" + c.rows + ")", c.name));
+  }
+  index.directories.forEach((d, i) => {
+    $("dir").add(new Option(d.name + " (" + d.rows + ")", String(i)));
+  });
+  for (const column of index.columns) {
+    const th = document.createElement("th");
+    th.textContent = column;
+    $("head").appendChild(th);
+  }
+
+  $("risk").onchange = (e) => update({ risk: e.target.value });
+  $("dir").onchange = (e) => update({ dir: e.target.value });
+  $("size").onchange = (e) => update({ size: Number(e.target.value) });
+  let timer = null;
+  $("query").oninput = (e) => {
+    clearTimeout(timer);
+    timer = setTimeout(() => update({ query: e.target.value.trim() }), 250);
+  };
+  $("prev").onclick = () => update({ page: state.page - 1 });
+  $("next").onclick = () => update({ page: state.page + 1 });
+  render();
+}
+
+main();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import IO
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    SpinnerColumn,
+    TaskID,
+    TextColumn,
+)
+from busfactorpy.core.progress import MiningProgress, ProgressLog
+
+
+def _format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "ETA -:--:--"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"ETA {hours}:{minutes:02d}:{secs:02d}"
+
+
+class MiningProgressDisplay:
+    """
+    GitMiner on_progress callback drawing a live Rich progress bar (only on
+    interactive consoles) and, when log is given, appending each snapshot to
+    it as a JSON line. Use as a context manager around the mining.
+    """
+
+    def __init__(self, console: Console, log: IO[str] | None = None):
+        self.console = console
+        self.log = ProgressLog(log) if log is not None else None
+        self._progress: Progress | None = None
+        self._task: TaskID | None = None
+
+    def __enter__(self) -> MiningProgressDisplay:
+        if self.console.is_terminal:
+            self._progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[bold cyan]Mining[/bold cyan]"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                TextColumn("{task.fields[rates]}"),
+                TextColumn("{task.fields[rows]}"),
+                TextColumn("{task.fields[eta]}"),
+                console=self.console,
+                transient=True,
+            )
+            self._task = self._progress.add_task(
+                "mining", total=None, rates="", rows="", eta=""
+            )
+            self._progress.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._progress is not None:
+            self._progress.stop()
+            self._progress = None
+
+    def __call__(self, progress: MiningProgress):
+        if self.log is not None:
+            self.log(progress)
+        if self._progress is None or self._task is None:
+            return
+        self._progress.update(
+            self._task,
+            completed=progress.commits,
+            total=progress.total_commits,
+            rates=(
+                f"{progress.commits_per_second:.1f} commits/s "
+                f"{progress.modifications_per_second:.1f} mods/s"
+            ),
+            rows=f"kept {progress.rows_kept} ignored {progress.rows_ignored}",
+            eta=_format_eta(progress.eta_seconds),
+        )
@@ -1,7 +1,22 @@
-import pandas as pd
+from __future__ import annotations
+
+import gzip
+import io
 import os
+import sys
+from contextlib import ExitStack
+from typing import TYPE_CHECKING
 from rich.console import Console
 from rich.table import Table
+from busfactorpy.core.profiling import staged
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+EXPORT_FORMATS = ("csv", "json", "ndjson", "parquet", "html")
+COMPRESSIONS = ("gzip", "zstd")
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_CHUNK_SIZE = 50_000
 
 
 class ConsoleReporter:
@@ -9,9 +24,9 @@ class ConsoleReporter:
     Generates CSV/JSON reports and CLI summaries using Pandas and Rich.
     """
 
-    def __init__(self, results_df: pd.DataFrame):
+    def __init__(self, results_df: pd.DataFrame, console: Console | None = None):
         self.results = results_df
-        self.console = Console()
+        self.console = console or Console()
         self.output_dir = "reports"
 
     def _get_risk_style(self, risk_class: str) -> str:
@@ -21,19 +36,23 @@ class ConsoleReporter:
             "High": "bold red",
             "Medium": "bold yellow",
             "Low": "green",
+            "Orphaned": "bold white on magenta",
         }
         return styles.get(risk_class, "default")
 
-    def generate_cli_summary(self, n_top: int = 10):
-        risky_files = (
-            self.results[
-                self.results["risk_class"].isin(["Critical", "High", "Medium"])
-            ]
-            .sort_values(
-                by=["main_author_share", "total_file_churn"], ascending=[False, False]
-            )
-            .head(n_top)
-        )
+    @staged("report.summary")
+    def generate_cli_summary(
+        self, n_top: int = 10, top_risks: pd.DataFrame | None = None
+    ):
+        """
+        Prints the Top N risky files. top_risks may carry the selection already
+        computed by select_top_risks so it is not repeated here.
+        """
+        risky_files = top_risks
+        if risky_files is None:
+            from busfactorpy.core.ranking import select_top_risks
+
+            risky_files = select_top_risks(self.results, n_top)
 
         if risky_files.empty:
             self.console.print(
@@ -47,31 +66,208 @@ class ConsoleReporter:
         table.add_column("Autores", justify="right")
         table.add_column("Share do Main Autor", justify="right")
         table.add_column("Autor Principal", justify="left", style="bold white")
+        # Estimates (analyze --estimate) carry bootstrap intervals.
+        estimated = "share_ci_low" in risky_files.columns
+        if estimated:
+            table.add_column("IC do Share", justify="right")
+            table.add_column("P(Crítico)", justify="right")
 
-        for _, row in risky_files.iterrows():
-            share_percent = f"{row['main_author_share']:.2%}"
-            risk_style = self._get_risk_style(row["risk_class"])
+        rows = zip(
+            risky_files["file"].tolist(),
+            risky_files["risk_class"].tolist(),
+            risky_files["n_authors"].tolist(),
+            risky_files["main_author_share"].tolist(),
+            risky_files["main_author"].tolist(),
+        )
+        for i, (file, risk_class, n_authors, share, main_author) in enumerate(rows):
+            risk_style = self._get_risk_style(risk_class)
+            extra = []
+            if estimated:
+                row = risky_files.iloc[i]
+                extra = [
+                    f"{row['share_ci_low']:.0%}–{row['share_ci_high']:.0%}",
+                    f"{row['critical_probability']:.0%}",
+                ]
 
             table.add_row(
-                row["file"],
-                f"[{risk_style}]{row['risk_class']}[/{risk_style}]",
-                str(row["n_authors"]),
-                share_percent,
-                row["main_author"],
+                file,
+                f"[{risk_style}]{risk_class}[/{risk_style}]",
+                str(n_authors),
+                f"{share:.2%}",
+                main_author,
+                *extra,
             )
 
         self.console.print(table)
 
-    def export_report(self, format: str):
-        """Exports the full report to CSV or JSON format."""
-        os.makedirs(self.output_dir, exist_ok=True)
-        filename = f"{self.output_dir}/busfactorpy_report.{format}"
+    def generate_simulation_summary(self, scenario: str, n_top: int = 10):
+        """
+        Prints the outcome of an author removal scenario, where results holds
+        the before/after frame of AuthorRemovalSimulator.simulate().
+        """
+        after = self.results["risk_class_after"]
+        changed = self.results[after != self.results["risk_class_before"]]
+        orphaned = int((after == "Orphaned").sum())
+        critical = int(
+            (
+                (changed["risk_class_after"] == "Critical")
+                | (changed["risk_class_after"] == "Orphaned")
+            ).sum()
+        )
+
+        self.console.print(f"\n[bold]Scenario:[/bold] {scenario}")
+        self.console.print(
+            f"{len(self.results)} files affected | {orphaned} orphaned | "
+            f"{critical} become Critical or Orphaned"
+        )
+        if changed.empty:
+            return
+
+        # Orphaned first, then Critical, then the rest; most dominated first.
+        order = {"Orphaned": 0, "Critical": 1, "High": 2, "Medium": 3, "Low": 4}
+        changed = changed.assign(
+            __order__=changed["risk_class_after"].map(order)
+        ).sort_values(["__order__", "main_author_share_after"], ascending=[True, False])
+
+        table = Table(title=f"Top {n_top} Arquivos Afetados")
+        table.add_column("Arquivo", style="dim", overflow="fold")
+        table.add_column("Risco Antes", justify="center")
+        table.add_column("Risco Depois", justify="center")
+        table.add_column("Autores", justify="right")
+        table.add_column("Autor Principal", justify="left", style="bold white")
 
-        if format == "csv":
-            self.results.to_csv(filename, index=False)
-        elif format == "json":
-            self.results.to_json(filename, orient="records", indent=4)
+        rows = zip(
+            changed["file"].tolist()[:n_top],
+            changed["risk_class_before"].tolist()[:n_top],
+            changed["risk_class_after"].tolist()[:n_top],
+            changed["n_authors_before"].tolist()[:n_top],
+            changed["n_authors_after"].tolist()[:n_top],
+            changed["main_author_after"].tolist()[:n_top],
+        )
+        for file, before, after_class, n_before, n_after, main_author in rows:
+            before_style = self._get_risk_style(before)
+            after_style = self._get_risk_style(after_class)
+            table.add_row(
+                file,
+                f"[{before_style}]{before}[/{before_style}]",
+                f"[{after_style}]{after_class}[/{after_style}]",
+                f"{int(n_before)} -> {int(n_after)}",
+                main_author if isinstance(main_author, str) else "-",
+            )
+
+        self.console.print(table)
+
+    def default_report_path(self, format: str, compression: str | None = None) -> str:
+        """Returns the path used when no explicit destination is given."""
+        if format == "html":
+            # HTML reports are a directory (index.html, index.json, shards/).
+            return f"{self.output_dir}/busfactorpy_report_html"
+        suffix = ""
+        if compression and format != "parquet":
+            suffix = COMPRESSION_SUFFIXES[compression]
+        return f"{self.output_dir}/busfactorpy_report.{format}{suffix}"
+
+    def _open_text_sink(self, stack: ExitStack, path: str, compression: str | None):
+        """
+        Opens a text handle on a file (or stdout when path is '-'), optionally
+        wrapped in a gzip/zstd compressor. Stdout itself is never closed.
+        """
+        if path == "-":
+            raw = sys.stdout.buffer
+        else:
+            raw = stack.enter_context(open(path, "wb"))
+
+        if compression == "gzip":
+            raw = stack.enter_context(gzip.GzipFile(fileobj=raw, mode="wb"))
+        elif compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError(
+                    "zstd compression requires the 'zstandard' package."
+                ) from None
+            raw = stack.enter_context(
+                zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+            )
+
+        handle = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        # Detach instead of closing so the underlying stream is released by the stack.
+        stack.callback(handle.detach)
+        stack.callback(handle.flush)
+        return handle
+
+    def _chunks(self, chunksize: int):
+        for start in range(0, len(self.results), chunksize):
+            yield self.results.iloc[start : start + chunksize]
+
+    @staged("report.export", rows=lambda self, *args, **kwargs: len(self.results))
+    def export_report(
+        self,
+        format: str,
+        path: str | None = None,
+        compression: str | None = None,
+        chunksize: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Exports the full report to CSV, JSON, NDJSON, Parquet or a static,
+        paginated HTML report (see HtmlReportWriter).
+
+        Args:
+            format: One of csv, json, ndjson, parquet or html.
+            path: Destination file, or directory for html. '-' streams the
+                report to stdout. Defaults to reports/busfactorpy_report.<format>
+                (reports/busfactorpy_report_html for html).
+            compression: Optional gzip or zstd compression. For Parquet the
+                codec is applied inside the file.
+            chunksize: Number of rows written per chunk for CSV and NDJSON.
+        """
+        if format not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Invalid format '{format}'. Valid formats: {', '.join(EXPORT_FORMATS)}"
+            )
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Invalid compression '{compression}'. "
+                f"Valid options: {', '.join(COMPRESSIONS)}"
+            )
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1.")
+        if format == "html" and (path == "-" or compression is not None):
+            raise ValueError(
+                "HTML reports are written to a directory, without compression."
+            )
+
+        if path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = self.default_report_path(format, compression)
+
+        if format == "html":
+            from busfactorpy.output.html_report import HtmlReportWriter
+
+            path = HtmlReportWriter(self.results).write(path)
+        elif format == "parquet":
+            target = sys.stdout.buffer if path == "-" else path
+            self.results.to_parquet(
+                target, index=False, compression=compression or "snappy"
+            )
+        else:
+            with ExitStack() as stack:
+                handle = self._open_text_sink(stack, path, compression)
+                if format == "json":
+                    self.results.to_json(handle, orient="records", indent=4)
+                else:
+                    for i, chunk in enumerate(self._chunks(chunksize)):
+                        if format == "csv":
+                            chunk.to_csv(handle, index=False, header=i == 0)
+                        else:
+                            lines = chunk.to_json(orient="records", lines=True)
+                            handle.write(lines.rstrip("\n") + "\n")
+                    if format == "csv" and self.results.empty:
+                        self.results.to_csv(handle, index=False)
+
+        if path == "-":
+            return
 
         self.console.print(
-            f"[bold green]Relatório exportado com sucesso para:[/bold green] {filename}"
+            f"[bold green]Relatório exportado com sucesso para:[/bold green] {path}"
         )
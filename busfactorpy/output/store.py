@@ -0,0 +1,269 @@
+import sqlite3
+from datetime import datetime, timezone
+from itertools import repeat
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    repository TEXT,
+    metric TEXT,
+    threshold REAL,
+    group_by TEXT,
+    depth INTEGER,
+    scope TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    n_authors INTEGER,
+    main_author_id INTEGER REFERENCES authors(id),
+    main_author_share REAL,
+    total_file_churn REAL,
+    main_author_churn REAL,
+    risk_class TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_file_run ON results(file_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_results_risk_run ON results(risk_class, run_id);
+"""
+
+RESULT_COLUMNS = """
+    r.run_id, runs.created_at, runs.scope, f.path AS file, r.n_authors, a.email AS main_author,
+    r.main_author_share, r.total_file_churn, r.main_author_churn, r.risk_class
+"""
+
+
+# Run settings a file's history is compared across (see file_history).
+HISTORY_KEYS = ("repository", "metric", "scope", "group_by")
+
+# Values per "IN (...)" lookup, below SQLite's default variable limit.
+_LOOKUP_CHUNK = 500
+
+
+def _nullable(values: pd.Series) -> list:
+    """Converts a column to Python objects with NaN/NA mapped to None."""
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+class SQLiteResultStore:
+    """
+    Appends BusFactorCalculator results to a local SQLite database so the
+    history of every run can be queried later without re-running the analysis.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Adds columns introduced after a database was created."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        if "scope" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE runs ADD COLUMN scope TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _intern(self, table: str, column: str, values: list[str]) -> dict[str, int]:
+        """
+        Inserts missing values of a dictionary table and returns value -> id
+        for the given values only (the table itself is never read whole).
+        """
+        unique = list(set(values))
+        self.conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)",
+            ((v,) for v in unique),
+        )
+        ids: dict[str, int] = {}
+        for start in range(0, len(unique), _LOOKUP_CHUNK):
+            chunk = unique[start : start + _LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            ids.update(
+                self.conn.execute(
+                    f"SELECT {column}, id FROM {table} WHERE {column} IN ({placeholders})",
+                    chunk,
+                )
+            )
+        return ids
+
+    def append_run(
+        self,
+        results_df: pd.DataFrame,
+        repository: str | None = None,
+        metric: str | None = None,
+        threshold: float | None = None,
+        group_by: str | None = None,
+        depth: int | None = None,
+        scope: str | None = None,
+        created_at: datetime | None = None,
+    ) -> int:
+        """
+        Stores one run's result frame in a single transaction and returns the
+        new run id.
+        """
+        created_at = created_at or datetime.now(timezone.utc)
+
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (created_at, repository, metric, threshold, "
+                "group_by, depth, scope) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    created_at.isoformat(timespec="seconds"),
+                    repository,
+                    metric,
+                    threshold,
+                    group_by,
+                    depth,
+                    scope,
+                ),
+            )
+            run_id = cursor.lastrowid
+            assert run_id is not None
+
+            files = results_df["file"].tolist()
+            authors = _nullable(results_df["main_author"])
+            file_ids = self._intern("files", "path", files)
+            author_ids = self._intern(
+                "authors", "email", [a for a in authors if a is not None]
+            )
+
+            self.conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(
+                    repeat(run_id),
+                    (file_ids[f] for f in files),
+                    _nullable(results_df["n_authors"]),
+                    (author_ids.get(a) for a in authors),
+                    _nullable(results_df["main_author_share"]),
+                    _nullable(results_df["total_file_churn"]),
+                    _nullable(results_df["main_author_churn"]),
+                    results_df["risk_class"].tolist(),
+                ),
+            )
+
+        return run_id
+
+    def _query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def runs(self) -> pd.DataFrame:
+        """Lists all stored runs with their number of results."""
+        return self._query(
+            "SELECT runs.*, COUNT(r.file_id) AS n_results FROM runs "
+            "LEFT JOIN results r ON r.run_id = runs.id "
+            "GROUP BY runs.id ORDER BY runs.id"
+        )
+
+    def latest_run_id(self) -> int | None:
+        return self.conn.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+
+    def history_settings(self, path: str, **settings) -> dict | None:
+        """
+        The HISTORY_KEYS settings of the latest run holding path, among runs
+        matching the given settings (None values are not filtered on), or
+        None if there is no such run.
+        """
+        where, params = self._settings_filter(settings)
+        row = self.conn.execute(
+            f"SELECT {', '.join(f'runs.{key}' for key in HISTORY_KEYS)} "
+            "FROM results r JOIN files f ON f.id = r.file_id "
+            "JOIN runs ON runs.id = r.run_id "
+            f"WHERE f.path = ?{where} ORDER BY r.run_id DESC LIMIT 1",
+            (path, *params),
+        ).fetchone()
+        return dict(zip(HISTORY_KEYS, row)) if row is not None else None
+
+    @staticmethod
+    def _settings_filter(settings: dict) -> tuple[str, tuple]:
+        unknown = set(settings) - set(HISTORY_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown run settings: {', '.join(sorted(unknown))}")
+        given = {key: value for key, value in settings.items() if value is not None}
+        # IS compares NULLs too (e.g. runs without a scope).
+        where = "".join(f" AND runs.{key} IS ?" for key in given)
+        return where, tuple(given.values())
+
+    def file_history(
+        self,
+        path: str,
+        repository: str | None = None,
+        metric: str | None = None,
+        scope: str | None = None,
+        group_by: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Returns the result of a file (or directory key) in every run with the
+        same repository, metric, scope and group_by. Settings that are not
+        given are taken from the latest run holding the file, so runs of
+        other repositories or metrics stored in the same database are not
+        mixed into the history.
+        """
+        given = {
+            "repository": repository,
+            "metric": metric,
+            "scope": scope,
+            "group_by": group_by,
+        }
+        # Without a matching run the given settings alone select no rows.
+        settings = self.history_settings(path, **given) or given
+        where, params = self._settings_filter(settings)
+        return self._query(
+            f"SELECT {RESULT_COLUMNS} FROM results r "
+            "JOIN files f ON f.id = r.file_id "
+            "JOIN runs ON runs.id = r.run_id "
+            "LEFT JOIN authors a ON a.id = r.main_author_id "
+            f"WHERE f.path = ?{where} ORDER BY r.run_id",
+            (path, *params),
+        )
+
+    def files_with_risk(
+        self, risk_class: str, run_id: int | None = None
+    ) -> pd.DataFrame:
+        """Returns the files in a risk class for one run (latest by default)."""
+        if run_id is None:
+            run_id = self.latest_run_id()
+        return self._query(
+            f"SELECT {RESULT_COLUMNS} FROM results r "
+            "JOIN files f ON f.id = r.file_id "
+            "JOIN runs ON runs.id = r.run_id "
+            "LEFT JOIN authors a ON a.id = r.main_author_id "
+            "WHERE r.risk_class = ? AND r.run_id = ? "
+            "ORDER BY r.main_author_share DESC, f.path",
+            (risk_class, run_id),
+        )
+
+    def became(self, path: str, risk_class: str, **settings) -> pd.Series | None:
+        """
+        Returns the history row of the run in which a file entered its current
+        streak of risk_class, or None if it is not in that class in its latest
+        run. settings select the runs as in file_history.
+        """
+        history = self.file_history(path, **settings)
+        if history.empty or history["risk_class"].iloc[-1] != risk_class:
+            return None
+
+        # Walk back from the latest run while the class stays the same.
+        in_class = (history["risk_class"] == risk_class).to_numpy()
+        start = len(history) - 1
+        while start > 0 and in_class[start - 1]:
+            start -= 1
+        return history.iloc[start]
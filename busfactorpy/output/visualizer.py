@@ -1,7 +1,29 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from rich.console import Console
+from __future__ import annotations
+
+import io
 import os
+from typing import TYPE_CHECKING
+from rich.console import Console
+from rich.text import Text
+from busfactorpy.core.profiling import StageProfiler, active, stage, staged
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    import pandas as pd
+
+
+def _pyplot():
+    """
+    Imports pyplot on first use, forcing the headless Agg backend so charts
+    render without a display.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
 
 
 class BusFactorVisualizer:
@@ -9,30 +31,36 @@ class BusFactorVisualizer:
     Generates data visualizations (bar charts) using Matplotlib.
     """
 
-    def __init__(self):
+    def __init__(self, console: Console | None = None):
         self.output_dir = "charts"
         os.makedirs(self.output_dir, exist_ok=True)
-        self.console = Console()
+        self.console = console or Console()
 
+    @staged("chart.top_n")
     def generate_top_n_bar_chart(
         self,
-        results_df: pd.DataFrame,
+        results_df: pd.DataFrame | None = None,
         n_top: int = 10,
         filename: str = "top_risky_files.png",
+        top_files: pd.DataFrame | None = None,
     ):
         """
-        Creates a bar chart showing the main author's share for the Top N risky files.
+        Creates a bar chart showing the main author's share for the Top N files
+        of any risk class, unlike the CLI summary which lists risky files only.
+        top_files may carry the selection already computed with
+        select_top_risks(..., classes=None), in which case results_df is not needed.
         """
-        risky_files = (
-            results_df.sort_values(by="main_author_share", ascending=False)
-            .head(n_top)
-            .reset_index(drop=True)
-        )
+        if top_files is None:
+            from busfactorpy.core.ranking import select_top_risks
+
+            top_files = select_top_risks(results_df, n_top, classes=None)
+        risky_files = top_files.reset_index(drop=True)
 
         if risky_files.empty:
             self.console.print("[yellow]Insufficient data to plot trend.[/yellow]")
             return
 
+        plt = _pyplot()
         fig, ax = plt.subplots(figsize=(10, 6))
 
         ax.barh(
@@ -56,11 +84,13 @@ class BusFactorVisualizer:
 
         self.console.print(f"[bold green]Bar chart saved to:[/bold green] {filepath}")
 
+    @staged("chart.trend")
     def plot_trend(self, trend_df: pd.DataFrame, filename="bus_factor_trend.png"):
         if trend_df.empty:
             self.console.print("[yellow]Insufficient data to plot trend.[/yellow]")
             return
 
+        plt = _pyplot()
         plt.figure(figsize=(12, 6))
 
         ax = plt.gca()
@@ -86,3 +116,124 @@ class BusFactorVisualizer:
         plt.savefig(filepath)
 
         self.console.print(f"[bold green]Trend chart saved to:[/bold green] {filepath}")
+
+    @staged("chart.threshold_sweep")
+    def plot_threshold_sweep(
+        self, sweep_df: pd.DataFrame, filename: str = "threshold_sweep.png"
+    ):
+        """
+        Stacked bars of the risk class counts at every threshold of a sweep
+        (see RiskAnalyzer.sweep).
+        """
+        if sweep_df.empty:
+            self.console.print("[yellow]Insufficient data to plot the sweep.[/yellow]")
+            return
+
+        plt = _pyplot()
+        fig, ax = plt.subplots(figsize=(10, 6))
+
+        colors = {
+            "Critical": "tab:red",
+            "High": "tab:orange",
+            "Medium": "gold",
+            "Low": "tab:green",
+        }
+        labels = [f"{t:g}" for t in sweep_df["threshold"]]
+        bottom = None
+        for risk, color in colors.items():
+            ax.bar(labels, sweep_df[risk], bottom=bottom, color=color, label=risk)
+            bottom = sweep_df[risk] if bottom is None else bottom + sweep_df[risk]
+
+        ax.set_xlabel("Limiar (threshold)")
+        ax.set_ylabel("Arquivos")
+        ax.set_title("Classes de Risco por Limiar")
+        ax.legend(loc="upper left", bbox_to_anchor=(1.0, 1.0))
+        plt.tight_layout()
+
+        filepath = os.path.join(self.output_dir, filename)
+        plt.savefig(filepath)
+        plt.close(fig)
+
+        self.console.print(
+            f"[bold green]Threshold sweep chart saved to:[/bold green] {filepath}"
+        )
+
+
+def _render_chart(
+    chart: str, args: tuple, kwargs: dict, profile: bool = False
+) -> tuple[str, list[dict]]:
+    """
+    Worker entry point: renders one chart and returns the console output it
+    produced, so the parent process can print it in order, and the worker's
+    stage timings when profiling.
+    """
+    console = Console(file=io.StringIO(), record=True, force_terminal=True)
+    profiler = StageProfiler().start() if profile else None
+    try:
+        getattr(BusFactorVisualizer(console=console), chart)(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+    stages = profiler.report()["stages"] if profiler is not None else []
+    return console.export_text(styles=True), stages
+
+
+class ChartWorker:
+    """
+    Renders charts in a background process so reports can be printed or
+    exported while matplotlib works. Only the (small) frames passed to
+    submit() are sent to the worker.
+    """
+
+    def __init__(self, enabled: bool = True, console: Console | None = None):
+        self.enabled = enabled
+        self.console = console or Console()
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending: list[Future] = []
+
+    def submit(self, chart: str, *args, **kwargs):
+        """
+        Queues a BusFactorVisualizer method (e.g. 'plot_trend') for rendering.
+        Does nothing when charts are disabled.
+        """
+        if not self.enabled:
+            return
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        self._pending.append(
+            self._executor.submit(
+                _render_chart, chart, args, kwargs, active() is not None
+            )
+        )
+
+    def join(self):
+        """Waits for the submitted charts and prints their messages."""
+        with stage("charts.wait"):
+            for future in self._pending:
+                try:
+                    output, stages = future.result()
+                except Exception as e:
+                    self.console.print(
+                        f"[bold red]ERROR rendering chart:[/bold red] {e}"
+                    )
+                    continue
+
+                self.console.print(Text.from_ansi(output), end="")
+                # Rendering timings measured in the worker process.
+                profiler = active()
+                if profiler is not None:
+                    for record in stages:
+                        profiler.add(
+                            record["name"],
+                            record["wall_seconds"],
+                            record["cpu_seconds"],
+                            record["rows"],
+                            record["calls"],
+                        )
+            self._pending.clear()
+
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -0,0 +1,56 @@
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+
+def _run_git(
+    args, cwd: Path, email: str = "a@test.com", date: str | None = None
+) -> str:
+    env = None
+    if date:
+        env = {**os.environ, "GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
+    result = subprocess.run(
+        ["git", "-c", "user.name=Dev", "-c", f"user.email={email}", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def git():
+    """
+    Runs git(args, cwd, email=..., date=...) as Dev <email> and returns its
+    stripped stdout; date sets both the author and committer dates.
+    """
+    return _run_git
+
+
+@pytest.fixture
+def init_repo(git):
+    """Creates the directory at path and runs git init (plus args) in it."""
+
+    def init(path: Path, *args: str) -> Path:
+        path.mkdir(parents=True, exist_ok=True)
+        git(["init", *args], path)
+        return path
+
+    return init
+
+
+@pytest.fixture
+def commit_all(git):
+    """Stages every change in the repository and commits it as email."""
+
+    def commit(
+        repo: Path, message: str, email: str = "a@test.com", date: str | None = None
+    ):
+        git(["add", "."], repo)
+        git(["commit", "-m", message], repo, email=email, date=date)
+
+    return commit
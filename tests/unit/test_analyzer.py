@@ -1,4 +1,7 @@
-from busfactorpy.core.analyzer import RiskAnalyzer
+import pandas as pd
+import pytest
+
+from busfactorpy.core.analyzer import RiskAnalyzer, parse_threshold_sweep
 
 
 class TestRiskAnalyzer:
@@ -57,3 +60,38 @@ class TestRiskAnalyzer:
 
         result = RiskAnalyzer.classify_risk(n_authors=2, share=0.80)
         assert result == "High"
+
+    def test_parse_threshold_sweep(self):
+        """Test that the stop of a start:stop:step sweep is included."""
+        thresholds = parse_threshold_sweep("0.5:0.95:0.05")
+        assert len(thresholds) == 10
+        assert thresholds[0] == 0.5 and thresholds[-1] == 0.95
+        assert parse_threshold_sweep("0.8:0.8:0.1") == [0.8]
+
+        for spec in ("0.5-0.9", "0:0.9:0.1", "0.9:0.5:0.1", "0.5:0.9:0"):
+            with pytest.raises(ValueError):
+                parse_threshold_sweep(spec)
+        with pytest.raises(ValueError, match="limited to"):
+            parse_threshold_sweep("0.01:1:0.00001")
+
+    def test_sweep_matches_classify_risk(self):
+        """Test that every row of the sweep counts classify_risk's classes."""
+        result = pd.DataFrame(
+            {
+                "n_authors": [1, 2, 3, 2, 4, 2, 3],
+                "main_author_share": [1.0, 0.9, 0.62, 0.45, 0.8, 0.7, float("nan")],
+            }
+        )
+        thresholds = parse_threshold_sweep("0.5:0.95:0.05")
+        sweep = RiskAnalyzer.sweep(result, thresholds)
+
+        assert sweep["threshold"].tolist() == thresholds
+        for row in sweep.itertuples(index=False):
+            classes = [
+                RiskAnalyzer.classify_risk(n, share, row.threshold)
+                for n, share in zip(result["n_authors"], result["main_author_share"])
+            ]
+            assert row.Critical == classes.count("Critical")
+            assert row.High == classes.count("High")
+            assert row.Medium == classes.count("Medium")
+            assert row.Low == classes.count("Low")
@@ -0,0 +1,86 @@
+import json
+
+import pandas as pd
+from typer.testing import CliRunner
+
+from benchmarks.__main__ import app
+from benchmarks.suite import compare
+from benchmarks.synthetic import SyntheticHistory
+from busfactorpy.core.miner import GitMiner
+
+runner = CliRunner()
+
+
+def test_history_is_deterministic():
+    a = SyntheticHistory(300, 20, 5, seed=3).commit_frame()
+    b = SyntheticHistory(300, 20, 5, seed=3).commit_frame()
+    pd.testing.assert_frame_equal(a, b)
+    assert not a.equals(SyntheticHistory(300, 20, 5, seed=4).commit_frame())
+
+
+def test_ownership_is_skewed():
+    frame = SyntheticHistory(2_000, 10, 10, seed=0).commit_frame()
+    commits = frame.drop_duplicates("commit_hash")
+    share = commits["author"].value_counts(normalize=True)
+    # Zipf: a few authors do most of the work.
+    assert share.iloc[:3].sum() > 0.5
+
+
+def test_repository_matches_frame(tmp_path):
+    history = SyntheticHistory(40, 8, 3, seed=7)
+    history.write_repository(str(tmp_path / "repo"))
+    mined = GitMiner(str(tmp_path / "repo"), None).mine_commit_history()
+
+    columns = ["date", "file", "author", "lines_added", "lines_deleted"]
+    mined = mined.assign(
+        author=mined["author"].astype(str),
+        date=pd.to_datetime(mined["date"], utc=True).dt.tz_localize(None),
+    )
+    pd.testing.assert_frame_equal(
+        mined[columns].sort_values(["date", "file"]).reset_index(drop=True),
+        history.commit_frame()[columns]
+        .sort_values(["date", "file"])
+        .reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def _report(seconds: dict) -> dict:
+    return {
+        "results": {
+            "small": {
+                stage: {"seconds": s, "median_seconds": s, "rows": 1}
+                for stage, s in seconds.items()
+            }
+        }
+    }
+
+
+def test_compare_flags_regressions_above_threshold():
+    baseline = _report({"mine": 1.0, "trend": 2.0, "tiny": 0.001})
+    current = _report({"mine": 1.05, "trend": 2.5, "tiny": 0.01, "new": 1.0})
+
+    result = compare(baseline, current, max_regression=10, min_seconds=0.01)
+    assert result.set_index("stage")["regression"].to_dict() == {
+        "mine": False,
+        "trend": True,
+        "tiny": False,  # below the noise floor
+    }
+
+
+def test_compare_command_exit_code(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    current = tmp_path / "current.json"
+    baseline.write_text(json.dumps(_report({"mine": 1.0})))
+
+    current.write_text(json.dumps(_report({"mine": 1.15})))
+    result = runner.invoke(
+        app, ["compare", str(baseline), str(current), "--max-regression", "10"]
+    )
+    assert result.exit_code == 1
+    assert "1 stage(s) regressed" in result.output
+
+    result = runner.invoke(
+        app, ["compare", str(baseline), str(current), "--max-regression", "20"]
+    )
+    assert result.exit_code == 0, result.output
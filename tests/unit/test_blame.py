@@ -0,0 +1,169 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core import blame as blame_module
+from busfactorpy.core.blame import BlameOwnership, parse_line_porcelain
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.ignore import BusFactorIgnore
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def repo(tmp_path, init_repo, commit_all) -> Path:
+    repo = init_repo(tmp_path / "repo")
+    (repo / "src").mkdir()
+
+    # alice writes 10 lines, bob rewrites 8 of them: bob owns most of the file
+    # although alice has more churn.
+    (repo / "src/app.py").write_text("a\n" * 10, encoding="utf-8")
+    (repo / "solo.py").write_text("s\n" * 3, encoding="utf-8")
+    (repo / "notes.md").write_text("n\n", encoding="utf-8")
+    commit_all(repo, "c1", email="alice@test.com")
+
+    (repo / "src/app.py").write_text("a\n" * 2 + "b\n" * 8, encoding="utf-8")
+    commit_all(repo, "c2", email="bob@test.com")
+
+    (repo / "src/app.py").write_text("a\n" * 2 + "b\n" * 8 + "c\n", encoding="utf-8")
+    commit_all(repo, "c3", email="bob@test.com")
+    return repo
+
+
+def test_author_stats_count_surviving_lines(repo, tmp_path):
+    stats = BlameOwnership(str(repo), workers=2, cache_dir=str(tmp_path)).author_stats()
+
+    assert list(stats.itertuples(index=False, name=None)) == [
+        ("notes.md", "alice@test.com", 1, 1),
+        ("solo.py", "alice@test.com", 3, 1),
+        ("src/app.py", "alice@test.com", 2, 1),
+        ("src/app.py", "bob@test.com", 9, 2),
+    ]
+
+    result = BusFactorCalculator.from_author_stats(stats, metric="blame").calculate()
+    app_row = result.set_index("file").loc["src/app.py"]
+    assert app_row["main_author"] == "bob@test.com"
+    assert app_row["main_author_share"] == pytest.approx(9 / 11)
+    assert app_row["risk_class"] == "High"
+
+
+def test_unchanged_blobs_are_not_blamed_again(repo, git, monkeypatch):
+    first = BlameOwnership(str(repo), workers=1)
+    first.author_stats()
+    assert (first.blamed, first.cached) == (3, 0)
+
+    (repo / "solo.py").write_text("s\n" * 4, encoding="utf-8")
+    git(["commit", "-am", "c4"], repo, email="carol@test.com")
+
+    blamed = []
+    original = blame_module._blame_file
+
+    def spy(job):
+        blamed.append(job[2])
+        return original(job)
+
+    monkeypatch.setattr(blame_module, "_blame_file", spy)
+    second = BlameOwnership(str(repo), workers=1)
+    stats = second.author_stats()
+
+    assert blamed == ["solo.py"]
+    assert (second.blamed, second.cached) == (1, 2)
+    assert set(stats[stats["file"] == "solo.py"]["author"]) == {
+        "alice@test.com",
+        "carol@test.com",
+    }
+
+
+def test_cache_keeps_only_the_current_tree(repo, git, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_file = cache_dir / "blame-cache.json"
+
+    def cached_keys():
+        return set(json.loads(cache_file.read_text(encoding="utf-8"))["entries"])
+
+    BlameOwnership(str(repo), workers=1, cache_dir=str(cache_dir)).author_stats()
+    first = cached_keys()
+    assert len(first) == 3
+
+    # A scoped run keeps the entries of the files it does not analyse.
+    (repo / "solo.py").write_text("s\n" * 4, encoding="utf-8")
+    git(["commit", "-am", "c4"], repo, email="carol@test.com")
+    scoped = BlameOwnership(str(repo), scopes=["solo.py"], cache_dir=str(cache_dir))
+    scoped.author_stats()
+    second = cached_keys()
+    assert len(second) == 3
+    assert {key for key in first if key.endswith(" solo.py")}.isdisjoint(second)
+
+    # Deleted files leave the cache on the next save; no temporary file is left.
+    git(["rm", "-q", "notes.md"], repo)
+    git(["commit", "-m", "c5"], repo)
+    BlameOwnership(str(repo), workers=1, cache_dir=str(cache_dir)).author_stats()
+    assert sorted(key.split(" ", 1)[1] for key in cached_keys()) == [
+        "solo.py",
+        "src/app.py",
+    ]
+    assert [p.name for p in cache_dir.iterdir()] == ["blame-cache.json"]
+
+
+def test_ignore_rules_and_scopes(repo, tmp_path):
+    ignore_file = tmp_path / ".busfactorignore"
+    ignore_file.write_text("*.md\n", encoding="utf-8")
+
+    ownership = BlameOwnership(
+        str(repo), BusFactorIgnore(str(ignore_file)), workers=1, cache_dir=str(tmp_path)
+    )
+    assert [path for path, _ in ownership.files()] == ["solo.py", "src/app.py"]
+
+    scoped = BlameOwnership(str(repo), scopes=["src"], cache_dir=str(tmp_path))
+    assert [path for path, _ in scoped.files()] == ["src/app.py"]
+
+
+def test_parse_line_porcelain():
+    output = (
+        "1111 1 1 2\nauthor A\nauthor-mail <a@x>\nsummary s\n\tline 1\n"
+        "1111 2 2\nauthor A\nauthor-mail <a@x>\n\tline 2\n"
+        "2222 3 3 1\nauthor B\nauthor-mail <b@x>\n\t\n"
+    )
+    assert parse_line_porcelain(output) == ({"a@x": 2, "b@x": 1}, {"a@x": 1, "b@x": 1})
+
+
+def test_commit_rows_cannot_use_blame():
+    data = pd.DataFrame(
+        {"file": ["a.py"], "author": ["a"], "lines_added": [1], "lines_deleted": [0]}
+    )
+    with pytest.raises(ValueError, match="BlameOwnership"):
+        BusFactorCalculator(data, metric="blame").calculate()
+
+
+def test_analyze_blame(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(
+        app,
+        [
+            "analyze",
+            str(repo),
+            "-m",
+            "blame",
+            "-f",
+            "csv",
+            "-o",
+            "out.csv",
+            "--no-charts",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Blamed 3 files" in result.output
+
+    report = pd.read_csv(tmp_path / "out.csv").set_index("file")
+    assert report.loc["src/app.py", "total_file_churn"] == 11
+    assert report.loc["solo.py", "risk_class"] == "Critical"
+
+
+def test_blame_rejects_trend():
+    result = runner.invoke(app, ["analyze", ".", "-m", "blame", "--trend"])
+    assert result.exit_code == 1
+    assert "--metric blame" in result.output
@@ -96,6 +96,12 @@ def test_invalid_metric_raises_error(sample_commit_data):
         BusFactorCalculator(sample_commit_data, metric="magic-metric")
 
 
+@pytest.mark.parametrize("threshold", [0.0, -0.2, 1.5])
+def test_invalid_threshold_raises_error(sample_commit_data, threshold):
+    with pytest.raises(ValueError, match="threshold"):
+        BusFactorCalculator(sample_commit_data, threshold=threshold)
+
+
 def test_valid_metrics_init(sample_commit_data):
     """Tests initialization with all valid metrics."""
     for m in ["churn", "entropy", "hhi", "ownership", "commit-number"]:
@@ -0,0 +1,181 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.checkpoint import default_checkpoint_dir
+from busfactorpy.core.ignore import BusFactorIgnore
+from busfactorpy.core.miner import GitMiner
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def repo(tmp_path, init_repo, commit_all) -> Path:
+    repo = init_repo(tmp_path / "repo")
+    for i in range(9):
+        (repo / f"f{i % 4}.py").write_text("x = 1\n" * (i + 1), encoding="utf-8")
+        (repo / f"doc{i % 2}.md").write_text(f"v{i}\n", encoding="utf-8")
+        commit_all(repo, f"c{i}", email=f"dev{i % 3}@test.com")
+    return repo
+
+
+def _stop_after(n_commits: int):
+    def on_progress(progress):
+        if progress.commits >= n_commits and not progress.done:
+            raise KeyboardInterrupt
+
+    return on_progress
+
+
+def _miner(repo: Path, checkpoint_dir: Path, **kwargs) -> GitMiner:
+    return GitMiner(
+        str(repo),
+        None,
+        checkpoint_every=2,
+        checkpoint_dir=str(checkpoint_dir),
+        progress_interval=0.0,
+        **kwargs,
+    )
+
+
+def test_interrupted_run_resumes_to_the_same_frame(repo, tmp_path):
+    expected = GitMiner(str(repo), None).mine_commit_history()
+    checkpoint_dir = tmp_path / "ckpt"
+
+    with pytest.raises(KeyboardInterrupt):
+        _miner(repo, checkpoint_dir, on_progress=_stop_after(5)).mine_commit_history()
+    assert (checkpoint_dir / "state.json").exists()
+
+    snapshots = []
+    miner = _miner(
+        repo, checkpoint_dir, resume=True, on_progress=lambda p: snapshots.append(p)
+    )
+    resumed = miner.mine_commit_history()
+
+    # Commits 1-4 were checkpointed; the fifth is mined again.
+    assert miner.resumed_commits == 4
+    final = snapshots[-1]
+    assert (final.commits, final.resumed_commits, final.commits_mined) == (9, 4, 5)
+    pd.testing.assert_frame_equal(resumed, expected)
+    assert not checkpoint_dir.exists()
+
+
+def test_batches_resume(repo, tmp_path):
+    expected = GitMiner(str(repo), None).mine_commit_history()
+    checkpoint_dir = tmp_path / "ckpt"
+
+    with pytest.raises(KeyboardInterrupt):
+        for _ in _miner(repo, checkpoint_dir, on_progress=_stop_after(7)).mine_batches(
+            batch_rows=3
+        ):
+            pass
+
+    miner = _miner(repo, checkpoint_dir, resume=True)
+    batches = list(miner.mine_batches(batch_rows=3))
+    resumed = pd.concat(batches, ignore_index=True)
+    resumed["author"] = miner.identity.categorical(resumed["author"].to_numpy())
+
+    assert miner.resumed_commits == 6
+    pd.testing.assert_frame_equal(resumed, expected)
+
+
+def test_without_resume_starts_over(repo, tmp_path):
+    checkpoint_dir = tmp_path / "ckpt"
+    with pytest.raises(KeyboardInterrupt):
+        _miner(repo, checkpoint_dir, on_progress=_stop_after(3)).mine_commit_history()
+
+    miner = _miner(repo, checkpoint_dir)
+    miner.mine_commit_history()
+    assert miner.resumed_commits == 0
+
+
+def test_checkpoint_of_another_run_is_rejected(repo, tmp_path):
+    checkpoint_dir = tmp_path / "ckpt"
+    with pytest.raises(KeyboardInterrupt):
+        _miner(repo, checkpoint_dir, on_progress=_stop_after(3)).mine_commit_history()
+
+    ignore_file = tmp_path / ".busfactorignore"
+    ignore_file.write_text("*.md\n", encoding="utf-8")
+    miner = GitMiner(
+        str(repo),
+        BusFactorIgnore(str(ignore_file)),
+        checkpoint_every=2,
+        checkpoint_dir=str(checkpoint_dir),
+        resume=True,
+    )
+    with pytest.raises(ValueError, match="different run"):
+        miner.mine_commit_history()
+
+
+def test_rewritten_history_is_rejected(repo, git, tmp_path):
+    checkpoint_dir = tmp_path / "ckpt"
+    with pytest.raises(KeyboardInterrupt):
+        _miner(repo, checkpoint_dir, on_progress=_stop_after(5)).mine_commit_history()
+
+    # Rewrites the fourth commit, the last one the checkpoint covers.
+    git(["reset", "--hard", "HEAD~5"], repo)
+    git(["commit", "--amend", "-m", "rewritten"], repo)
+    with pytest.raises(ValueError, match="history changed"):
+        _miner(repo, checkpoint_dir, resume=True).mine_commit_history()
+
+
+def test_default_checkpoint_lives_in_the_git_dir(repo):
+    miner = GitMiner(str(repo), None, checkpoint_every=2)
+    path = Path(default_checkpoint_dir(miner.checkpoint_key()))
+    assert path.parent == repo / ".git" / "busfactorpy" / "checkpoints"
+
+
+def test_checkpoint_is_not_pickled_and_checks_its_owner(repo, tmp_path, monkeypatch):
+    checkpoint_dir = tmp_path / "ckpt"
+    with pytest.raises(KeyboardInterrupt):
+        _miner(repo, checkpoint_dir, on_progress=_stop_after(3)).mine_commit_history()
+    assert not list(checkpoint_dir.rglob("*.pkl"))
+
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(checkpoint_dir).st_uid + 1)
+    with pytest.raises(ValueError, match="not owned by the current user"):
+        _miner(repo, checkpoint_dir, resume=True).mine_commit_history()
+
+
+def test_resume_needs_checkpoint_every():
+    result = runner.invoke(app, ["analyze", ".", "--resume"])
+    assert result.exit_code == 1
+    assert "--resume needs --checkpoint-every" in result.output
+
+
+def test_analyze_resumes_from_checkpoint(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(KeyboardInterrupt):
+        GitMiner(
+            str(repo),
+            BusFactorIgnore(".busfactorignore"),
+            checkpoint_every=2,
+            checkpoint_dir="ckpt",
+            on_progress=_stop_after(5),
+            progress_interval=0.0,
+        ).mine_commit_history()
+
+    result = runner.invoke(
+        app,
+        [
+            "analyze",
+            str(repo),
+            "-f",
+            "csv",
+            "-o",
+            "out.csv",
+            "--no-charts",
+            "--checkpoint-every",
+            "2",
+            "--checkpoint-dir",
+            "ckpt",
+            "--resume",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "4 commits were already mined" in result.output
+    assert len(pd.read_csv(tmp_path / "out.csv")) == 6
+    assert not (tmp_path / "ckpt").exists()
@@ -1,4 +1,6 @@
+import json
 import pandas as pd
+import pytest
 from typer.testing import CliRunner
 from busfactorpy.cli import app
 from datetime import datetime
@@ -78,6 +80,30 @@ def test_cli_invalid_threshold():
     assert "Invalid threshold" in result.stdout
 
 
+@pytest.mark.parametrize(
+    "command",
+    [
+        ["analyze-many", "missing-list.txt"],
+        ["branches", ".", "--ref", "main"],
+        ["simulate", ".", "--remove-author", "dev@test.com"],
+    ],
+)
+@pytest.mark.parametrize(
+    "option,message",
+    [
+        (["--threshold", "0"], "Invalid threshold"),
+        (["--threshold", "1.5"], "Invalid threshold"),
+        (["--group-by", "module"], "Invalid group-by"),
+        (["--group-by", "directory", "--depth", "0"], "Invalid depth"),
+    ],
+)
+def test_cli_shared_options_are_checked_before_mining(command, option, message):
+    result = runner.invoke(app, [*command, *option])
+    assert result.exit_code == 1
+    assert message in result.stdout
+    assert "Analysing" not in result.stdout
+
+
 def test_cli_invalid_since_date():
     result = runner.invoke(app, ["analyze", ".", "--trend", "--since", "data-errada"])
     assert result.exit_code != 0
@@ -109,7 +135,7 @@ def test_cli_trend_default(monkeypatch):
         miner_mod.GitMiner, "mine_commit_history", lambda self: fake_commit_df
     )
 
-    with patch("busfactorpy.cli.TrendAnalyzer") as MockTrend:
+    with patch("busfactorpy.core.trend.TrendAnalyzer") as MockTrend:
         fake_trend_df = pd.DataFrame(
             {
                 "date": [datetime(2024, 1, 1)],
@@ -147,3 +173,157 @@ def test_cli_trend_default(monkeypatch):
         assert call_kwargs["start_date"].year == 2024
         assert call_kwargs["window_days"] == 60
         assert call_kwargs["step_days"] == 15
+
+
+def test_cli_stream_ndjson_to_stdout(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake_commit_df = pd.DataFrame(
+        [
+            {
+                "file": "src/a.py",
+                "author": "a@test.com",
+                "lines_added": 10,
+                "lines_deleted": 0,
+                "commit_hash": "h1",
+            },
+            {
+                "file": "src/b.py",
+                "author": "b@test.com",
+                "lines_added": 5,
+                "lines_deleted": 1,
+                "commit_hash": "h2",
+            },
+        ]
+    )
+
+    from busfactorpy.core import miner as miner_mod
+
+    monkeypatch.setattr(
+        miner_mod.GitMiner, "mine_commit_history", lambda self: fake_commit_df
+    )
+
+    result = runner.invoke(app, ["analyze", ".", "--format", "ndjson", "-o", "-"])
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert len(lines) == 2
+    assert all(line.startswith("{") for line in lines)
+    assert "Analysing repository:" in result.stderr
+
+
+def test_cli_html_report(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake_commit_df = pd.DataFrame(
+        {
+            "file": ["src/a.py", "src/a.py", "b.py"],
+            "author": ["a@test.com", "b@test.com", "a@test.com"],
+            "lines_added": [10, 10, 5],
+            "lines_deleted": [0, 0, 0],
+            "commit_hash": ["h1", "h2", "h3"],
+        }
+    )
+
+    from busfactorpy.core import miner as miner_mod
+
+    monkeypatch.setattr(
+        miner_mod.GitMiner, "mine_commit_history", lambda self: fake_commit_df
+    )
+
+    result = runner.invoke(
+        app, ["analyze", ".", "--no-charts", "-f", "html", "-o", "site"]
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "site/index.html" in result.stdout
+
+    index = json.loads((tmp_path / "site" / "index.json").read_text())
+    assert index["rows"] == 2
+    assert [d["name"] for d in index["directories"]] == [".", "src"]
+
+
+def test_cli_invalid_format():
+    result = runner.invoke(app, ["analyze", ".", "--format", "xml"])
+    assert result.exit_code != 0
+    assert "Invalid format" in result.stdout
+
+
+def test_cli_no_charts(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake_commit_df = pd.DataFrame(
+        [
+            {
+                "file": "src/a.py",
+                "author": "a@test.com",
+                "lines_added": 10,
+                "lines_deleted": 0,
+                "commit_hash": "h1",
+            }
+        ]
+    )
+
+    from busfactorpy.core import miner as miner_mod
+
+    monkeypatch.setattr(
+        miner_mod.GitMiner, "mine_commit_history", lambda self: fake_commit_df
+    )
+
+    result = runner.invoke(app, ["analyze", ".", "--no-charts"])
+    assert result.exit_code == 0
+    assert "Top 10 Arquivos" in result.stdout
+    assert "chart saved" not in result.stdout
+    assert not (tmp_path / "charts").exists()
+
+
+def test_cli_threshold_sweep(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake_commit_df = pd.DataFrame(
+        {
+            "file": ["a.py", "a.py", "b.py", "b.py", "c.py"],
+            "author": ["a@test.com", "b@test.com"] * 2 + ["a@test.com"],
+            "lines_added": [70, 30, 90, 10, 5],
+            "lines_deleted": [0, 0, 0, 0, 0],
+            "commit_hash": ["h1", "h2", "h3", "h4", "h5"],
+        }
+    )
+
+    from busfactorpy.core import miner as miner_mod
+
+    monkeypatch.setattr(
+        miner_mod.GitMiner, "mine_commit_history", lambda self: fake_commit_df
+    )
+
+    result = runner.invoke(
+        app,
+        [
+            "analyze",
+            ".",
+            "--threshold-sweep",
+            "0.6:0.9:0.1",
+            "-f",
+            "csv",
+            "-o",
+            "sweep.csv",
+        ],
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "Sensibilidade do Limiar" in result.stdout
+    assert (tmp_path / "charts" / "threshold_sweep.png").exists()
+
+    sweep = pd.read_csv(tmp_path / "sweep.csv")
+    assert sweep["threshold"].tolist() == [0.6, 0.7, 0.8, 0.9]
+    # a.py has a 70% share, b.py 90%; c.py has a single author.
+    assert sweep["Critical"].tolist() == [1, 1, 1, 1]
+    assert sweep["High"].tolist() == [2, 2, 1, 1]
+    # Medium starts at 75% of the threshold: 0.6 at 0.8, 0.675 at 0.9.
+    assert sweep["Medium"].tolist() == [0, 0, 1, 1]
+    assert sweep["Low"].tolist() == [0, 0, 0, 0]
+
+
+def test_cli_invalid_threshold_sweep():
+    result = runner.invoke(app, ["analyze", ".", "--threshold-sweep", "0.5-0.9"])
+    assert result.exit_code == 1
+    assert "Invalid threshold sweep" in result.stdout
+
+    result = runner.invoke(
+        app, ["analyze", ".", "--threshold-sweep", "0.5:0.9:0.1", "-f", "html"]
+    )
+    assert result.exit_code == 1
+    assert "cannot be exported as html" in result.stdout
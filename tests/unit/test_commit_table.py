@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.columnar import ColumnWriter
+from busfactorpy.core.commit_table import TABLE_DTYPES, TABLE_KIND, CommitTable
+from busfactorpy.core.miner import GitMiner
+from busfactorpy.core.trend import TrendAnalyzer
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def commit_data():
+    rng = np.random.default_rng(5)
+    n = 700
+    files = [f"src/mod{i % 3}/f{i}.py" for i in range(25)] + ["README.md"]
+    return pd.DataFrame(
+        {
+            "file": rng.choice(files, n),
+            "author": rng.choice([f"dev{i}@test.com" for i in range(5)], n),
+            "date": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 90 * 24 * 3600, n), unit="s"),
+            "lines_added": rng.integers(0, 60, n),
+            "lines_deleted": rng.integers(0, 20, n),
+        }
+    )
+
+
+@pytest.fixture
+def table(commit_data, tmp_path) -> CommitTable:
+    """Writes commit_data in several appends, as mining does."""
+    path = str(tmp_path / "table")
+    file_codes, files = pd.factorize(commit_data["file"])
+    author_codes, authors = pd.factorize(commit_data["author"])
+    dates = commit_data["date"].to_numpy("datetime64[s]").astype(np.int64)
+
+    writer = ColumnWriter(path, TABLE_KIND, TABLE_DTYPES)
+    for start in range(0, len(commit_data), 128):
+        rows = slice(start, start + 128)
+        writer.append(
+            {
+                "file": file_codes[rows],
+                "author": author_codes[rows],
+                "date": dates[rows],
+                "lines_added": commit_data["lines_added"].to_numpy()[rows],
+                "lines_deleted": commit_data["lines_deleted"].to_numpy()[rows],
+                "commit": np.arange(len(commit_data))[rows],
+            }
+        )
+    writer.close(
+        dictionaries={
+            "files": files.tolist(),
+            "authors": authors.tolist(),
+            "commit_hashes": [f"c{i}" for i in range(len(commit_data))],
+        }
+    )
+    return CommitTable.load(path)
+
+
+def _assert_same(a: pd.DataFrame, b: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False
+    )
+
+
+def test_columns_are_memory_mapped_fixed_width(table, commit_data):
+    assert len(table) == len(commit_data)
+    assert isinstance(table.file, np.memmap)
+    assert table.file.dtype == np.int32
+    assert table.date.dtype == np.int64
+    assert table.lines_added.dtype == np.int32
+    assert table.date_range()[0] == commit_data["date"].min()
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 97, 10_000])
+def test_chunked_author_stats_match_in_memory(table, commit_data, chunk_rows):
+    expected = (
+        BusFactorCalculator(commit_data)
+        .aggregate_author_stats()
+        .sort_values(["file", "author"])
+    )
+    result = table.author_stats(chunk_rows=chunk_rows).sort_values(["file", "author"])
+    _assert_same(result, expected)
+
+
+@pytest.mark.parametrize("metric", ["churn", "hhi", "commit-number"])
+def test_filtered_metrics_match_calculator(table, commit_data, metric):
+    subset = commit_data[
+        commit_data["file"].str.startswith("src/mod1/")
+        & (commit_data["date"] >= "2024-02-01")
+        & (commit_data["date"] <= "2024-03-01 12:00")
+    ]
+    expected = BusFactorCalculator(subset, metric=metric).calculate()
+    result = BusFactorCalculator.from_author_stats(
+        table.author_stats(
+            since="2024-02-01",
+            until="2024-03-01 12:00",
+            scope="src/mod1",
+            chunk_rows=50,
+        ),
+        metric=metric,
+    ).calculate()
+    _assert_same(result, expected)
+
+
+def test_trend_over_table(table, commit_data):
+    params = {"metric": "churn", "threshold": 0.8, "group_by": "file", "depth": 1}
+    window = {
+        "start_date": pd.Timestamp("2024-02-01"),
+        "end_date": pd.Timestamp("2024-03-31"),
+        "window_days": 30,
+        "step_days": 15,
+    }
+    expected = TrendAnalyzer(commit_data.copy(), params).analyze(**window)
+    _assert_same(TrendAnalyzer(table, params).analyze(**window), expected)
+
+    # The scope applies to every window, as for mined rows.
+    expected = TrendAnalyzer(commit_data.copy(), params, scope="src/mod1").analyze(
+        **window
+    )
+    result = TrendAnalyzer(table, params, scope="src/mod1").analyze(**window)
+    _assert_same(result, expected)
+    assert (result["total_files"] <= 8).all()
+
+
+def test_mine_table_cli_matches_repository_analysis(tmp_path, init_repo, commit_all):
+    repo = init_repo(tmp_path / "repo")
+    for i in range(6):
+        (repo / f"f{i % 3}.py").write_text("x = 1\n" * (i * 7 + 1), encoding="utf-8")
+        commit_all(repo, f"c{i}", email=f"dev{i % 2}@test.com")
+
+    out = tmp_path / "table"
+    result = runner.invoke(
+        app, ["mine-table", str(repo), str(out), "--batch-rows", "1"]
+    )
+    assert result.exit_code == 0, result.output
+    table = CommitTable.load(str(out))
+    assert len(table) == len(GitMiner(str(repo), None).mine_commit_history())
+    assert len(table.commit_hashes) == 6
+
+    for source, csv in [(repo, "from_repo.csv"), (out, "from_table.csv")]:
+        result = runner.invoke(
+            app,
+            [
+                "analyze",
+                str(source),
+                "-m",
+                "hhi",
+                "-f",
+                "csv",
+                "-o",
+                str(tmp_path / csv),
+            ],
+        )
+        assert result.exit_code == 0, result.output
+
+    pd.testing.assert_frame_equal(
+        pd.read_csv(tmp_path / "from_table.csv"),
+        pd.read_csv(tmp_path / "from_repo.csv"),
+    )
+
+
+@pytest.mark.parametrize("scopes", [["src"], ["src", "lib"]])
+def test_analyze_table_with_scopes_mined_out_of_order(
+    tmp_path, init_repo, commit_all, scopes
+):
+    # File codes follow mining order, which is not path order.
+    repo = init_repo(tmp_path / "repo")
+    for i, path in enumerate(["src/z.py", "lib/b.py", "src/a.py", "src/z.py"]):
+        (repo / path).parent.mkdir(exist_ok=True)
+        (repo / path).write_text("x = 1\n" * (i + 2), encoding="utf-8")
+        commit_all(repo, f"c{i}", email=f"dev{i % 2}@test.com")
+
+    out = tmp_path / "table"
+    assert runner.invoke(app, ["mine-table", str(repo), str(out)]).exit_code == 0
+    stats = CommitTable.load(str(out)).author_stats()
+    assert stats["file"].tolist()[0] == "lib/b.py"
+    assert stats["file"].is_monotonic_increasing
+
+    scope_args = [arg for scope in scopes for arg in ("--scope", scope)]
+    for source, csv in [(repo, "from_repo.csv"), (out, "from_table.csv")]:
+        result = runner.invoke(
+            app,
+            ["analyze", str(source), *scope_args, "-f", "csv"]
+            + ["-o", str(tmp_path / csv)],
+        )
+        assert result.exit_code == 0, result.output
+
+    pd.testing.assert_frame_equal(
+        pd.read_csv(tmp_path / "from_table.csv"),
+        pd.read_csv(tmp_path / "from_repo.csv"),
+    )
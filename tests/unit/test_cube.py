@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.cube import AggregateCube
+from busfactorpy.core.scope import calculate_scopes, calculate_scopes_from_stats
+from busfactorpy.core.trend import TrendAnalyzer
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def commit_data():
+    rng = np.random.default_rng(11)
+    n = 500
+    files = [f"src/mod{i % 3}/pkg{i % 2}/f{i % 20}.py" for i in range(40)] + [
+        "README.md"
+    ]
+    # Several commits per day, so rows really collapse into (file, author, day).
+    return pd.DataFrame(
+        {
+            "file": rng.choice(files, n),
+            "author": rng.choice([f"dev{i}@test.com" for i in range(4)], n),
+            "date": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 120 * 24, n), unit="h"),
+            "lines_added": rng.integers(0, 60, n),
+            "lines_deleted": rng.integers(0, 20, n),
+        }
+    )
+
+
+def _assert_same(a: pd.DataFrame, b: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False
+    )
+
+
+def test_cube_is_smaller_than_rows(commit_data):
+    cube = AggregateCube.from_commits(commit_data)
+    assert 0 < len(cube) < len(commit_data)
+    assert int(cube.commits.sum()) == len(commit_data)
+    assert cube.files.tolist() == sorted(commit_data["file"].unique())
+
+
+@pytest.mark.parametrize(
+    "metric", ["churn", "entropy", "hhi", "ownership", "commit-number"]
+)
+@pytest.mark.parametrize("group_by,depth", [("file", 1), ("directory", 2)])
+def test_from_cube_matches_calculator(commit_data, metric, group_by, depth, tmp_path):
+    AggregateCube.from_commits(commit_data).save(str(tmp_path / "cube"))
+    cube = AggregateCube.load(str(tmp_path / "cube"))
+    assert isinstance(cube.file, np.memmap)
+
+    expected = BusFactorCalculator(
+        commit_data, metric=metric, group_by=group_by, depth=depth
+    ).calculate()
+    result = BusFactorCalculator.from_cube(
+        cube, metric=metric, group_by=group_by, depth=depth
+    ).calculate()
+    _assert_same(result, expected)
+
+
+def test_from_cube_dates_and_scope(commit_data):
+    cube = AggregateCube.from_commits(commit_data)
+    # Whole days: --until includes every commit of the last day.
+    subset = commit_data[
+        commit_data["file"].str.startswith("src/mod1/")
+        & (commit_data["date"] >= "2024-02-01")
+        & (commit_data["date"] < "2024-03-16")
+    ]
+    expected = BusFactorCalculator(subset, metric="hhi").calculate()
+
+    result = BusFactorCalculator.from_cube(
+        cube, metric="hhi", since="2024-02-01", until="2024-03-15", scope="src/mod1"
+    ).calculate()
+    _assert_same(result, expected)
+
+
+def test_scopes_from_cube_stats(commit_data):
+    cube = AggregateCube.from_commits(commit_data)
+    scopes = ["src/mod0", "src/mod2/pkg1"]
+
+    expected = calculate_scopes(commit_data, scopes, metric="entropy")
+    result = calculate_scopes_from_stats(cube.author_stats(), scopes, metric="entropy")
+    for scope in scopes:
+        _assert_same(result[scope], expected[scope])
+
+
+def test_trend_runs_on_cube(commit_data):
+    # Day-aligned commits make window boundaries identical for both inputs.
+    daily = commit_data.assign(date=commit_data["date"].dt.floor("D"))
+    params = {"metric": "churn", "threshold": 0.8, "group_by": "file", "depth": 1}
+    start, end = pd.Timestamp("2024-02-01"), pd.Timestamp("2024-04-30")
+
+    expected = TrendAnalyzer(daily.copy(), params).analyze(start, end, 30, 15)
+    result = TrendAnalyzer(AggregateCube.from_commits(daily), params).analyze(
+        start, end, 30, 15
+    )
+    _assert_same(result, expected)
+
+
+def test_trend_on_cube_keeps_the_scope(commit_data):
+    daily = commit_data.assign(date=commit_data["date"].dt.floor("D"))
+    params = {"metric": "churn", "threshold": 0.8, "group_by": "file", "depth": 1}
+    start, end = pd.Timestamp("2024-02-01"), pd.Timestamp("2024-04-30")
+    scoped = daily[daily["file"].str.startswith("src/mod1/")]
+
+    expected = TrendAnalyzer(scoped.copy(), params).analyze(start, end, 30, 15)
+    result = TrendAnalyzer(
+        AggregateCube.from_commits(daily), params, scope="src/mod1"
+    ).analyze(start, end, 30, 15)
+    _assert_same(result, expected)
+    assert (result["total_files"] < 41).all()
+
+
+def test_load_rejects_other_directories(tmp_path):
+    assert not AggregateCube.is_cube(str(tmp_path))
+    with pytest.raises(ValueError):
+        AggregateCube.load(str(tmp_path))
+
+
+def test_cli_cube_then_analyze(commit_data, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    from busfactorpy.core import miner as miner_mod
+
+    def fake_mine(self):
+        calls.append(self.repo_path)
+        return commit_data
+
+    monkeypatch.setattr(miner_mod.GitMiner, "mine_commit_history", fake_mine)
+
+    result = runner.invoke(app, ["cube", ".", "history.cube"])
+    assert result.exit_code == 0, result.stdout
+    assert "Cube saved to" in result.stdout
+
+    result = runner.invoke(
+        app,
+        ["analyze", "history.cube", "-f", "csv", "-o", "out.csv", "--no-charts"],
+    )
+    assert result.exit_code == 0, result.stdout
+    assert calls == ["."]
+
+    expected = BusFactorCalculator(commit_data).calculate()
+    _assert_same(pd.read_csv(tmp_path / "out.csv"), expected)
+
+
+def test_cli_trend_on_cube_passes_the_scope(commit_data, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    AggregateCube.from_commits(commit_data).save("history.cube")
+
+    from busfactorpy.core import trend as trend_mod
+
+    scopes = []
+
+    class RecordingTrend(trend_mod.TrendAnalyzer):
+        def __init__(self, commit_data, calculator_params, scope=None):
+            scopes.append(scope)
+            super().__init__(commit_data, calculator_params, scope=scope)
+
+    monkeypatch.setattr(trend_mod, "TrendAnalyzer", RecordingTrend)
+    result = runner.invoke(
+        app,
+        ["analyze", "history.cube", "--trend", "--scope", "src/mod1", "--no-charts"],
+    )
+    assert result.exit_code == 0, result.stdout
+    assert scopes == ["src/mod1"]
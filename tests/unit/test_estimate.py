@@ -0,0 +1,168 @@
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from benchmarks.synthetic import SyntheticHistory
+from busfactorpy.cli import app
+from busfactorpy.core.analyzer import RiskAnalyzer
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.estimate import SampleEstimator, sample_commits
+from busfactorpy.core.miner import GitMiner
+
+runner = CliRunner()
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory) -> str:
+    path = tmp_path_factory.mktemp("estimate") / "repo"
+    return SyntheticHistory(120, 15, 4, seed=5).write_repository(str(path))
+
+
+def test_time_stratified_sample(repo):
+    sample = sample_commits(repo, 30, "time", seed=1)
+    assert len(set(sample.hashes)) == len(sample) >= 30 - 10
+    assert sample.population == 120
+    # Every sampled commit stands for N_h / n_h commits of its stratum.
+    assert sample.weights[sample.strata].sum() == pytest.approx(120)
+    # Equal-width buckets over a regular history: all strata are sampled.
+    assert len(np.unique(sample.strata)) == 10
+
+    uniform = sample_commits(repo, 30, "uniform", seed=1)
+    assert len(uniform) == 30 and set(uniform.weights) == {4.0}
+    assert sample_commits(repo, 30, "time", seed=1).hashes == sample.hashes
+
+
+def test_sample_is_drawn_from_the_date_window(repo):
+    # One commit per hour from 2020-01-01: hours 48 to 72 fall in the window.
+    window = {"since": datetime(2020, 1, 3), "until": datetime(2020, 1, 4)}
+    sample = sample_commits(repo, 10, "uniform", seed=1, **window)
+    assert sample.population == 25 and len(sample) == 10
+
+    data = GitMiner(repo, None, commits=sample.hashes).mine_commit_history()
+    dates = pd.to_datetime(data["date"], utc=True).dt.tz_localize(None)
+    assert dates.between(window["since"], window["until"]).all()
+
+    with pytest.raises(ValueError, match="no commits to sample"):
+        sample_commits(repo, 10, since=datetime(2030, 1, 1))
+
+
+@pytest.mark.parametrize(
+    "metric,group_by", [("churn", "file"), ("hhi", "file"), ("churn", "directory")]
+)
+def test_full_sample_reproduces_exact_results(repo, metric, group_by):
+    sample = sample_commits(repo, 1_000, "time")
+    data = GitMiner(repo, None, commits=sample.hashes).mine_commit_history()
+    exact = BusFactorCalculator(
+        data, metric=metric, group_by=group_by, depth=2
+    ).calculate()
+
+    estimated, summary = SampleEstimator(
+        data, sample, metric=metric, group_by=group_by, depth=2, n_bootstrap=50
+    ).estimate()
+
+    merged = exact.merge(estimated, on="file", suffixes=("", "_est"))
+    assert len(merged) == len(exact) == len(estimated)
+    np.testing.assert_allclose(
+        merged["main_author_share_est"], merged["main_author_share"]
+    )
+    assert (merged["risk_class_est"] == merged["risk_class"]).all()
+    assert (estimated["share_ci_low"] <= estimated["main_author_share"] + 1e-9).all()
+    assert (estimated["share_ci_high"] >= estimated["main_author_share"] - 1e-9).all()
+    assert summary["sampled_commits"] == summary["population_commits"] == 120
+
+
+def test_critical_stability_summary(repo):
+    sample = sample_commits(repo, 40, "uniform", seed=2)
+    data = GitMiner(repo, None, commits=sample.hashes).mine_commit_history()
+    estimated, summary = SampleEstimator(data, sample, n_bootstrap=100).estimate()
+
+    assert summary["critical"] == int((estimated["risk_class"] == "Critical").sum())
+    assert (
+        0.0
+        <= summary["critical_jaccard_low"]
+        <= summary["critical_jaccard_mean"]
+        <= 1.0
+    )
+    assert estimated["critical_probability"].between(0, 1).all()
+    # Sums are extrapolated from 40 commits to 120.
+    assert estimated["total_file_churn"].sum() == pytest.approx(
+        3 * (data["lines_added"] + data["lines_deleted"]).sum()
+    )
+
+
+def test_replicates_pass_author_codes(repo, monkeypatch):
+    sample = sample_commits(repo, 40, "uniform", seed=2)
+    data = GitMiner(repo, None, commits=sample.hashes).mine_commit_history()
+    estimator = SampleEstimator(data, sample, n_bootstrap=3)
+    n_authors = data["author"].nunique()
+
+    seen = []
+    reduce = estimator.spec.reduce
+
+    def recording(grouped):
+        seen.append(grouped.codes)
+        return reduce(grouped)
+
+    monkeypatch.setattr(estimator, "spec", replace(estimator.spec, reduce=recording))
+    estimator.estimate()
+
+    assert len(seen) == 3
+    for codes in seen:
+        # Author codes, not pair indices: as many codes as authors at most.
+        assert codes.max() < n_authors < len(codes)
+
+
+def test_classify_array_matches_classify_risk():
+    n_authors = np.array([1, 2, 3, 2, 5])
+    shares = np.array([1.0, 0.9, 0.65, 0.3, 0.8])
+    thresholds = np.array([[0.5], [0.8], [0.95]])
+    grid = RiskAnalyzer.classify_array(n_authors, shares, thresholds)
+
+    assert grid.shape == (3, 5)
+    for i, threshold in enumerate(thresholds[:, 0]):
+        assert grid[i].tolist() == [
+            RiskAnalyzer.classify_risk(n, s, threshold)
+            for n, s in zip(n_authors, shares)
+        ]
+
+
+def test_analyze_estimate_exports_intervals(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(
+        app,
+        [
+            "analyze",
+            repo,
+            "--estimate",
+            "--sample-size",
+            "60",
+            "--bootstrap",
+            "30",
+            "-f",
+            "csv",
+            "-o",
+            "out.csv",
+            "--no-charts",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Estimating from" in result.output
+    assert "Estabilidade do Conjunto Crítico" in result.output
+
+    report = pd.read_csv(tmp_path / "out.csv")
+    assert {
+        "risk_class",
+        "share_ci_low",
+        "share_ci_high",
+        "critical_probability",
+    } <= set(report.columns)
+
+
+def test_estimate_rejects_trend():
+    result = runner.invoke(app, ["analyze", ".", "--estimate", "--trend"])
+    assert result.exit_code == 1
+    assert "--estimate needs a local repository" in result.output
@@ -0,0 +1,164 @@
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core import miner as miner_mod
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.file_index import INDEX_DIR, FileIndex, changed_paths
+from busfactorpy.core.miner import GitMiner
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def append_lines(commit_all):
+    """Appends lines to path and commits the edit as email."""
+
+    def append(repo: Path, path: str, lines: int, email: str):
+        file_path = repo / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "a", encoding="utf-8") as f:
+            f.write("x = 1\n" * lines)
+        commit_all(repo, f"edit {path}", email=email)
+
+    return append
+
+
+@pytest.fixture
+def git_repo(tmp_path: Path, init_repo, append_lines, git) -> Path:
+    repo = init_repo(tmp_path / "repo")
+    authors = ["a@test.com", "b@test.com", "c@test.com"]
+    for i in range(10):
+        append_lines(repo, f"src/mod{i % 2}/f{i % 5}.py", i + 1, authors[i % 3])
+    git(["tag", "base"], repo)
+    return repo
+
+
+def _full_history(repo: Path) -> pd.DataFrame:
+    df = GitMiner(str(repo), None).mine_commit_history()
+    df["date"] = pd.to_datetime(df["date"], utc=True).dt.tz_localize(None)
+    return df
+
+
+def test_history_matches_mined_rows(git_repo):
+    index = FileIndex.load_or_build(str(git_repo))
+    full = _full_history(git_repo)
+    paths = ["src/mod0/f0.py", "src/mod1/f3.py", "missing.py"]
+
+    expected = full[full["file"].isin(paths)].sort_values("file", kind="stable")
+    result = index.history(paths)
+    pd.testing.assert_frame_equal(
+        result.reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def test_warm_cache_does_not_mine(git_repo, monkeypatch):
+    FileIndex.load_or_build(str(git_repo))
+
+    def fail(self):
+        raise AssertionError("the warm path must not mine")
+
+    monkeypatch.setattr(miner_mod.GitMiner, "mine_commit_history", fail)
+    start = time.perf_counter()
+    index = FileIndex.load_or_build(str(git_repo))
+    index.history(["src/mod0/f0.py"])
+    assert time.perf_counter() - start < 1.0
+
+
+def test_new_commits_are_mined_incrementally(git_repo, monkeypatch, append_lines, git):
+    FileIndex.load_or_build(str(git_repo))
+    append_lines(git_repo, "src/mod0/f0.py", 3, "d@test.com")
+    append_lines(git_repo, "docs/new.md", 2, "a@test.com")
+
+    ranges = []
+    original = miner_mod.GitMiner.mine_commit_history
+
+    def record(self):
+        ranges.append(self.commit_range)
+        return original(self)
+
+    monkeypatch.setattr(miner_mod.GitMiner, "mine_commit_history", record)
+    index = FileIndex.load_or_build(str(git_repo))
+
+    assert len(ranges) == 1 and ranges[0].endswith(git(["rev-parse", "HEAD"], git_repo))
+    full = _full_history(git_repo).sort_values("file", kind="stable")
+    pd.testing.assert_frame_equal(
+        index.history().reset_index(drop=True),
+        full.reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def test_cli_changed_since(git_repo, monkeypatch, tmp_path, append_lines, git):
+    git(["checkout", "-q", "-b", "feature"], git_repo)
+    append_lines(git_repo, "src/mod1/f1.py", 4, "d@test.com")
+    append_lines(git_repo, "src/mod0/f2.py", 1, "b@test.com")
+    assert changed_paths(str(git_repo), "base") == ["src/mod0/f2.py", "src/mod1/f1.py"]
+
+    monkeypatch.chdir(tmp_path)
+    args = ["analyze", str(git_repo), "--changed-since", "base", "--no-charts"]
+    result = runner.invoke(app, [*args, "-f", "csv", "-o", "out.csv"])
+    assert result.exit_code == 0, result.stdout
+    assert "2 files changed since" in result.stdout
+
+    full = _full_history(git_repo)
+    expected = BusFactorCalculator(
+        full[full["file"].isin(["src/mod0/f2.py", "src/mod1/f1.py"])]
+    ).calculate()
+    pd.testing.assert_frame_equal(
+        pd.read_csv(tmp_path / "out.csv"),
+        expected,
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def test_aliases_are_applied_and_key_the_cache(git_repo, tmp_path):
+    plain = FileIndex.load_or_build(str(git_repo))
+    assert set(plain.authors) == {"a@test.com", "b@test.com", "c@test.com"}
+
+    aliases = tmp_path / "aliases.txt"
+    aliases.write_text("a@test.com b@test.com\n", encoding="utf-8")
+    merged = FileIndex.load_or_build(str(git_repo), str(aliases))
+    assert set(merged.authors) == {"a@test.com", "c@test.com"}
+    expected = GitMiner(str(git_repo), None, aliases=str(aliases))
+    assert merged.history()["author"].value_counts().to_dict() == (
+        expected.mine_commit_history()["author"].value_counts().to_dict()
+    )
+
+    # Editing the rules invalidates the cached index, HEAD unchanged.
+    aliases.write_text("c@test.com b@test.com\n", encoding="utf-8")
+    rekeyed = FileIndex.load_or_build(str(git_repo), str(aliases))
+    assert set(rekeyed.authors) == {"a@test.com", "c@test.com"}
+    assert rekeyed.identity != merged.identity
+    assert (rekeyed.history()["author"] == "c@test.com").sum() > (
+        merged.history()["author"] == "c@test.com"
+    ).sum()
+
+
+def test_git_dir_with_spaces(git_repo, tmp_path, git):
+    # A linked worktree's git dir is an absolute path inside the main clone.
+    clone = tmp_path / "my clone"
+    git(["clone", "-q", str(git_repo), str(clone)], tmp_path)
+    worktree = tmp_path / "tree"
+    git(["worktree", "add", "-q", "--detach", str(worktree)], clone)
+
+    index = FileIndex.load_or_build(str(worktree))
+    assert len(index) == len(_full_history(git_repo))
+    assert (clone / ".git" / "worktrees" / "tree" / INDEX_DIR).is_dir()
+
+
+def test_cli_changed_since_rejects_trend(git_repo):
+    result = runner.invoke(
+        app, ["analyze", str(git_repo), "--changed-since", "base", "--trend"]
+    )
+    assert result.exit_code == 1
+    assert "--changed-since" in result.stdout
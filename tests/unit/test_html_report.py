@@ -0,0 +1,94 @@
+import json
+
+import pandas as pd
+import pytest
+
+from busfactorpy.output.html_report import REPORT_KIND, HtmlReportWriter
+from busfactorpy.output.reporter import ConsoleReporter
+
+
+@pytest.fixture
+def results_df():
+    return pd.DataFrame(
+        {
+            "file": ["src/a.py", "src/b.py", "docs/c.md", "setup.py", "src/d.py"],
+            "n_authors": [1, 2, 1, 3, 1],
+            "total_file_churn": [10, 50, 5, 7, 80],
+            "main_author_share": [1.0, 0.7, 1.0, 0.4, 1.0],
+            "risk_class": ["Critical", "Medium", "Critical", "Low", "Critical"],
+        }
+    )
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _rows(report, shards):
+    return [row for shard in shards for row in _read(report / shard)]
+
+
+def test_writes_sorted_shards_per_class_and_directory(results_df, tmp_path):
+    page = HtmlReportWriter(results_df, shard_rows=2).write(str(tmp_path))
+    index = _read(tmp_path / "index.json")
+
+    assert page == str(tmp_path / "index.html")
+    assert index["kind"] == REPORT_KIND
+    assert index["rows"] == 5
+    assert index["columns"] == list(results_df.columns)
+
+    classes = {c["name"]: c for c in index["classes"]}
+    assert list(classes) == ["Critical", "Medium", "Low"]
+    assert len(classes["Critical"]["shards"]) == 2
+    # Ties on the share are broken by churn, descending.
+    critical = _rows(tmp_path, classes["Critical"]["shards"])
+    assert [row[0] for row in critical] == ["src/d.py", "src/a.py", "docs/c.md"]
+
+    directories = {d["name"]: d for d in index["directories"]}
+    assert set(directories) == {".", "docs", "src"}
+    assert directories["src"]["counts"] == {"Critical": 2, "Medium": 1}
+    src = _rows(tmp_path, directories["src"]["shards"])
+    assert [row[0] for row in src] == ["src/d.py", "src/a.py", "src/b.py"]
+
+
+def test_depth_and_rewrite_drop_old_shards(results_df, tmp_path):
+    nested = results_df.assign(file="pkg/" + results_df["file"])
+    HtmlReportWriter(results_df, shard_rows=1).write(str(tmp_path))
+    HtmlReportWriter(nested, depth=2).write(str(tmp_path))
+
+    index = _read(tmp_path / "index.json")
+    assert [d["name"] for d in index["directories"]] == ["pkg", "pkg/docs", "pkg/src"]
+    shards = {p.name for p in (tmp_path / "shards").rglob("*.json")}
+    assert len(shards) == len(index["classes"]) + len(index["directories"])
+
+
+def test_refuses_a_directory_that_is_not_a_report(results_df, tmp_path):
+    (tmp_path / "shards").mkdir()
+    precious = tmp_path / "shards" / "precious.txt"
+    precious.write_text("keep me", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="does not hold an HTML report"):
+        HtmlReportWriter(results_df).write(str(tmp_path))
+    assert precious.exists()
+
+
+def test_requires_file_and_risk_class(results_df):
+    with pytest.raises(ValueError, match="risk_class"):
+        HtmlReportWriter(results_df.drop(columns="risk_class"))
+
+
+def test_export_report_html(results_df, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ConsoleReporter(results_df).export_report("html")
+
+    report = tmp_path / "reports" / "busfactorpy_report_html"
+    assert (
+        (report / "index.html")
+        .read_text(encoding="utf-8")
+        .startswith("<!DOCTYPE html>")
+    )
+    assert _read(report / "index.json")["rows"] == len(results_df)
+
+    with pytest.raises(ValueError, match="directory"):
+        ConsoleReporter(results_df).export_report("html", path="-")
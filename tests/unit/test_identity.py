@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.identity import AuthorIdentity
+from busfactorpy.core.miner import GitMiner
+
+runner = CliRunner()
+
+
+def test_mailmap_forms():
+    identity = AuthorIdentity()
+    identity.add_mailmap(
+        [
+            "# comment",
+            "Alice Doe <alice@corp.com>",
+            "<alice@corp.com> <alice@home.org>",
+            "Bob <bob@corp.com> <bob@old.com>",
+            "Bob <bob@corp.com> Bobby <BOB@laptop.local>",
+        ]
+    )
+
+    ids = [
+        identity.intern(email)
+        for email in [
+            "alice@corp.com",
+            "Alice@Home.org",
+            "bob@old.com",
+            "bob@laptop.local",
+            "bob@corp.com",
+            "carol@corp.com",
+        ]
+    ]
+    assert ids == [0, 0, 1, 1, 1, 2]
+    assert identity.emails == ["alice@corp.com", "bob@corp.com", "carol@corp.com"]
+
+    table = identity.table().set_index("author_id")
+    assert table.loc[0, "name"] == "Alice Doe"
+    assert table.loc[1, "aliases"] == "bob@laptop.local, bob@old.com"
+
+
+def test_alias_rules_are_transitive():
+    identity = AuthorIdentity()
+    identity.add_aliases(["a@x.com, a@y.com", "a@z.com a@y.com  # laptop"])
+    assert {identity.intern(e) for e in ["a@x.com", "a@y.com", "a@z.com"]} == {0}
+    assert identity.emails == ["a@x.com"]
+
+    with pytest.raises(RuntimeError):
+        identity.union("b@x.com", "b@y.com")
+
+
+@pytest.fixture
+def git_repo(tmp_path: Path, init_repo, commit_all) -> Path:
+    repo = init_repo(tmp_path / "repo")
+    emails = ["ann@work.com", "ann@home.com", "ANN@work.com", "ben@work.com"]
+    for i, email in enumerate(emails):
+        (repo / "app.py").write_text("x = 1\n" * (i + 1), encoding="utf-8")
+        commit_all(repo, f"commit {i}", email=email)
+    (repo / ".mailmap").write_text(
+        "Ann <ann@work.com> <ann@home.com>\n", encoding="utf-8"
+    )
+    return repo
+
+
+def test_miner_interns_authors(git_repo, tmp_path):
+    df = GitMiner(str(git_repo), None).mine_commit_history()
+
+    assert isinstance(df["author"].dtype, pd.CategoricalDtype)
+    assert df["author"].cat.codes.tolist() == [0, 0, 0, 1]
+    assert list(df["author"].cat.categories) == ["ann@work.com", "ben@work.com"]
+
+    result = BusFactorCalculator(df).calculate().set_index("file")
+    assert result.loc["app.py", "n_authors"] == 2
+
+    aliases = tmp_path / "aliases.txt"
+    aliases.write_text("ann@work.com ben@work.com\n", encoding="utf-8")
+    df = GitMiner(str(git_repo), None, aliases=str(aliases)).mine_commit_history()
+    result = BusFactorCalculator(df).calculate().set_index("file")
+    assert result.loc["app.py", "risk_class"] == "Critical"
+
+
+def test_main_author_ties_go_to_the_first_email(tmp_path, init_repo, commit_all):
+    # zed is interned first, but equal churn still resolves by e-mail order.
+    repo = init_repo(tmp_path / "tie")
+    for email, text in [("zed@test.com", "a\n"), ("amy@test.com", "a\nb\n")]:
+        (repo / "f.py").write_text(text, encoding="utf-8")
+        commit_all(repo, email, email=email)
+
+    df = GitMiner(str(repo), None).mine_commit_history()
+    assert list(df["author"].cat.categories) == ["amy@test.com", "zed@test.com"]
+    assert df["author"].tolist() == ["zed@test.com", "amy@test.com"]
+
+    result = BusFactorCalculator(df).calculate().set_index("file")
+    assert result.loc["f.py", "main_author"] == "amy@test.com"
+    assert result.loc["f.py", "main_author_share"] == 0.5
+
+
+def test_cli_authors(git_repo):
+    result = runner.invoke(app, ["authors", str(git_repo)])
+    assert result.exit_code == 0, result.stdout
+    assert "ann@home.com" in result.stdout
+    assert "Ann" in result.stdout
@@ -0,0 +1,53 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = {"pandas", "numpy", "matplotlib", "pydriller", "git", "pathspec"}
+
+
+def _import_log(*args: str) -> list[tuple[int, str, int]]:
+    """
+    Runs the CLI under `python -X importtime` and returns (nesting level,
+    module name, cumulative microseconds) for every import. Top-level imports
+    have level 1.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "busfactorpy.cli", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    log = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, raw_name = line.split("|")
+        name = raw_name[1:]
+        level = (len(name) - len(name.lstrip(" "))) // 2
+        log.append((level, name.strip(), int(cumulative)))
+    return log
+
+
+def test_version_does_not_import_heavy_dependencies():
+    imported = {name.split(".")[0] for _, name, _ in _import_log("version")}
+    assert not HEAVY_MODULES & imported
+
+
+def test_version_leaves_heavy_dependencies_unloaded():
+    # Whatever the runner's speed: after running the command, none of the
+    # heavy modules may be in sys.modules.
+    script = (
+        "import sys\n"
+        "from busfactorpy.cli import app\n"
+        "try:\n"
+        "    app(['version'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"heavy = {sorted(HEAVY_MODULES)!r}\n"
+        "print('loaded:', *[m for m in heavy if m in sys.modules])\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    version, loaded = result.stdout.splitlines()
+    assert version.startswith("BusFactorPy")
+    assert loaded == "loaded:"
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core import metrics as metrics_module
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.metrics import (
+    Metric,
+    MetricEngine,
+    MetricValues,
+    get_metric,
+    register_metric,
+)
+
+runner = CliRunner()
+
+
+def _bottom_share(grouped):
+    """Share of the least active author: a toy plugin metric."""
+    values = grouped.values["commits"]
+    bottom = np.minimum.reduceat(values, grouped.starts)
+    return MetricValues(bottom / grouped.totals("commits"))
+
+
+BOTTOM = Metric("bottom", ("commits",), _bottom_share, help="Toy metric.")
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Isolates registrations (and entry point loading) from other tests."""
+    monkeypatch.setattr(metrics_module, "_REGISTRY", dict(metrics_module._REGISTRY))
+    monkeypatch.setattr(metrics_module, "_entry_points_loaded", False)
+    return metrics_module._REGISTRY
+
+
+@pytest.fixture
+def stats() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "file": ["b.py", "a.py", "a.py", "b.py", "a.py"],
+            "author": ["x", "x", "y", "y", "z"],
+            "total_churn": [10, 5, 5, 30, 0],
+            "commits": [1, 2, 6, 3, 2],
+        }
+    )
+
+
+def test_engine_evaluates_metrics_over_one_grouping(stats):
+    engine = MetricEngine(stats)
+    churn = engine.evaluate(get_metric("churn"))
+    commits = engine.evaluate(get_metric("commit-number"))
+    hhi = engine.evaluate(get_metric("hhi"))
+
+    assert churn["file"].tolist() == ["a.py", "b.py"]
+    assert churn["n_authors"].tolist() == [3, 2]
+    # Ties go to the first author in the table's order, like idxmax.
+    assert churn["main_author"].tolist() == ["x", "y"]
+    assert churn["main_author_share"].tolist() == [0.5, 0.75]
+    assert commits["main_author"].tolist() == ["y", "y"]
+    assert commits["total_commits"].tolist() == [10, 4]
+    assert commits["total_file_churn"].isna().all()
+    np.testing.assert_allclose(hhi["hhi"], [0.5, 0.625])
+
+
+def test_entropy_matches_definition(stats):
+    result = MetricEngine(stats).evaluate(get_metric("entropy"))
+    # a.py: 50/50 between x and y (z has no churn) out of three authors.
+    assert result["entropy"].iloc[0] == pytest.approx(1.0)
+    assert result["main_author_share"].iloc[0] == pytest.approx(1 - 1 / np.log2(3))
+
+
+def test_registered_metric_runs_everywhere(registry, stats):
+    register_metric(BOTTOM)
+    result = BusFactorCalculator.from_author_stats(stats, metric="bottom").calculate()
+    assert result["main_author_share"].tolist() == [0.2, 0.25]
+    assert result["main_author"].isna().all()
+
+    with pytest.raises(ValueError, match="already registered"):
+        register_metric(BOTTOM)
+    with pytest.raises(ValueError, match="aggregate columns"):
+        register_metric(Metric("bad", ("lines",), _bottom_share))
+
+
+def test_compute_metrics_shares_the_aggregation(stats):
+    data = stats.assign(lines_added=stats["total_churn"], lines_deleted=0)
+    results = BusFactorCalculator(data).compute_metrics(["churn", "hhi", "ownership"])
+    assert set(results) == {"churn", "hhi", "ownership"}
+    assert results["ownership"]["main_author"].tolist() == ["x", "x"]
+
+
+class _EntryPoint:
+    def __init__(self, name, value, loaded):
+        self.name, self.value, self._loaded = name, value, loaded
+
+    def load(self):
+        if isinstance(self._loaded, Exception):
+            raise self._loaded
+        return self._loaded
+
+
+def test_entry_points_are_loaded_once(registry, monkeypatch):
+    calls = []
+
+    def entry_points(group):
+        calls.append(group)
+        return [
+            _EntryPoint("bottom", "plugin:BOTTOM", BOTTOM),
+            _EntryPoint("broken", "plugin:BROKEN", ImportError("no module")),
+            _EntryPoint("other", "plugin:OTHER", object()),
+        ]
+
+    monkeypatch.setattr(metrics_module, "entry_points", entry_points)
+    with pytest.warns(UserWarning, match="Skipping metric plugin"):
+        assert get_metric("BOTTOM") is BOTTOM
+    get_metric("churn")
+
+    assert calls == ["busfactorpy.metrics"]
+    assert "broken" not in metrics_module.available_metrics()
+
+
+def test_metrics_command_lists_registry(registry):
+    register_metric(BOTTOM)
+    result = runner.invoke(app, ["metrics"])
+    assert result.exit_code == 0, result.output
+    for name in ("churn", "entropy", "blame", "bottom"):
+        assert name in result.output
+
+
+def test_analyze_with_registered_metric(
+    registry, tmp_path, monkeypatch, init_repo, commit_all
+):
+    repo = init_repo(tmp_path / "repo")
+    (repo / "f.py").write_text("x = 1\n", encoding="utf-8")
+    commit_all(repo, "c1")
+    register_metric(BOTTOM)
+    monkeypatch.chdir(tmp_path)
+
+    result = runner.invoke(
+        app,
+        ["analyze", str(repo), "-m", "bottom", "-f", "csv", "-o", "out.csv"],
+    )
+    assert result.exit_code == 0, result.output
+    assert pd.read_csv(tmp_path / "out.csv")["risk_class"].tolist() == ["Critical"]
+
+
+def test_blame_is_rejected_outside_analyze():
+    result = runner.invoke(app, ["branches", ".", "--ref", "main", "-m", "blame"])
+    assert result.exit_code == 1
+    assert "only available in 'analyze'" in result.output
@@ -187,3 +187,22 @@ def test_miner_remote_clone_simulado(monkeypatch, git_repo, tmp_path):
 
     files_norm = [normalize(f) for f in df["file"]]
     assert "src/a.py" in files_norm
+
+
+def test_miner_multiple_scopes(git_repo, monkeypatch):
+    ignorer = BusFactorIgnore(
+        ignore_file_path=".busfactorignore", root_path=str(git_repo)
+    )
+    original_extract = GitMiner._extract_data
+
+    def _patched_extract(self):
+        df = original_extract(self)
+        df["file"] = df["file"].apply(normalize)
+        return df
+
+    monkeypatch.setattr(GitMiner, "_extract_data", _patched_extract)
+
+    miner = GitMiner(str(git_repo), ignorer, scope=["src/utils", "tests/"])
+    df = miner.mine_commit_history()
+    files = sorted(set(normalize(f) for f in df["file"]))
+    assert files == ["src/utils/b.py", "tests/unit/test_x.py"]
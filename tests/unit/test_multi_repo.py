@@ -0,0 +1,110 @@
+import asyncio
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core import multi_repo
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.ignore import BusFactorIgnore
+from busfactorpy.core.miner import GitMiner
+from busfactorpy.core.multi_repo import MultiRepoAnalyzer, read_repository_list
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def make_repo(init_repo, commit_all):
+    def make(path: Path, n_commits: int) -> Path:
+        init_repo(path)
+        for i in range(n_commits):
+            (path / f"f{i % 3}.py").write_text("x = 1\n" * (i + 1), encoding="utf-8")
+            commit_all(path, f"c{i}", email=f"dev{i % 2}@test.com")
+        return path
+
+    return make
+
+
+@pytest.fixture
+def repositories(tmp_path: Path, make_repo) -> list[str]:
+    first = make_repo(tmp_path / "first", 4)
+    second = make_repo(tmp_path / "second", 6)
+    return [
+        str(first),
+        str(tmp_path / "missing"),
+        second.as_uri(),  # cloned like a remote
+    ]
+
+
+def test_consolidated_results_and_failures(repositories, tmp_path):
+    done = []
+    results, failures = MultiRepoAnalyzer(
+        repositories,
+        concurrency=2,
+        metric="hhi",
+        on_done=lambda repo, error: done.append((repo, error is None)),
+    ).run()
+
+    assert sorted(done) == sorted(
+        [(repositories[0], True), (repositories[1], False), (repositories[2], True)]
+    )
+    assert failures["repository"].tolist() == [repositories[1]]
+    assert list(results.columns[:2]) == ["repository", "file"]
+    assert results["repository"].unique().tolist() == [
+        repositories[0],
+        repositories[2],
+    ]
+
+    local = GitMiner(repositories[0], BusFactorIgnore()).mine_commit_history()
+    expected = BusFactorCalculator(local, metric="hhi").calculate()
+    pd.testing.assert_frame_equal(
+        results[results["repository"] == repositories[0]]
+        .drop(columns="repository")
+        .reset_index(drop=True),
+        expected,
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def test_concurrency_limit(monkeypatch):
+    running, peak = 0, 0
+
+    async def slow_failing_clone(source, destination):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        raise ConnectionError(f"cannot reach {source}")
+
+    monkeypatch.setattr(multi_repo, "_clone", slow_failing_clone)
+    repos = [f"https://example.invalid/repo{i}.git" for i in range(7)]
+
+    results, failures = MultiRepoAnalyzer(repos, concurrency=3).run()
+    assert results.empty
+    assert failures["repository"].tolist() == repos
+    assert peak == 3
+
+
+def test_read_repository_list(tmp_path):
+    path = tmp_path / "repos.txt"
+    path.write_text("# org\n./a\n\n./b  # team b\n./a\n", encoding="utf-8")
+    assert read_repository_list(str(path)) == ["./a", "./b"]
+
+
+def test_cli_analyze_many(repositories, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "repos.txt").write_text("\n".join(repositories), encoding="utf-8")
+
+    result = runner.invoke(
+        app, ["analyze-many", "repos.txt", "-j", "2", "-o", "all.csv"]
+    )
+    assert result.exit_code == 1
+    assert "2 of 3 repositories analysed" in result.stdout
+    assert "missing" in result.stdout
+
+    table = pd.read_csv(tmp_path / "all.csv")
+    assert set(table["repository"]) == {repositories[0], repositories[2]}
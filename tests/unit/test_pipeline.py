@@ -0,0 +1,117 @@
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.miner import GitMiner
+from busfactorpy.core.pipeline import PipelinedAggregator
+from busfactorpy.core.shard import AggregateShard
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def repo(tmp_path, init_repo, commit_all) -> Path:
+    repo = init_repo(tmp_path / "repo")
+    for i in range(10):
+        (repo / "src").mkdir(exist_ok=True)
+        (repo / f"src/f{i % 3}.py").write_text("x = 1\n" * (i + 2), encoding="utf-8")
+        (repo / f"g{i % 2}.py").write_text("y = 2\n" * (i + 1), encoding="utf-8")
+        commit_all(
+            repo,
+            f"c{i}",
+            email=f"dev{i % 4}@test.com",
+            date=f"2024-01-{i + 1:02d}T12:00:00+02:00",
+        )
+    return repo
+
+
+def _sorted(stats: pd.DataFrame) -> pd.DataFrame:
+    return stats.sort_values(["file", "author"]).reset_index(drop=True)
+
+
+def test_pipeline_matches_mining_then_aggregating(repo):
+    commits = GitMiner(str(repo), None).mine_commit_history()
+    expected = AggregateShard.from_commits(commits).stats
+
+    # Tiny batches and a one-slot queue exercise the backpressure path.
+    aggregator = PipelinedAggregator(
+        GitMiner(str(repo), None), batch_rows=3, queue_size=1
+    )
+    shard = aggregator.run()
+
+    assert aggregator.batches > 3
+    pd.testing.assert_frame_equal(_sorted(shard.stats), _sorted(expected))
+    assert sorted(shard.commit_hashes) == sorted(commits["commit_hash"].unique())
+
+
+def test_dates_are_filtered_while_folding(repo):
+    shard = PipelinedAggregator(
+        GitMiner(str(repo), None),
+        batch_rows=4,
+        since=pd.Timestamp("2024-01-03"),
+        until=pd.Timestamp("2024-01-05 23:59"),
+    ).run()
+    assert int(shard.stats["commits"].sum()) == 6  # 3 commits x 2 files
+    assert shard.stats["first_date"].min() == pd.Timestamp("2024-01-03 10:00")
+
+
+class _FailingMiner(GitMiner):
+    def mine_batches(self, batch_rows):
+        yield from super().mine_batches(batch_rows)
+        raise RuntimeError("git went away")
+
+
+def test_producer_errors_reach_the_consumer(repo):
+    with pytest.raises(RuntimeError, match="git went away"):
+        PipelinedAggregator(_FailingMiner(str(repo), None), batch_rows=2).run()
+    assert not [t for t in threading.enumerate() if t.name == "busfactorpy-miner"]
+
+
+def test_consumer_errors_stop_the_producer(repo, monkeypatch):
+    def fail(self, batch):
+        raise ValueError("bad batch")
+
+    monkeypatch.setattr(PipelinedAggregator, "_fold", fail)
+    with pytest.raises(ValueError, match="bad batch"):
+        PipelinedAggregator(GitMiner(str(repo), None), batch_rows=1, queue_size=1).run()
+    assert not [t for t in threading.enumerate() if t.name == "busfactorpy-miner"]
+
+
+def test_analyze_pipeline_matches_default(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    outputs = {}
+    for name, extra in (("default", []), ("pipeline", ["--pipeline"])):
+        result = runner.invoke(
+            app,
+            [
+                "analyze",
+                str(repo),
+                "-m",
+                "hhi",
+                "-f",
+                "csv",
+                "-o",
+                f"{name}.csv",
+                "--no-charts",
+                "--since",
+                "2024-01-02",
+                *extra,
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        outputs[name] = pd.read_csv(tmp_path / f"{name}.csv").sort_values("file")
+
+    pd.testing.assert_frame_equal(
+        outputs["pipeline"].reset_index(drop=True),
+        outputs["default"].reset_index(drop=True),
+    )
+
+
+def test_pipeline_rejects_trend():
+    result = runner.invoke(app, ["analyze", ".", "--pipeline", "--trend"])
+    assert result.exit_code == 1
+    assert "--pipeline" in result.output
@@ -0,0 +1,140 @@
+import json
+import pstats
+import threading
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core import profiling
+from busfactorpy.core.profiling import StageProfiler, stage, timed_call, timed_iter
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def profiler():
+    profiler = StageProfiler(trace_memory=True).start()
+    yield profiler
+    profiler.stop()
+
+
+def test_stages_are_noops_without_profiler():
+    assert profiling.active() is None
+    with stage("anything") as run:
+        run.rows = 10
+        run.calls = 0
+    # The shared no-op handle keeps no state another thread could observe.
+    with stage("other") as run:
+        assert (run.rows, run.calls) == (0, 1)
+
+    def fn(x):
+        return x
+
+    assert timed_call("call", fn) is fn
+
+
+def test_nested_stages_record_parent_calls_rows_and_memory(profiler):
+    for _ in range(2):
+        with stage("outer", rows=5):
+            with stage("inner") as run:
+                data = np.ones(2_000_000)  # ~16 MB
+                run.rows = len(data)
+                del data
+    profiler.stop()
+
+    outer, inner = profiler.records["outer"], profiler.records["inner"]
+    assert (outer.parent, inner.parent) == (None, "outer")
+    assert (outer.calls, outer.rows) == (2, 10)
+    assert (inner.calls, inner.rows) == (2, 4_000_000)
+    assert outer.wall_seconds >= inner.wall_seconds
+    # The child's allocation also counts towards the enclosing stage's peak.
+    assert inner.peak_traced_bytes >= 16_000_000
+    assert outer.peak_traced_bytes >= inner.peak_traced_bytes
+    assert outer.peak_rss_bytes is None or outer.peak_rss_bytes > 0
+
+
+def test_timed_iter_and_timed_call(profiler):
+    batches = list(timed_iter("batches", ([1, 2, 3], [4, 5])))
+    assert batches == [[1, 2, 3], [4, 5]]
+    assert (profiler.records["batches"].calls, profiler.records["batches"].rows) == (
+        2,
+        5,
+    )
+
+    double = timed_call("double", lambda x: 2 * x)
+    assert [double(i) for i in range(4)] == [0, 2, 4, 6]
+    assert profiler.records["double"].calls == 4
+
+
+def test_stages_nest_per_thread(profiler):
+    def produce():
+        with stage("producer"):
+            pass
+
+    with stage("consumer"):
+        worker = threading.Thread(target=produce)
+        worker.start()
+        worker.join()
+    assert profiler.records["producer"].parent is None
+    assert profiler.records["consumer"].calls == 1
+
+
+def test_cprofile_dump_for_one_stage(tmp_path):
+    profiler = StageProfiler(cprofile_stage="hot").start()
+    with stage("hot"):
+        sorted(range(10_000), key=lambda x: -x)
+    with stage("cold"):
+        pass
+    profiler.stop()
+
+    dump = profiler.save(str(tmp_path / "profile.json"))
+    assert dump == str(tmp_path / "profile.prof")
+    assert pstats.Stats(dump).total_calls > 0
+    report = json.loads((tmp_path / "profile.json").read_text())
+    assert [s["name"] for s in report["stages"]] == ["hot", "cold"]
+
+
+def test_analyze_profile_report(tmp_path, monkeypatch, init_repo, commit_all):
+    repo = init_repo(tmp_path / "repo")
+    for i in range(4):
+        (repo / f"f{i % 2}.py").write_text("x = 1\n" * (i + 1), encoding="utf-8")
+        commit_all(repo, f"c{i}", email=f"dev{i % 2}@test.com")
+    monkeypatch.chdir(tmp_path)
+
+    result = runner.invoke(
+        app,
+        [
+            "analyze",
+            str(repo),
+            "-f",
+            "csv",
+            "-o",
+            "out.csv",
+            "--no-charts",
+            "--profile",
+            "profile.json",
+            "--profile-stage",
+            "calculate.metric",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Profile saved to" in result.output
+
+    report = json.loads((tmp_path / "profile.json").read_text())
+    stages = {s["name"]: s for s in report["stages"]}
+    assert {"mine.traverse", "mine.ignore", "calculate.metric", "report.export"} <= set(
+        stages
+    )
+    assert stages["mine.traverse"]["calls"] == 1
+    assert stages["mine.traverse"]["rows"] == 4
+    assert stages["mine.ignore"]["parent"] == "mine.traverse"
+    assert (tmp_path / "profile.prof").exists()
+    assert profiling.active() is None
+
+
+def test_profile_options_need_profile():
+    result = runner.invoke(app, ["analyze", ".", "--profile-memory"])
+    assert result.exit_code == 1
+    assert "need --profile" in result.output
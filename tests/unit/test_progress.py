@@ -0,0 +1,115 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from rich.console import Console
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.ignore import BusFactorIgnore
+from busfactorpy.core.miner import GitMiner
+from busfactorpy.core.progress import MiningProgress, ProgressLog, count_commits
+from busfactorpy.output.progress import MiningProgressDisplay
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def repo(tmp_path: Path, init_repo, commit_all) -> Path:
+    repo = init_repo(tmp_path / "repo")
+    for i in range(5):
+        (repo / f"src{i}.py").write_text("x = 1\n" * (i + 1), encoding="utf-8")
+        (repo / f"notes{i}.md").write_text("note\n", encoding="utf-8")
+        commit_all(repo, f"c{i}")
+    return repo
+
+
+def test_rates_and_eta():
+    progress = MiningProgress(commits=50, total_commits=200, modifications=150)
+    progress.elapsed_seconds = 10.0
+    assert progress.commits_per_second == 5.0
+    assert progress.modifications_per_second == 15.0
+    assert progress.eta_seconds == 30.0
+
+    # Commits restored from a checkpoint count as walked, not as mined.
+    resumed = MiningProgress(commits=150, resumed_commits=100, total_commits=200)
+    resumed.elapsed_seconds = 10.0
+    assert resumed.commits_per_second == 5.0
+    assert resumed.eta_seconds == 10.0
+
+    assert MiningProgress().eta_seconds is None
+    progress.done = True
+    assert progress.to_dict()["eta_seconds"] == 0.0
+
+
+def test_miner_reports_counters(repo, tmp_path):
+    ignore_file = tmp_path / ".busfactorignore"
+    ignore_file.write_text("*.md\n", encoding="utf-8")
+    snapshots = []
+
+    miner = GitMiner(
+        str(repo),
+        BusFactorIgnore(str(ignore_file)),
+        on_progress=lambda p: snapshots.append(p.to_dict()),
+        progress_interval=0.0,
+    )
+    df = miner.mine_commit_history()
+
+    assert count_commits(str(repo)) == 5
+    # One snapshot per commit (interval 0) plus the final one.
+    assert len(snapshots) == 6
+    assert [s["commits"] for s in snapshots[:5]] == [1, 2, 3, 4, 5]
+    final = snapshots[-1]
+    assert final["done"] and final["eta_seconds"] == 0.0
+    assert final["total_commits"] == 5
+    assert (final["modifications"], final["rows_kept"], final["rows_ignored"]) == (
+        10,
+        len(df),
+        5,
+    )
+
+
+def test_callback_is_throttled(repo):
+    calls = []
+    GitMiner(
+        str(repo), None, on_progress=calls.append, progress_interval=3600
+    ).mine_commit_history()
+    # Only the final snapshot: no commit came an hour after the start.
+    assert len(calls) == 1 and calls[0].done
+
+
+def test_display_writes_json_log():
+    log = io.StringIO()
+    console = Console(file=io.StringIO(), force_terminal=True)
+    with MiningProgressDisplay(console, log) as display:
+        display(MiningProgress(commits=3, total_commits=4, done=True))
+    record = json.loads(log.getvalue())
+    assert record["commits"] == 3 and record["done"]
+    assert "timestamp" in record
+
+    ProgressLog(log)(MiningProgress())
+    assert len(log.getvalue().splitlines()) == 2
+
+
+def test_analyze_progress_log(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(
+        app,
+        [
+            "analyze",
+            str(repo),
+            "-f",
+            "csv",
+            "-o",
+            "out.csv",
+            "--no-charts",
+            "--progress-log",
+            "progress.ndjson",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    lines = (tmp_path / "progress.ndjson").read_text().splitlines()
+    final = json.loads(lines[-1])
+    assert final["done"] and final["commits"] == 5
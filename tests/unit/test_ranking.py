@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from busfactorpy.core.ranking import select_top_risks
+
+
+def _full_sort(results_df, n_top):
+    risky = results_df[results_df["risk_class"].isin(["Critical", "High", "Medium"])]
+    return risky.sort_values(
+        by=["main_author_share", "total_file_churn"],
+        ascending=[False, False],
+        kind="stable",
+    ).head(n_top)
+
+
+@pytest.fixture
+def results_df():
+    rng = np.random.default_rng(42)
+    n = 500
+    return pd.DataFrame(
+        {
+            "file": [f"src/f{i}.py" for i in range(n)],
+            # Few distinct values so that ties on both keys are common.
+            "main_author_share": rng.choice([1.0, 0.9, 0.75, 0.5], size=n),
+            "total_file_churn": rng.choice([10.0, 20.0, np.nan], size=n),
+            "risk_class": rng.choice(["Critical", "High", "Medium", "Low"], size=n),
+        }
+    )
+
+
+@pytest.mark.parametrize("n_top", [1, 5, 10, 37, 400, 1000])
+def test_select_top_risks_matches_full_sort(results_df, n_top):
+    expected = _full_sort(results_df, n_top)
+    selected = select_top_risks(results_df, n_top)
+
+    assert selected.index.tolist() == expected.index.tolist()
+
+
+def test_select_top_risks_without_churn_column():
+    df = pd.DataFrame(
+        {
+            "file": ["a.py", "b.py", "c.py"],
+            "main_author_share": [0.7, 0.95, 0.2],
+            "risk_class": ["Medium", "High", "Low"],
+        }
+    )
+
+    assert select_top_risks(df, 5)["file"].tolist() == ["b.py", "a.py"]
+
+
+def test_select_top_risks_over_every_class(results_df):
+    expected = results_df.sort_values(
+        by=["main_author_share", "total_file_churn"],
+        ascending=[False, False],
+        kind="stable",
+    ).head(25)
+    selected = select_top_risks(results_df, 25, classes=None)
+
+    assert selected.index.tolist() == expected.index.tolist()
+
+
+def test_select_top_risks_no_risky_rows():
+    df = pd.DataFrame(
+        {
+            "file": ["a.py"],
+            "main_author_share": [0.1],
+            "total_file_churn": [3],
+            "risk_class": ["Low"],
+        }
+    )
+
+    assert select_top_risks(df, 10).empty
@@ -0,0 +1,116 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.ignore import BusFactorIgnore
+from busfactorpy.core.miner import GitMiner
+from busfactorpy.core.refs import MultiRefAnalyzer, resolve_refs
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def write_lines(commit_all):
+    """Rewrites path with the given number of lines and commits it as email."""
+
+    def write(repo: Path, path: str, lines: int, email: str):
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_text("x = 1\n" * lines, encoding="utf-8")
+        commit_all(repo, f"{path} {lines}", email=email)
+
+    return write
+
+
+@pytest.fixture
+def repo(tmp_path: Path, init_repo, write_lines, git) -> Path:
+    """
+    main:       c1 - c2 - c3
+    release/1:        \\- r1 - r2
+    release/2:   (c1) \\- s1
+    """
+    repo = init_repo(tmp_path / "repo", "-b", "main")
+    write_lines(repo, "src/a.py", 3, "alice@test.com")
+    write_lines(repo, "src/b.py", 2, "bob@test.com")
+    git(["branch", "release/1"], repo)
+    write_lines(repo, "src/a.py", 6, "bob@test.com")
+
+    git(["checkout", "-q", "release/1"], repo)
+    write_lines(repo, "src/b.py", 9, "carol@test.com")
+    write_lines(repo, "docs/c.md", 1, "carol@test.com")
+
+    git(["checkout", "-q", "-b", "release/2", "main~2"], repo)
+    write_lines(repo, "src/a.py", 1, "dave@test.com")
+
+    git(["checkout", "-q", "main"], repo)
+    return repo
+
+
+def test_resolve_refs_expands_patterns(repo):
+    assert resolve_refs(str(repo), ["main", "release/*"]) == [
+        "main",
+        "release/1",
+        "release/2",
+    ]
+    with pytest.raises(ValueError, match="No ref matches"):
+        resolve_refs(str(repo), ["nope/*"])
+
+
+def test_shared_history_is_mined_once(repo, git):
+    analyzer = MultiRefAnalyzer(str(repo), ["main", "release/*"], metric="hhi")
+    analyzer.run()
+
+    all_commits = git(["rev-list", "--all"], repo).split()
+    assert sorted(analyzer.miner.mined_commits) == sorted(all_commits)
+    assert analyzer.commit_data["commit_hash"].nunique() == len(all_commits)
+    # One row per modified file and commit: nothing was mined twice.
+    assert not analyzer.commit_data.duplicated(["file", "commit_hash"]).any()
+    assert {ref: len(c) for ref, c in analyzer.ref_commits.items()} == {
+        "main": 3,
+        "release/1": 4,
+        "release/2": 2,
+    }
+
+
+def test_per_ref_results_match_single_branch_runs(repo, git):
+    analyzer = MultiRefAnalyzer(str(repo), ["main", "release/*"], metric="churn")
+    table = analyzer.run()
+    assert list(table.columns[:2]) == ["ref", "file"]
+    assert table["ref"].unique().tolist() == ["main", "release/1", "release/2"]
+
+    for ref in ["main", "release/1", "release/2"]:
+        git(["checkout", "-q", ref], repo)
+        commit_data = GitMiner(str(repo), BusFactorIgnore()).mine_commit_history()
+        expected = BusFactorCalculator(commit_data, metric="churn").calculate()
+        pd.testing.assert_frame_equal(
+            table[table["ref"] == ref].drop(columns="ref").reset_index(drop=True),
+            expected,
+            check_dtype=False,
+            check_categorical=False,
+        )
+
+
+def test_refs_and_commit_range_are_exclusive(repo):
+    with pytest.raises(ValueError):
+        GitMiner(str(repo), None, commit_range="main", refs=["main"])
+
+
+def test_branches_cli(repo, tmp_path):
+    out = tmp_path / "branches.csv"
+    result = runner.invoke(
+        app,
+        ["branches", str(repo), "--ref", "main", "--ref", "release/*", "-o", str(out)],
+    )
+    assert result.exit_code == 0, result.output
+    assert "release/2" in result.output
+    assert "6 distinct commits mined" in result.output
+
+    exported = pd.read_csv(out)
+    assert exported["ref"].unique().tolist() == ["main", "release/1", "release/2"]
+
+    result = runner.invoke(app, ["branches", str(repo), "--ref", "missing"])
+    assert result.exit_code == 1
+    assert "No ref matches" in result.output
@@ -0,0 +1,90 @@
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from busfactorpy.output.reporter import ConsoleReporter
+
+
+@pytest.fixture
+def results_df():
+    return pd.DataFrame(
+        [
+            {
+                "file": f"src/f{i}.py",
+                "n_authors": 1 + i % 3,
+                "main_author_share": 1.0 - i / 10,
+                "risk_class": "Critical" if i % 3 == 0 else "Low",
+                "main_author": f"dev{i}@test.com",
+            }
+            for i in range(7)
+        ]
+    )
+
+
+def test_export_csv_chunked_matches_full_frame(results_df, tmp_path):
+    path = tmp_path / "report.csv"
+    ConsoleReporter(results_df).export_report("csv", path=str(path), chunksize=3)
+
+    exported = pd.read_csv(path)
+    pd.testing.assert_frame_equal(exported, results_df)
+
+
+def test_export_ndjson_writes_one_record_per_line(results_df, tmp_path):
+    path = tmp_path / "report.ndjson"
+    ConsoleReporter(results_df).export_report("ndjson", path=str(path), chunksize=2)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == len(results_df)
+    assert json.loads(lines[0])["file"] == "src/f0.py"
+    assert json.loads(lines[-1])["file"] == "src/f6.py"
+
+
+def test_export_gzip_compression(results_df, tmp_path):
+    path = tmp_path / "report.csv.gz"
+    ConsoleReporter(results_df).export_report("csv", path=str(path), compression="gzip")
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        exported = pd.read_csv(f)
+    pd.testing.assert_frame_equal(exported, results_df)
+
+
+def test_export_zstd_compression(results_df, tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "report.ndjson.zst"
+    ConsoleReporter(results_df).export_report(
+        "ndjson", path=str(path), compression="zstd"
+    )
+
+    raw = zstandard.ZstdDecompressor().stream_reader(path.read_bytes()).read()
+    assert len(raw.decode("utf-8").splitlines()) == len(results_df)
+
+
+def test_export_parquet(results_df, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "report.parquet"
+    ConsoleReporter(results_df).export_report("parquet", path=str(path))
+
+    pd.testing.assert_frame_equal(pd.read_parquet(path), results_df)
+
+
+def test_export_default_path_uses_compression_suffix(results_df, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ConsoleReporter(results_df).export_report("json", compression="gzip")
+
+    path = tmp_path / "reports" / "busfactorpy_report.json.gz"
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert len(json.load(f)) == len(results_df)
+
+
+def test_export_to_stdout(results_df, capsysbinary):
+    ConsoleReporter(results_df).export_report("ndjson", path="-")
+
+    out = capsysbinary.readouterr().out.decode("utf-8")
+    assert len(out.splitlines()) == len(results_df)
+
+
+def test_export_invalid_format_raises(results_df):
+    with pytest.raises(ValueError, match="Invalid format"):
+        ConsoleReporter(results_df).export_report("xml")
@@ -0,0 +1,142 @@
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.scope import (
+    ScopeResolver,
+    calculate_scopes,
+    calculate_scopes_from_stats,
+    load_scopes,
+)
+
+runner = CliRunner()
+
+PATHS = sorted(
+    [
+        "README.md",
+        "services/api/app.py",
+        "services/api/db/models.py",
+        "services/api-gateway/main.py",
+        "services/api.py",
+        "services/billing/ledger.py",
+        "src/utils",
+        "src/utils/b.py",
+    ]
+)
+
+
+def test_resolver_matches_prefixes_and_exact_paths():
+    resolved = ScopeResolver(["services/api", "src/utils", "nope"]).resolve(PATHS)
+
+    assert [PATHS[i] for i in resolved["services/api"]] == [
+        "services/api/app.py",
+        "services/api/db/models.py",
+    ]
+    assert [PATHS[i] for i in resolved["src/utils"]] == ["src/utils", "src/utils/b.py"]
+    assert len(resolved["nope"]) == 0
+
+
+def test_load_scopes_from_options_and_file(tmp_path):
+    scope_file = tmp_path / "scopes.txt"
+    scope_file.write_text(
+        "# services\nservices/api/\nservices\\billing  # ledger team\n\nsrc\n",
+        encoding="utf-8",
+    )
+
+    scopes = load_scopes(["src/", "docs"], str(scope_file))
+    assert scopes == ["src", "docs", "services/api", "services/billing"]
+
+
+@pytest.fixture
+def commit_data():
+    rows = []
+    for i, path in enumerate(PATHS * 3):
+        rows.append(
+            {
+                "file": path,
+                "author": f"dev{i % 4}@test.com",
+                "lines_added": 5 + i,
+                "lines_deleted": i % 3,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("group_by,depth", [("file", 1), ("directory", 2)])
+def test_calculate_scopes_matches_separate_runs(commit_data, group_by, depth):
+    scopes = ["services", "services/api", "src/utils", "missing"]
+    results = calculate_scopes(
+        commit_data, scopes, metric="hhi", group_by=group_by, depth=depth
+    )
+
+    assert list(results) == scopes
+    for scope in scopes:
+        scoped = ScopeResolver([scope]).filter(commit_data)
+        expected = BusFactorCalculator(
+            scoped, metric="hhi", group_by=group_by, depth=depth
+        ).calculate()
+        pd.testing.assert_frame_equal(
+            results[scope].reset_index(drop=True),
+            expected.reset_index(drop=True),
+            check_dtype=False,
+        )
+
+
+def test_calculate_scopes_from_unsorted_stats(commit_data):
+    stats = BusFactorCalculator(commit_data).aggregate_author_stats()
+    shuffled = stats.sample(frac=1, random_state=3).reset_index(drop=True)
+    scopes = ["services/api", "src/utils"]
+
+    expected = calculate_scopes_from_stats(stats, scopes)
+    results = calculate_scopes_from_stats(shuffled, scopes)
+    for scope in scopes:
+        pd.testing.assert_frame_equal(
+            results[scope].reset_index(drop=True),
+            expected[scope].reset_index(drop=True),
+        )
+
+
+def test_cli_multiple_scopes(commit_data, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    mined_scopes = []
+
+    from busfactorpy.core import miner as miner_mod
+
+    def fake_mine(self):
+        mined_scopes.append(self.scopes)
+        return ScopeResolver(self.scopes).filter(commit_data)
+
+    monkeypatch.setattr(miner_mod.GitMiner, "mine_commit_history", fake_mine)
+
+    result = runner.invoke(
+        app,
+        [
+            "analyze",
+            ".",
+            "--no-charts",
+            "--scope",
+            "services/api",
+            "--scope",
+            "src/utils",
+            "-f",
+            "csv",
+            "-o",
+            "report.csv",
+        ],
+    )
+    assert result.exit_code == 0, result.stdout
+    assert mined_scopes == [["services/api", "src/utils"]]
+
+    report = pd.read_csv(tmp_path / "report.csv")
+    assert report.columns[0] == "scope"
+    assert set(report["scope"]) == {"services/api", "src/utils"}
+
+
+def test_cli_trend_rejects_multiple_scopes():
+    result = runner.invoke(
+        app, ["analyze", ".", "--trend", "--scope", "a", "--scope", "b"]
+    )
+    assert result.exit_code != 0
+    assert "single scope" in result.stdout
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.session import AnalysisSession
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def commit_data():
+    rng = np.random.default_rng(7)
+    n = 400
+    files = [f"src/mod{i % 4}/pkg{i % 3}/f{i % 25}.py" for i in range(50)] + [
+        "setup.py"
+    ]
+    return pd.DataFrame(
+        {
+            "file": rng.choice(files, n),
+            "author": rng.choice([f"dev{i}@test.com" for i in range(5)], n),
+            "date": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+            "lines_added": rng.integers(0, 80, n),
+            "lines_deleted": rng.integers(0, 30, n),
+        }
+    )
+
+
+def _assert_same(a: pd.DataFrame, b: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False
+    )
+
+
+@pytest.mark.parametrize(
+    "metric", ["churn", "entropy", "hhi", "ownership", "commit-number"]
+)
+@pytest.mark.parametrize(
+    "group_by,depth", [("file", 1), ("directory", 1), ("directory", 2)]
+)
+def test_query_matches_calculator(commit_data, metric, group_by, depth):
+    session = AnalysisSession(commit_data)
+    expected = BusFactorCalculator(
+        commit_data, metric=metric, group_by=group_by, depth=depth
+    ).calculate()
+
+    _assert_same(session.query(metric=metric, group_by=group_by, depth=depth), expected)
+
+
+def test_query_scope_and_dates(commit_data):
+    session = AnalysisSession(commit_data)
+    subset = commit_data[
+        commit_data["file"].str.startswith("src/mod1/")
+        & (commit_data["date"] >= "2024-03-01")
+        & (commit_data["date"] <= "2024-09-01")
+    ]
+    expected = BusFactorCalculator(subset, metric="hhi", threshold=0.5).calculate()
+
+    result = session.query(
+        metric="hhi",
+        threshold=0.5,
+        scope="src\\mod1/",
+        since="2024-03-01",
+        until="2024-09-01",
+    )
+    _assert_same(result, expected)
+
+
+def test_aggregates_are_memoized(commit_data):
+    session = AnalysisSession(commit_data)
+    session.query(metric="churn", threshold=0.8)
+    session.query(metric="churn", threshold=0.5)
+    session.query(metric="hhi")
+
+    info = session.cache_info()
+    assert info["aggregate"].misses == 1
+    assert info["metric"].misses == 2
+    assert info["metric"].hits == 1
+
+
+def test_query_out_of_scope_is_empty(commit_data):
+    result = AnalysisSession(commit_data).query(scope="does/not/exist")
+    assert result.empty
+    assert "risk_class" in result.columns
+
+
+def test_save_and_load(commit_data, tmp_path):
+    path = tmp_path / "session"
+    AnalysisSession(commit_data).save(str(path))
+    assert not list(path.glob("*.pkl"))
+
+    loaded = AnalysisSession.load(str(path))
+    _assert_same(
+        loaded.query(group_by="directory"),
+        AnalysisSession(commit_data).query(group_by="directory"),
+    )
+    _assert_same(
+        loaded.query(since="2024-02-01", scope="src"),
+        AnalysisSession(commit_data).query(since="2024-02-01", scope="src"),
+    )
+
+    with pytest.raises(ValueError, match="is not a busfactorpy-session"):
+        AnalysisSession.load(str(tmp_path))
+
+
+def test_cli_batch_mines_once(commit_data, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    from busfactorpy.core import miner as miner_mod
+
+    def fake_mine(self):
+        calls.append(self.repo_path)
+        return commit_data
+
+    monkeypatch.setattr(miner_mod.GitMiner, "mine_commit_history", fake_mine)
+
+    config = tmp_path / "queries.yaml"
+    config.write_text(
+        """
+repository: .
+session: history.session
+output_dir: out
+queries:
+  - name: files
+    metric: churn
+  - name: dirs
+    metric: hhi
+    group_by: directory
+    depth: 2
+    format: csv
+  - name: recent
+    scope: src/mod1
+    since: 2024-06-01
+    format: json
+""",
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(app, ["batch", str(config)])
+    assert result.exit_code == 0, result.stdout
+    assert calls == ["."]
+    assert (tmp_path / "out" / "dirs.csv").exists()
+    assert (tmp_path / "out" / "recent.json").exists()
+
+    # The second run reads the saved session instead of mining again.
+    result = runner.invoke(app, ["batch", str(config)])
+    assert result.exit_code == 0, result.stdout
+    assert "Loading session" in result.stdout
+    assert calls == ["."]
+
+
+def test_cli_batch_reports_invalid_query(commit_data, monkeypatch, tmp_path):
+    from busfactorpy.core import miner as miner_mod
+
+    monkeypatch.setattr(
+        miner_mod.GitMiner, "mine_commit_history", lambda self: commit_data
+    )
+    config = tmp_path / "queries.json"
+    config.write_text(
+        '{"queries": [{"metric": "magic"}, {"colour": "blue"}, "hhi", '
+        '{"metric": "hhi", "top_n": "many"}, {"metric": "hhi"}]}',
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(app, ["batch", str(config)])
+    assert result.exit_code == 1
+    assert "Invalid metric" in result.stdout
+    assert "Unknown query keys" in result.stdout
+    assert "expected a mapping of query keys, got str" in result.stdout
+    assert "4 of 5 queries failed" in result.stdout
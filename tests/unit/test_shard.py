@@ -0,0 +1,143 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+import busfactorpy
+from busfactorpy.cli import app
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.ignore import BusFactorIgnore
+from busfactorpy.core.miner import GitMiner
+from busfactorpy.core.shard import AggregateShard
+
+runner = CliRunner()
+
+AUTHORS = ["a@test.com", "b@test.com", "c@test.com"]
+
+
+@pytest.fixture
+def git_repo(tmp_path: Path, init_repo, commit_all) -> Path:
+    repo = init_repo(tmp_path / "repo")
+    for i in range(12):
+        path = repo / f"src/mod{i % 2}/f{i % 4}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("x = 1\n" * (i + 1))
+        commit_all(repo, f"commit {i}", email=AUTHORS[i % 3 if i % 4 else 0])
+    return repo
+
+
+@pytest.fixture
+def shard_ranges(git_repo, git) -> list[str]:
+    commits = git(["rev-list", "--reverse", "HEAD"], git_repo).split()
+    return [commits[3], f"{commits[3]}..{commits[7]}", f"{commits[7]}..HEAD"]
+
+
+def _assert_same(a: pd.DataFrame, b: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False
+    )
+
+
+def _mine_shard(repo: Path, commit_range: str) -> AggregateShard:
+    miner = GitMiner(str(repo), BusFactorIgnore(), commit_range=commit_range)
+    return AggregateShard.from_commits(
+        miner.mine_commit_history(), miner.mined_commits, commit_range
+    )
+
+
+def test_shards_mined_in_parallel_processes_match_full_run(
+    git_repo, shard_ranges, git, tmp_path, monkeypatch
+):
+    # Each process stands in for one mining node.
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(Path(busfactorpy.__file__).resolve().parents[1]),
+    }
+    outputs = [tmp_path / f"shard{i}" for i in range(3)]
+    clones = [tmp_path / f"node{i}" for i in range(3)]
+    for clone in clones:
+        git(["clone", "-q", str(git_repo), str(clone)], tmp_path)
+
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "busfactorpy.cli",
+                "mine-shard",
+                str(clone),
+                str(out),
+                "--range",
+                commit_range,
+            ],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        for clone, out, commit_range in zip(clones, outputs, shard_ranges)
+    ]
+    for process in processes:
+        stdout, stderr = process.communicate(timeout=120)
+        assert process.returncode == 0, stdout + stderr
+
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(
+        app, ["merge", *(str(out) for out in outputs), "-o", "merged"]
+    )
+    assert result.exit_code == 0, result.stdout
+
+    result = runner.invoke(
+        app,
+        [
+            "analyze",
+            "merged",
+            "-m",
+            "hhi",
+            "-f",
+            "csv",
+            "-o",
+            "out.csv",
+            "--no-charts",
+        ],
+    )
+    assert result.exit_code == 0, result.stdout
+
+    full = GitMiner(str(git_repo), BusFactorIgnore()).mine_commit_history()
+    expected = BusFactorCalculator(full, metric="hhi").calculate()
+    expected.to_csv(tmp_path / "expected.csv", index=False)
+    _assert_same(
+        pd.read_csv(tmp_path / "out.csv"), pd.read_csv(tmp_path / "expected.csv")
+    )
+
+
+def test_merge_is_associative(git_repo, shard_ranges, tmp_path):
+    a, b, c = (_mine_shard(git_repo, r) for r in shard_ranges)
+
+    left = AggregateShard.merge([AggregateShard.merge([a, b]), c])
+    right = AggregateShard.merge([a, AggregateShard.merge([c, b])])
+    _assert_same(left.stats, right.stats)
+    assert sorted(left.commit_hashes) == sorted(right.commit_hashes)
+
+    # Round trip through disk keeps the aggregate.
+    left.save(str(tmp_path / "left"))
+    _assert_same(AggregateShard.load(str(tmp_path / "left")).stats, left.stats)
+
+
+def test_merge_rejects_overlapping_shards(git_repo, shard_ranges):
+    a, b, _ = (_mine_shard(git_repo, r) for r in shard_ranges)
+    with pytest.raises(ValueError, match="overlap"):
+        AggregateShard.merge([AggregateShard.merge([a, b]), b])
+
+
+def test_analyze_shard_rejects_date_filters(git_repo, tmp_path):
+    _mine_shard(git_repo, "HEAD").save(str(tmp_path / "shard"))
+    result = runner.invoke(
+        app, ["analyze", str(tmp_path / "shard"), "--since", "2024-01-01"]
+    )
+    assert result.exit_code == 1
+    assert "need a cube" in result.stdout
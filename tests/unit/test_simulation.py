@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.core.calculator import BusFactorCalculator
+from busfactorpy.core.simulation import AuthorRemovalSimulator
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def commit_data():
+    rng = np.random.default_rng(3)
+    n = 300
+    files = [f"src/mod{i % 3}/f{i}.py" for i in range(30)]
+    df = pd.DataFrame(
+        {
+            "file": rng.choice(files, n),
+            "author": rng.choice([f"dev{i}@test.com" for i in range(6)], n),
+            "lines_added": rng.integers(1, 50, n),
+            "lines_deleted": rng.integers(0, 10, n),
+        }
+    )
+    # A file only dev0 ever touched.
+    solo = pd.DataFrame(
+        {
+            "file": ["src/solo.py"],
+            "author": ["dev0@test.com"],
+            "lines_added": [10],
+            "lines_deleted": [0],
+        }
+    )
+    return pd.concat([df, solo], ignore_index=True)
+
+
+def _simulator(commit_data, **params):
+    stats = BusFactorCalculator(commit_data).aggregate_author_stats()
+    return AuthorRemovalSimulator(stats, **params)
+
+
+@pytest.mark.parametrize("metric", ["churn", "hhi", "commit-number"])
+@pytest.mark.parametrize("group_by,depth", [("file", 1), ("directory", 2)])
+def test_simulation_matches_recomputation(commit_data, metric, group_by, depth):
+    removed = ["dev0@test.com", "dev3@test.com"]
+    params = {"metric": metric, "group_by": group_by, "depth": depth}
+    comparison = _simulator(commit_data, **params).simulate(removed)
+
+    remaining = commit_data[~commit_data["author"].isin(removed)]
+    expected = BusFactorCalculator(remaining, **params).calculate().set_index("file")
+    before = BusFactorCalculator(commit_data, **params).calculate().set_index("file")
+
+    touched = commit_data[commit_data["author"].isin(removed)]
+    if group_by == "directory":
+        touched = BusFactorCalculator(touched, **params).data
+    assert sorted(comparison["file"]) == sorted(touched["file"].unique())
+
+    for row in comparison.itertuples():
+        assert row.risk_class_before == before.loc[row.file, "risk_class"]
+        if row.risk_class_after == "Orphaned":
+            assert row.file not in expected.index
+            assert row.n_authors_after == 0
+        else:
+            assert row.risk_class_after == expected.loc[row.file, "risk_class"]
+            assert row.n_authors_after == expected.loc[row.file, "n_authors"]
+            assert row.main_author_share_after == pytest.approx(
+                expected.loc[row.file, "main_author_share"]
+            )
+
+
+def test_orphaned_files(commit_data):
+    comparison = _simulator(commit_data).simulate(["dev0@test.com"])
+    solo = comparison.set_index("file").loc["src/solo.py"]
+    assert solo["risk_class_before"] == "Critical"
+    assert solo["risk_class_after"] == "Orphaned"
+
+
+def test_unknown_author(commit_data):
+    with pytest.raises(ValueError, match="nobody@test.com"):
+        _simulator(commit_data).simulate(["nobody@test.com"])
+
+
+def test_cli_simulate(commit_data, monkeypatch, tmp_path):
+    from busfactorpy.core import miner as miner_mod
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        miner_mod.GitMiner, "mine_commit_history", lambda self: commit_data
+    )
+
+    result = runner.invoke(
+        app, ["simulate", ".", "--remove-author", "dev0@test.com", "-n", "5"]
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "Scenario:" in result.stdout
+    assert "Orphaned" in result.stdout
+
+    scenarios = tmp_path / "scenarios.txt"
+    scenarios.write_text(
+        "# who leaves\ndev1@test.com, dev2@test.com\ndev4@test.com\n",
+        encoding="utf-8",
+    )
+    result = runner.invoke(
+        app,
+        [
+            "simulate",
+            ".",
+            "--scenario-file",
+            str(scenarios),
+            "-f",
+            "csv",
+            "-o",
+            "s.csv",
+        ],
+    )
+    assert result.exit_code == 0, result.stdout
+    report = pd.read_csv(tmp_path / "s.csv")
+    assert set(report["scenario"]) == {"dev1@test.com, dev2@test.com", "dev4@test.com"}
+
+    result = runner.invoke(app, ["simulate", ".", "--remove-author", "x@y"])
+    assert result.exit_code == 1
+    assert "Unknown authors" in result.stdout
@@ -0,0 +1,172 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from busfactorpy.cli import app
+from busfactorpy.output.store import SQLiteResultStore
+
+runner = CliRunner()
+
+
+def _results(ledger_risk: str, ledger_share: float) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "file": "src/billing/ledger.py",
+                "n_authors": 1 if ledger_risk == "Critical" else 2,
+                "total_file_churn": 120,
+                "main_author": "a@test.com",
+                "main_author_churn": 100,
+                "main_author_share": ledger_share,
+                "risk_class": ledger_risk,
+            },
+            {
+                "file": "src/app.py",
+                "n_authors": 3,
+                "total_file_churn": 50,
+                "main_author": "b@test.com",
+                "main_author_churn": 20,
+                "main_author_share": 0.4,
+                "risk_class": "Low",
+            },
+        ]
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    with SQLiteResultStore(str(tmp_path / "history.db")) as result_store:
+        for day, (risk, share) in enumerate(
+            [("Low", 0.5), ("Critical", 1.0), ("Critical", 1.0)], start=1
+        ):
+            result_store.append_run(
+                _results(risk, share),
+                repository="repo",
+                metric="churn",
+                created_at=datetime(2024, 1, day, tzinfo=timezone.utc),
+            )
+        yield result_store
+
+
+def test_schema_has_indexes(store):
+    indexes = {
+        row[0]
+        for row in store.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )
+    }
+    assert {"idx_results_file_run", "idx_results_risk_run"} <= indexes
+
+
+def test_files_and_authors_are_normalized(store):
+    assert store.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 2
+    assert store.conn.execute("SELECT COUNT(*) FROM authors").fetchone()[0] == 2
+    assert store.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 6
+
+
+def test_file_history_and_became(store):
+    history = store.file_history("src/billing/ledger.py")
+    assert history["risk_class"].tolist() == ["Low", "Critical", "Critical"]
+    assert history["main_author"].tolist() == ["a@test.com"] * 3
+
+    since = store.became("src/billing/ledger.py", "Critical")
+    assert since["run_id"] == 2
+    assert since["created_at"].startswith("2024-01-02")
+    assert store.became("src/billing/ledger.py", "Low") is None
+
+
+def test_history_keeps_to_one_repository_and_metric(store):
+    # Runs of another metric and another repository on the same path.
+    store.append_run(_results("Low", 0.5), repository="repo", metric="hhi")
+    store.append_run(_results("High", 0.9), repository="other", metric="churn")
+
+    history = store.file_history("src/billing/ledger.py")
+    assert history["run_id"].tolist() == [5]
+
+    history = store.file_history("src/billing/ledger.py", repository="repo")
+    assert history["run_id"].tolist() == [4]
+    churn = store.file_history("src/billing/ledger.py", "repo", metric="churn")
+    assert churn["risk_class"].tolist() == ["Low", "Critical", "Critical"]
+    since = store.became("src/billing/ledger.py", "Critical", repository="repo")
+    assert since is None
+    since = store.became(
+        "src/billing/ledger.py", "Critical", repository="repo", metric="churn"
+    )
+    assert since["run_id"] == 2
+    assert store.file_history("src/billing/ledger.py", metric="entropy").empty
+
+
+def test_intern_only_reads_the_given_keys(store):
+    ids = store._intern("files", "path", ["src/app.py", "new.py"])
+    assert set(ids) == {"src/app.py", "new.py"}
+
+
+def test_files_with_risk_defaults_to_latest_run(store):
+    critical = store.files_with_risk("Critical")
+    assert critical["file"].tolist() == ["src/billing/ledger.py"]
+    assert critical["run_id"].tolist() == [3]
+    assert store.files_with_risk("Critical", run_id=1).empty
+
+
+def test_missing_values_are_stored_as_null(tmp_path):
+    results = _results("Low", 0.5)
+    results["main_author"] = None
+    results["total_file_churn"] = None
+
+    with SQLiteResultStore(str(tmp_path / "h.db")) as result_store:
+        result_store.append_run(results)
+        rows = result_store.conn.execute(
+            "SELECT main_author_id, total_file_churn FROM results"
+        ).fetchall()
+    assert rows == [(None, None), (None, None)]
+
+
+def test_cli_analyze_store_and_query(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake_commit_df = pd.DataFrame(
+        [
+            {
+                "file": "src/billing/ledger.py",
+                "author": "a@test.com",
+                "lines_added": 10,
+                "lines_deleted": 0,
+                "commit_hash": "h1",
+            }
+        ]
+    )
+
+    from busfactorpy.core import miner as miner_mod
+
+    monkeypatch.setattr(
+        miner_mod.GitMiner, "mine_commit_history", lambda self: fake_commit_df
+    )
+
+    db = str(tmp_path / "history.db")
+    result = runner.invoke(app, ["analyze", ".", "--no-charts", "--store", db])
+    assert result.exit_code == 0
+    assert "Run 1 stored in:" in result.stdout
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 1
+
+    result = runner.invoke(app, ["query", db, "--file", "src/billing/ledger.py"])
+    assert result.exit_code == 0
+    assert "Critical since run 1" in result.stdout
+
+    result = runner.invoke(
+        app, ["query", db, "--file", "src/billing/ledger.py", "-m", "hhi"]
+    )
+    assert result.exit_code == 0
+    assert "No stored results" in result.stdout
+
+    result = runner.invoke(app, ["query", db, "--risk", "critical"])
+    assert result.exit_code == 0
+    assert "src/billing/ledger.py" in result.stdout
+
+
+def test_cli_query_missing_database(tmp_path):
+    result = runner.invoke(app, ["query", str(tmp_path / "nope.db")])
+    assert result.exit_code != 0
+    assert "Database not found" in result.stdout
@@ -77,8 +77,8 @@ def test_trend_analyzer_missing_bus_factor_column(mock_commit_data):
 def test_cli_trend_command_integration():
     with (
         patch("busfactorpy.cli.GitMiner") as MockMiner,
-        patch("busfactorpy.cli.TrendAnalyzer") as MockTrend,
-        patch("busfactorpy.cli.BusFactorVisualizer") as MockViz,
+        patch("busfactorpy.core.trend.TrendAnalyzer") as MockTrend,
+        patch("busfactorpy.cli.ChartWorker") as MockCharts,
     ):
         fake_commits = pd.DataFrame(
             {
@@ -100,4 +100,6 @@ def test_cli_trend_command_integration():
 
         assert result.exit_code == 0
         assert "Running Trend Analysis" in result.stdout
-        MockViz.return_value.plot_trend.assert_called_once()
+        MockCharts.return_value.submit.assert_called_once()
+        assert MockCharts.return_value.submit.call_args[0][0] == "plot_trend"
+        MockCharts.return_value.join.assert_called_once()
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from busfactorpy.core.ranking import select_top_risks
+from busfactorpy.output.visualizer import ChartWorker
+
+
+@pytest.fixture
+def results_df():
+    return pd.DataFrame(
+        {
+            "file": [f"src/f{i}.py" for i in range(20)],
+            "main_author_share": [i / 20 for i in range(20)],
+            "total_file_churn": [10] * 20,
+            "n_authors": [2] * 20,
+            "risk_class": ["Low"] * 20,
+        }
+    )
+
+
+def test_chart_worker_renders_in_background(results_df, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    # The chart ranks files of every risk class, Low ones included.
+    top_files = select_top_risks(results_df, 5, classes=None)
+    assert top_files["file"].tolist()[0] == "src/f19.py"
+    worker = ChartWorker()
+    worker.submit(
+        "generate_top_n_bar_chart",
+        n_top=5,
+        top_files=top_files[["file", "main_author_share"]],
+    )
+    worker.join()
+
+    assert (tmp_path / "charts" / "top_risky_files.png").exists()
+    assert "Bar chart saved to:" in capsys.readouterr().out
+
+
+def test_chart_worker_disabled_renders_nothing(results_df, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    worker = ChartWorker(enabled=False)
+    worker.submit("generate_top_n_bar_chart", results_df)
+    worker.join()
+
+    assert not (tmp_path / "charts").exists()